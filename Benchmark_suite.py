@@ -0,0 +1,365 @@
+import contextlib
+import io
+import json
+import math
+import multiprocessing as mp
+import os
+import platform
+import socket
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+from Stream_mapreduce import peak_rss_mb, reset_peak_rss
+
+DEFAULT_REPEAT = 5
+DEFAULT_WARMUP = 1
+# 기준(baseline) 대비 처리량이 이 비율 이상 떨어지면 실패
+REGRESSION_THRESHOLD = 0.10
+OUTPUT_FILE = "benchmark_results.json"
+
+
+# 측정 대상 하나
+#   setup(data) → ctx (pool/공유 메모리 등 준비, 측정 시간에 포함되지 않음)
+#   run(ctx)    → 처리한 레코드 수
+#   teardown(ctx)
+class Workload:
+    def __init__(self, name, run, setup=None, teardown=None):
+        self.name = name
+        self.run = run
+        self.setup = setup or (lambda data: data)
+        self.teardown = teardown or (lambda ctx: None)
+
+
+WORKLOADS = {}
+
+
+def register(name, run, setup=None, teardown=None):
+    WORKLOADS[name] = Workload(name, run, setup, teardown)
+    return WORKLOADS[name]
+
+
+# 벤치마크 입력: cleaned_text / sentiment 컬럼을 한 번만 읽어 모든 워크로드가 공유
+class BenchData:
+    def __init__(self, df):
+        self.df = df
+        self.texts = df["cleaned_text"].tolist()
+        self.sentiments = df["sentiment"]
+        self.rows = len(df)
+
+
+def load_bench_data(csv_path, rows=None):
+    df = pd.read_csv(csv_path, usecols=["cleaned_text", "sentiment"], nrows=rows)
+    df["sentiment"] = df["sentiment"].astype("category")
+    return BenchData(df)
+
+
+# ---------------- 워크로드 등록 (각 스크립트의 워드카운트/감정 분석 경로) ----------------
+# 스크립트 모듈은 필요할 때만 import (matplotlib 등 의존성이 없는 환경에서도 나머지는 실행 가능)
+
+def _hybrid_sequential():
+    import Hybrid_sequential
+    return Hybrid_sequential
+
+
+def _hybrid_parallel_setup(data):
+    import Hybrid_parallel
+    from Shared_columns import SharedColumns, attach_worker
+    columns = SharedColumns.from_frame(data.df)
+    attach_worker(columns)
+    pool = mp.Pool(Hybrid_parallel.NUM_PROCESSES, initializer=attach_worker, initargs=(columns,))
+    return Hybrid_parallel, pool, columns
+
+
+def _hybrid_parallel_teardown(ctx):
+    _, pool, columns = ctx
+    pool.close()
+    pool.join()
+    columns.close()
+    columns.unlink()
+
+
+def _hybrid_parallel_fused(ctx):
+    from Fused_job import default_job
+    from Shared_columns import fused_range
+    from Task_scheduler import adaptive_map
+    module, pool, columns = ctx
+    job = default_job()
+    state, _ = adaptive_map(pool, fused_range, lambda s, e: (job, s, e), columns.offsets,
+                            0, len(columns), job.fold, job.initial(), module.NUM_PROCESSES)
+    job.finalize(state)
+    return len(columns)
+
+
+def _pool_setup(data):
+    return data, mp.Pool(mp.cpu_count())
+
+
+def _pool_teardown(ctx):
+    ctx[1].close()
+    ctx[1].join()
+
+
+def _mapreduce_wordcount(mode):
+    def run(ctx):
+        import MapReduce_wordcount
+        data, pool = ctx
+        column = data.df["cleaned_text"].dropna()
+        lengths = column.astype(str).str.len().to_numpy()
+        MapReduce_wordcount.reduce_top_n(pool, column.tolist(), lengths, mp.cpu_count(), 10, mode)
+        return data.rows
+    return run
+
+
+def _mapreduce_sentiment(ctx):
+    from Sentiment_engine import count_sentiments_auto
+    data, pool = ctx
+    count_sentiments_auto(data.sentiments, pool=pool)
+    return data.rows
+
+
+def _fused_sequential(data):
+    from Fused_job import default_job
+    default_job().run_sequential(data.texts, data.sentiments.array)
+    return data.rows
+
+
+def _sequential_wordcount(data):
+    _hybrid_sequential().word_count(data.texts)
+    return data.rows
+
+
+def _sequential_sentiment(data):
+    _hybrid_sequential().sentiment_count(data.sentiments)
+    return data.rows
+
+
+def _parallel_wordcount(ctx):
+    module, pool, columns = ctx
+    module.parallel_wordcount(pool, columns, 0, len(columns))
+    return len(columns)
+
+
+def _parallel_sentiment(ctx):
+    module, pool, columns = ctx
+    module.parallel_sentiment(pool, columns, 0, len(columns))
+    return len(columns)
+
+
+def register_default_workloads():
+    register("hybrid_sequential.wordcount", _sequential_wordcount)
+    register("hybrid_sequential.sentiment", _sequential_sentiment)
+    register("hybrid_sequential.fused", _fused_sequential)
+    register("hybrid_parallel.wordcount", _parallel_wordcount, _hybrid_parallel_setup, _hybrid_parallel_teardown)
+    register("hybrid_parallel.sentiment", _parallel_sentiment, _hybrid_parallel_setup, _hybrid_parallel_teardown)
+    register("hybrid_parallel.fused", _hybrid_parallel_fused, _hybrid_parallel_setup, _hybrid_parallel_teardown)
+    register("mapreduce_wordcount.exact", _mapreduce_wordcount("exact"), _pool_setup, _pool_teardown)
+    register("mapreduce_wordcount.approx", _mapreduce_wordcount("approx"), _pool_setup, _pool_teardown)
+    register("mapreduce_sentiment", _mapreduce_sentiment, _pool_setup, _pool_teardown)
+
+
+# ---------------- 측정 / 통계 ----------------
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+# 부모 + (종료된) 자식 프로세스 CPU 시간
+def cpu_seconds():
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+# 아직 살아 있는 자식 프로세스(pool 워커 등)별 (CPU 초, 최대 RSS MiB)
+# os.times()의 children_*는 종료·회수된 자식만 포함하므로 /proc에서 직접 읽음 (Linux 외에는 빈 dict)
+def live_children():
+    me = os.getpid()
+    ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+    children = {}
+    try:
+        entries = [e for e in os.listdir("/proc") if e.isdigit()]
+    except OSError:
+        return children
+    for entry in entries:
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            if int(fields[1]) != me:
+                continue
+            rss = 0.0
+            with open(f"/proc/{entry}/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        rss = int(line.split()[1]) / 1024
+                        break
+        except (OSError, IndexError, ValueError):
+            continue
+        children[int(entry)] = ((int(fields[11]) + int(fields[12])) / ticks, rss)
+    return children
+
+
+# 살아 있는 자식의 최대 RSS도 반복마다 초기화 (실패하면 워커 시작 이후 누적값)
+def reset_children_peak_rss(pids):
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/clear_refs", "w") as f:
+                f.write("5")
+        except OSError:
+            pass
+
+
+# cpu: 부모 + 워커 합계 / rss: 부모와 워커 최대 RSS의 합
+# (공유 메모리 컬럼은 프로세스마다 RSS에 잡히므로 합계는 상한값)
+def summarize(wall, cpu, rss, records, worker_cpu=None, parent_rss=None, worker_rss=None):
+    median = statistics.median(wall)
+    return {
+        "records": records,
+        "repeat": len(wall),
+        "median_sec": median,
+        "p95_sec": percentile(wall, 95),
+        "mean_sec": statistics.mean(wall),
+        "stdev_sec": statistics.stdev(wall) if len(wall) > 1 else 0.0,
+        "min_sec": min(wall),
+        "cpu_sec_median": statistics.median(cpu),
+        "worker_cpu_sec_median": statistics.median(worker_cpu or [0.0]),
+        "peak_rss_mb": max(rss),
+        "parent_peak_rss_mb": max(parent_rss or rss),
+        "worker_peak_rss_mb": max(worker_rss or [0.0]),
+        "throughput_rps": records / median if median > 0 else 0.0,
+        "samples_sec": wall,
+    }
+
+
+# 워크로드가 출력하는 진행 메시지는 측정 중에는 숨김 (--verbose로 표시)
+def _quiet(verbose):
+    return contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+
+def run_workload(workload, data, repeat=DEFAULT_REPEAT, warmup=DEFAULT_WARMUP, verbose=False):
+    ctx = workload.setup(data)
+    wall, cpu, rss = [], [], []
+    worker_cpu, parent_rss, worker_rss = [], [], []
+    records = 0
+    try:
+        for _ in range(warmup):
+            with _quiet(verbose):
+                workload.run(ctx)
+        for _ in range(repeat):
+            reset_peak_rss()
+            before = live_children()
+            reset_children_peak_rss(before)
+            c0 = cpu_seconds()
+            t0 = time.perf_counter()
+            with _quiet(verbose):
+                records = workload.run(ctx)
+            wall.append(time.perf_counter() - t0)
+            parent_cpu = cpu_seconds() - c0
+            after = live_children()
+            # 반복 중에 새로 뜬 워커는 시작 값 0
+            workers = sum(c - before.get(pid, (0.0, 0.0))[0] for pid, (c, _) in after.items())
+            worker_cpu.append(workers)
+            cpu.append(parent_cpu + workers)
+            parent_rss.append(peak_rss_mb())
+            worker_rss.append(sum(r for _, r in after.values()))
+            rss.append(parent_rss[-1] + worker_rss[-1])
+    finally:
+        workload.teardown(ctx)
+    return summarize(wall, cpu, rss, records, worker_cpu, parent_rss, worker_rss)
+
+
+def print_summary(name, s):
+    print(f"📊 {name:30s} median {s['median_sec']:.4f}s | p95 {s['p95_sec']:.4f}s | "
+          f"σ {s['stdev_sec']:.4f}s | CPU {s['cpu_sec_median']:.2f}s (workers {s['worker_cpu_sec_median']:.2f}s) | "
+          f"RSS {s['peak_rss_mb']:.0f} MiB (workers {s['worker_peak_rss_mb']:.0f} MiB) | "
+          f"📈 {s['throughput_rps']:.2f} rows/s")
+
+
+def run_suite(data, names=None, repeat=DEFAULT_REPEAT, warmup=DEFAULT_WARMUP, verbose=False, source=None):
+    results = {}
+    for name in names or list(WORKLOADS):
+        try:
+            results[name] = run_workload(WORKLOADS[name], data, repeat, warmup, verbose)
+            print_summary(name, results[name])
+        except Exception as e:
+            print(f"❌ {name} failed: {e}")
+            results[name] = {"error": repr(e)}
+    return {
+        "meta": {
+            "host": socket.gethostname(),
+            "python": platform.python_version(),
+            "cpu_count": mp.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "source": source,
+            "rows": data.rows,
+            "repeat": repeat,
+            "warmup": warmup,
+        },
+        "results": results,
+    }
+
+
+# 기준 결과와 비교: 처리량 비율이 (1 - threshold)보다 낮으면 회귀
+def compare_to_baseline(report, baseline, threshold=REGRESSION_THRESHOLD):
+    regressions = []
+    for name, current in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or "error" in base or "error" in current:
+            continue
+        ratio = current["throughput_rps"] / base["throughput_rps"] if base["throughput_rps"] else 1.0
+        status = "❌ REGRESSION" if ratio < 1 - threshold else "✅"
+        print(f"{status} {name:30s} {base['throughput_rps']:.2f} → {current['throughput_rps']:.2f} rows/s "
+              f"({(ratio - 1) * 100:+.1f}%)")
+        if ratio < 1 - threshold:
+            regressions.append({"workload": name, "ratio": ratio})
+    return regressions
+
+
+def write_json(path, report):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def _arg(argv, name, default=None):
+    return argv[argv.index(name) + 1] if name in argv else default
+
+
+# 사용법
+#   python Benchmark_suite.py --csv cleaned_books_25.csv [--rows 200000] [--repeat 5] [--warmup 1]
+#          [--only hybrid_parallel.wordcount,mapreduce_sentiment] [--output results.json]
+#          [--baseline baseline.json] [--threshold 0.1] [--save-baseline baseline.json] [--verbose]
+#   --baseline이 주어지면 처리량 회귀 시 종료 코드 1
+if __name__ == "__main__":
+    argv = sys.argv
+    register_default_workloads()
+    if "--list" in argv:
+        print("\n".join(WORKLOADS))
+        sys.exit(0)
+
+    csv_path = _arg(argv, "--csv", "/home/ubuntu/cleaned_books_25.csv")
+    rows = _arg(argv, "--rows")
+    data = load_bench_data(csv_path, int(rows) if rows else None)
+    names = _arg(argv, "--only")
+    report = run_suite(data, names.split(",") if names else None,
+                       int(_arg(argv, "--repeat", DEFAULT_REPEAT)), int(_arg(argv, "--warmup", DEFAULT_WARMUP)),
+                       "--verbose" in argv, csv_path)
+
+    output = _arg(argv, "--output", OUTPUT_FILE)
+    write_json(output, report)
+    print(f"\n✅ Results written to {output}")
+    if "--save-baseline" in argv:
+        write_json(_arg(argv, "--save-baseline"), report)
+        print(f"📌 Baseline saved to {_arg(argv, '--save-baseline')}")
+
+    if "--baseline" in argv:
+        with open(_arg(argv, "--baseline")) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report, baseline, float(_arg(argv, "--threshold", REGRESSION_THRESHOLD)))
+        if regressions:
+            print(f"❌ {len(regressions)} workload(s) regressed more than "
+                  f"{float(_arg(argv, '--threshold', REGRESSION_THRESHOLD)) * 100:.0f}%")
+            sys.exit(1)
+        print("✅ No throughput regressions")
@@ -0,0 +1,73 @@
+import json
+import os
+import time
+
+from Window_aggregator import window_from_state
+
+# 소비자마다 윈도우 형태가 다르므로 체크포인트 파일도 따로 (Consumer.py: 단일 윈도우, 대시보드: 다중 윈도우)
+CHECKPOINT_PATH = "consumer_checkpoint.json"
+DASHBOARD_CHECKPOINT_PATH = "dashboard_checkpoint.json"
+CHECKPOINT_SECONDS = 30
+CHECKPOINT_VERSION = 1
+
+
+# 임시 파일에 쓴 뒤 rename → 중간에 죽어도 이전 체크포인트가 깨지지 않음
+# window_state는 PaneWindowAggregator / MultiWindowAggregator의 to_state() 결과 (lock 안에서 미리 떠 둔 스냅샷)
+def save_checkpoint(path, sequences, window_state):
+    state = {
+        "version": CHECKPOINT_VERSION,
+        "saved_at": time.time(),
+        "sequences": dict(sequences),
+        "window": window_state,
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp_path = os.path.join(directory, f".{os.path.basename(path)}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# (샤드별 시퀀스 번호, 복원된 윈도우) 반환, 없거나 깨졌으면 (빈 dict, None)
+# expected: 복원할 집계기 클래스, 다르면 시퀀스도 함께 버림
+#   (윈도우 없이 시퀀스만 이어받으면 이미 읽은 레코드가 윈도우에서 빠짐)
+def load_checkpoint(path, expected=None):
+    if not os.path.exists(path):
+        return {}, None
+    try:
+        with open(path) as f:
+            state = json.load(f)
+        if state.get("version") != CHECKPOINT_VERSION:
+            print(f"⚠️ Ignoring checkpoint {path}: unsupported version")
+            return {}, None
+        aggregator = window_from_state(state["window"])
+    except Exception as e:
+        print(f"⚠️ Failed to load checkpoint {path}: {e}")
+        return {}, None
+    if expected is not None and not isinstance(aggregator, expected):
+        print(f"⚠️ Ignoring checkpoint {path}: {type(aggregator).__name__} window, expected {expected.__name__}")
+        return {}, None
+
+    print(f"♻️ Restored checkpoint from {path} ({aggregator.record_count} records, "
+          f"{len(state['sequences'])} shards)")
+    return state["sequences"], aggregator
+
+
+# 일정 주기마다 체크포인트를 남기는 헬퍼 (윈도우와 시퀀스는 같은 lock 안에서 스냅샷)
+class Checkpointer:
+    def __init__(self, path=CHECKPOINT_PATH, interval=CHECKPOINT_SECONDS):
+        self.path = path
+        self.interval = interval
+        self.last_saved = time.time()
+
+    def due(self, now=None):
+        now = time.time() if now is None else now
+        return now - self.last_saved >= self.interval
+
+    def save(self, sequences, window_state):
+        try:
+            save_checkpoint(self.path, sequences, window_state)
+        except Exception as e:
+            print(f"❌ Failed to write checkpoint {self.path}: {e}")
+        self.last_saved = time.time()
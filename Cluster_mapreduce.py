@@ -0,0 +1,337 @@
+import multiprocessing as mp
+import os
+import socket
+import sys
+import threading
+import time
+from collections import Counter, deque
+from multiprocessing.managers import BaseManager
+
+from Dataset_cache import CACHE_DIR, ColumnarDataset, build_cache, open_dataset, S3_BUCKET
+from Sentiment_engine import count_sentiments_vectorized
+from Word_engine import count_arrays, pack_arrays, WordCounts, MAPREDUCE_STRIP
+
+DEFAULT_PORT = 50000
+DEFAULT_HOST = "127.0.0.1"
+# manager 연결은 pickle 기반이라 authkey를 아는 사람은 코드 실행이 가능 → 저장소에 기본값을 두지 않음
+# (local 모드는 실행마다 임의 키 생성, coordinator/worker 모드는 CLUSTER_AUTHKEY 필수)
+AUTHKEY = os.environ["CLUSTER_AUTHKEY"].encode("utf-8") if os.environ.get("CLUSTER_AUTHKEY") else None
+SPLIT_ROWS = 100000
+# 이 시간 안에 heartbeat/완료 보고가 없으면 워커가 죽은 것으로 보고 split을 다시 배정
+LEASE_SECONDS = 30
+HEARTBEAT_SECONDS = 5
+MAX_ATTEMPTS = 3
+# 이 시간 동안 연결된(살아 있는) 워커가 하나도 없으면 job 실패
+NO_WORKER_TIMEOUT_SECONDS = 120
+IDLE_POLL_SECONDS = 0.5
+TASKS = ("wordcount", "sentiment")
+
+
+# 코디네이터 쪽 작업 큐 (BaseManager로 다른 프로세스/인스턴스에 노출)
+# - split = 데이터셋의 [start, end) 행 범위
+# - 워커가 split을 받으면 lease 부여, heartbeat로 연장, 만료되면 대기열 맨 앞으로 되돌림
+# - 같은 split의 결과가 두 번 오면 (늦게 살아난 워커) 처음 것만 사용
+class JobQueue:
+    def __init__(self, spec, splits, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.spec = spec
+        self.splits = dict(enumerate(splits))
+        self.pending = deque(self.splits)
+        self.leases = {}
+        self.attempts = Counter()
+        self.results = {}
+        self.workers = {}
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.error = None
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        if not self.splits:
+            self.done.set()
+
+    def _requeue_expired(self, now):
+        for split_id, (worker_id, deadline) in list(self.leases.items()):
+            if deadline < now:
+                del self.leases[split_id]
+                self.pending.appendleft(split_id)
+                print(f"⚠️ Lease on split {split_id} expired (worker {worker_id}), requeued")
+
+    # 코디네이터 루프에서 주기적으로 호출: 워커 요청이 없어도 만료된 lease 회수,
+    # 살아 있는 워커가 no_worker_timeout 동안 없거나 deadline을 넘기면 job 실패
+    def check(self, now, no_worker_timeout=NO_WORKER_TIMEOUT_SECONDS, deadline=None):
+        with self.lock:
+            if self.done.is_set():
+                return
+            self._requeue_expired(now)
+            last_seen = max(self.workers.values(), default=self.started)
+            if now - last_seen > no_worker_timeout:
+                self.error = f"no live workers for {no_worker_timeout}s"
+            elif deadline is not None and now > deadline:
+                self.error = f"job timed out after {now - self.started:.0f}s"
+            if self.error:
+                self.done.set()
+
+    def get_spec(self):
+        return self.spec
+
+    # 다음 split (split_id, start, end), 지금 줄 것이 없으면 None
+    def get_split(self, worker_id):
+        with self.lock:
+            now = time.time()
+            self.workers[worker_id] = now
+            self._requeue_expired(now)
+            while self.pending and not self.done.is_set():
+                split_id = self.pending.popleft()
+                if split_id in self.results:
+                    continue
+                self.attempts[split_id] += 1
+                if self.attempts[split_id] > self.max_attempts:
+                    self.error = f"split {split_id} failed {self.max_attempts} times"
+                    self.done.set()
+                    return None
+                self.leases[split_id] = (worker_id, now + self.lease_seconds)
+                start, end = self.splits[split_id]
+                return split_id, start, end
+            return None
+
+    def heartbeat(self, worker_id, split_id):
+        with self.lock:
+            now = time.time()
+            self.workers[worker_id] = now
+            lease = self.leases.get(split_id)
+            if lease is not None and lease[0] == worker_id:
+                self.leases[split_id] = (worker_id, now + self.lease_seconds)
+                return True
+            return False
+
+    def complete(self, worker_id, split_id, result):
+        with self.lock:
+            self.workers[worker_id] = time.time()
+            self.leases.pop(split_id, None)
+            if split_id in self.results:
+                return False
+            self.results[split_id] = result
+            if len(self.results) == len(self.splits):
+                self.done.set()
+            return True
+
+    def fail(self, worker_id, split_id, error):
+        with self.lock:
+            print(f"⚠️ Worker {worker_id} failed split {split_id}: {error}")
+            if self.leases.pop(split_id, None) is not None and split_id not in self.results:
+                self.pending.appendleft(split_id)
+
+    def finished(self):
+        return self.done.is_set()
+
+    def status(self):
+        with self.lock:
+            return {
+                "splits": len(self.splits),
+                "done": len(self.results),
+                "leased": len(self.leases),
+                "pending": len(self.pending),
+                "workers": len(self.workers),
+                "retries": sum(max(0, a - 1) for a in self.attempts.values()),
+                "error": self.error,
+            }
+
+
+class CoordinatorManager(BaseManager):
+    pass
+
+
+class WorkerManager(BaseManager):
+    pass
+
+
+WorkerManager.register("get_queue")
+
+
+def make_splits(rows, split_rows=SPLIT_ROWS):
+    return [(start, min(start + split_rows, rows)) for start in range(0, rows, split_rows)]
+
+
+# 코디네이터 프로세스 안의 스레드에서 큐를 서비스 (결과는 같은 프로세스에서 바로 병합)
+def serve_queue(queue, authkey, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    CoordinatorManager.register("get_queue", callable=lambda: queue)
+    manager = CoordinatorManager(address=(host, port), authkey=authkey)
+    server = manager.get_server()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ---------------- 워커 ----------------
+
+# job spec: {"task", "cache_path"} (로컬 캐시 공유) 또는 {"task", "key", "bucket"} (인스턴스마다 S3에서 캐시)
+def open_job_dataset(spec):
+    if spec.get("cache_path"):
+        return ColumnarDataset(spec["cache_path"])
+    return open_dataset(spec["key"], spec.get("bucket", S3_BUCKET))
+
+
+# split 하나 처리 (MapReduce_wordcount / MapReduce_sentiment와 같은 규칙)
+def run_split(dataset, task, start, end):
+    if task == "wordcount":
+        texts = [t for t in dataset.texts(start, end) if t is not None]
+        return pack_arrays(*count_arrays(texts, MAPREDUCE_STRIP, coerce=True))
+    if task == "sentiment":
+        return dict(count_sentiments_vectorized(dataset.sentiments(start, end)))
+    raise ValueError(f"unknown task {task}")
+
+
+def run_worker(address, authkey=AUTHKEY, worker_id=None):
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    manager = WorkerManager(address=address, authkey=authkey)
+    manager.connect()
+    queue = manager.get_queue()
+    spec = queue.get_spec()
+    dataset = open_job_dataset(spec)
+    print(f"👷 Worker {worker_id} connected to {address[0]}:{address[1]} ({spec['task']})")
+
+    processed = 0
+    while True:
+        split = queue.get_split(worker_id)
+        if split is None:
+            if queue.finished():
+                break
+            time.sleep(IDLE_POLL_SECONDS)
+            continue
+
+        split_id, start, end = split
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(HEARTBEAT_SECONDS):
+                queue.heartbeat(worker_id, split_id)
+
+        beater = threading.Thread(target=beat, daemon=True)
+        beater.start()
+        try:
+            result = run_split(dataset, spec["task"], start, end)
+        except Exception as e:
+            stop.set()
+            queue.fail(worker_id, split_id, repr(e))
+            continue
+        stop.set()
+        beater.join()
+        queue.complete(worker_id, split_id, result)
+        processed += 1
+
+    print(f"✅ Worker {worker_id} done ({processed} splits)")
+    return processed
+
+
+# ---------------- 코디네이터 ----------------
+
+def merge_results(task, results, top_n=10):
+    if task == "wordcount":
+        total = WordCounts()
+        for split_id in sorted(results):
+            total.add_packed(results[split_id])
+        return total.most_common(top_n)
+    total = Counter()
+    for split_id in sorted(results):
+        total.update(results[split_id])
+    return dict(total)
+
+
+# 로컬 CSV는 코디네이터가 한 번만 컬럼형 캐시로 변환 (같은 호스트의 워커가 함께 사용)
+def prepare_spec(task, csv_path=None, key=None, bucket=S3_BUCKET):
+    if csv_path:
+        path = os.path.join(CACHE_DIR, "local__" + os.path.basename(csv_path))
+        build_cache(csv_path, path)
+        return {"task": task, "cache_path": path}
+    return {"task": task, "key": key, "bucket": bucket}
+
+
+# authkey가 없으면 local_workers 전용으로 실행마다 임의 키 생성 (원격 워커는 접속 불가)
+# timeout: job 전체 제한 시간 (None이면 무제한)
+def run_coordinator(spec, host=DEFAULT_HOST, port=DEFAULT_PORT, split_rows=SPLIT_ROWS, local_workers=0,
+                    authkey=AUTHKEY, timeout=None, no_worker_timeout=NO_WORKER_TIMEOUT_SECONDS):
+    if authkey is None:
+        if not local_workers:
+            raise ValueError("CLUSTER_AUTHKEY must be set to accept remote workers")
+        authkey = os.urandom(32)
+    rows = len(open_job_dataset(spec))
+    queue = JobQueue(spec, make_splits(rows, split_rows))
+    server = serve_queue(queue, authkey, host, port)
+    address = server.address
+    print(f"🧭 Coordinator on {address[0]}:{address[1]} | {spec['task']} | {rows} rows in {len(queue.splits)} splits")
+
+    workers = []
+    for i in range(local_workers):
+        p = mp.Process(target=run_worker, args=(("127.0.0.1", address[1]), authkey, f"local-{i}"))
+        p.start()
+        workers.append(p)
+
+    start = time.time()
+    deadline = start + timeout if timeout else None
+    last_report = 0
+    while not queue.done.wait(1):
+        queue.check(time.time(), no_worker_timeout, deadline)
+        if time.time() - last_report >= 10:
+            print(f"📊 {queue.status()}")
+            last_report = time.time()
+    elapsed = time.time() - start
+
+    for p in workers:
+        p.join(LEASE_SECONDS)
+        if p.is_alive():
+            p.terminate()
+
+    status = queue.status()
+    if status["error"]:
+        print(f"❌ Job failed: {status['error']}")
+        return None, status
+    result = merge_results(spec["task"], queue.results)
+    throughput = rows / elapsed if elapsed > 0 else 0
+    print(f"⏱️ Time: {elapsed:.2f}s | 📈 Throughput: {throughput:.2f} rows/s "
+          f"| 👷 Workers: {status['workers']} | 🔁 Retries: {status['retries']}")
+    print(f"📦 Result: {result}")
+    return result, status
+
+
+def _arg(argv, name, default=None):
+    return argv[argv.index(name) + 1] if name in argv else default
+
+
+# 사용법
+#   코디네이터 : python Cluster_mapreduce.py coordinator --task wordcount --key cleaned/cleaned_books_25.csv
+#                 python Cluster_mapreduce.py coordinator --task sentiment --csv local.csv [--port 50000]
+#                 [--host 0.0.0.0 (다른 인스턴스의 워커를 받을 때만)] [--timeout 초] [--no-worker-timeout 초]
+#   워커       : python Cluster_mapreduce.py worker --host <coordinator-ip> [--port 50000] [--processes 2]
+#   localhost  : python Cluster_mapreduce.py local --task wordcount --csv local.csv --workers 3
+#   coordinator/worker 모드는 양쪽 모두 같은 CLUSTER_AUTHKEY 환경 변수가 필요
+#   job이 실패하면 (split 반복 실패, 워커 없음, 시간 초과) 종료 코드 1
+if __name__ == "__main__":
+    argv = sys.argv
+    mode = argv[1] if len(argv) > 1 else "local"
+    port = int(_arg(argv, "--port", DEFAULT_PORT))
+    if mode != "local" and AUTHKEY is None:
+        sys.exit("❌ Set CLUSTER_AUTHKEY (shared secret) before starting a coordinator or worker")
+
+    if mode == "worker":
+        host = _arg(argv, "--host", DEFAULT_HOST)
+        procs = [mp.Process(target=run_worker, args=((host, port),))
+                 for _ in range(int(_arg(argv, "--processes", 1)))]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+    else:
+        task = _arg(argv, "--task", "wordcount")
+        if task not in TASKS:
+            sys.exit(f"❌ --task must be one of {TASKS}")
+        spec = prepare_spec(task, _arg(argv, "--csv"), _arg(argv, "--key", "cleaned/cleaned_books_25.csv"))
+        split_rows = int(_arg(argv, "--split-rows", SPLIT_ROWS))
+        timeout = float(_arg(argv, "--timeout", 0)) or None
+        no_worker_timeout = float(_arg(argv, "--no-worker-timeout", NO_WORKER_TIMEOUT_SECONDS))
+        if mode == "local":
+            result, status = run_coordinator(spec, DEFAULT_HOST, int(_arg(argv, "--port", 0)), split_rows,
+                                             int(_arg(argv, "--workers", 2)), AUTHKEY, timeout, no_worker_timeout)
+        else:
+            result, status = run_coordinator(spec, _arg(argv, "--host", DEFAULT_HOST), port, split_rows, 0,
+                                             AUTHKEY, timeout, no_worker_timeout)
+        if status["error"]:
+            sys.exit(1)
@@ -2,9 +2,15 @@ import matplotlib.pyplot as plt
 import boto3
 import json
 import time
+import threading
 from collections import deque, Counter
 from datetime import datetime, timedelta, timezone
-from multiprocessing import Process, Manager
+from multiprocessing import Process
+from Window_aggregator import PaneWindowAggregator
+from Record_codec import decode_events
+from Kinesis_consumer import KinesisConsumer, event_time
+from Checkpoint import Checkpointer, load_checkpoint, CHECKPOINT_PATH
+from Shared_ring import SharedRing
 
 # AWS Kinesis 설정
 REGION_NAME = "us-east-1"
@@ -20,81 +26,67 @@ def tokenize(text):
         return []
     return text.lower().split()
 
-# Kinesis에서 데이터를 가져오는 프로세스
-def consume_data(shared_window):
-    kinesis = boto3.client("kinesis", region_name=REGION_NAME)
-    shards = kinesis.describe_stream(StreamName=STREAM_NAME)["StreamDescription"]["Shards"]
-
-    shard_iterators = []
-    error_printed = set()  # 에러 메시지 중복 방지용
-
-    for shard in shards:
-        try:
-            iterator = kinesis.get_shard_iterator(
-                StreamName=STREAM_NAME,
-                ShardId=shard["ShardId"],
-                ShardIteratorType="LATEST"
-            )["ShardIterator"]
-            shard_iterators.append((shard["ShardId"], iterator))
-        except Exception as e:
-            print(f"❌ Failed to get shard iterator for {shard['ShardId']}: {e}")
-
-    while True:
-        for idx, (shard_id, iterator) in enumerate(shard_iterators):
+# Kinesis에서 데이터를 가져오는 프로세스 (샤드별 fetch 스레드)
+# client: boto3 Kinesis 클라이언트 대신 다른 구현을 주입할 때 사용
+def consume_data(ring, start_sequences=None, client=None):
+    kinesis = client or boto3.client("kinesis", region_name=REGION_NAME)
+    # 링 버퍼는 단일 생산자 전용이므로 fetch 스레드들의 push는 lock으로 직렬화
+    push_lock = threading.Lock()
+
+    def handle_records(shard_id, records):
+        now = datetime.now(timezone.utc).timestamp()
+        parsed = []
+        for record in records:
             try:
-                if not iterator:
-                    if shard_id not in error_printed:
-                        print(f"⚠️ Skipping shard {shard_id}: No iterator")
-                        error_printed.add(shard_id)
-                    continue
-
-                response = kinesis.get_records(ShardIterator=iterator, Limit=100)
-                shard_iterators[idx] = (shard_id, response.get("NextShardIterator"))
-                now = datetime.now(timezone.utc)
-
-                for record in response.get("Records", []):
-                    try:
-                        data = json.loads(record["Data"])
-                        text = data.get("text", "")
-                        sentiment = data.get("sentiment", "")
-                        words = tokenize(text)
-                        shared_window.append((now, words, sentiment))
-                    except:
-                        continue
-
-            except Exception as e:
-                if shard_id not in error_printed:
-                    print(f"❌ Error on shard {shard_id}: {e}")
-                    error_printed.add(shard_id)
-        time.sleep(0.5)
+                # JSON 단건 레코드와 집계 레코드 모두 (text, sentiment, 생산자 시각) 리스트로 변환
+                for text, sentiment, ts in decode_events(record["Data"]):
+                    parsed.append((event_time(record, ts, now), tokenize(text), sentiment))
+            except:
+                continue
+
+        with push_lock:
+            for ts, words, sentiment in parsed:
+                # 링 버퍼에는 이벤트 시각을 넣음 (가득 차면 시각화 프로세스가 비울 때까지 대기)
+                while not ring.push_record(ts, words, sentiment):
+                    time.sleep(0.01)
+            # 체크포인트용: 이 샤드에서 여기까지 링 버퍼에 넣었다는 표시
+            marker = f"{shard_id} {records[-1]['SequenceNumber']}"
+            while not ring.push_marker(now, marker):
+                time.sleep(0.01)
+
+    KinesisConsumer(kinesis, STREAM_NAME, handle_records, start_sequences=start_sequences).run_forever()
 
 # 시각화 업데이트 함수
-def run_visualization(shared_window):
+def run_visualization(ring, aggregator=None, shard_sequences=None):
     plt.ion()
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
     fig.suptitle("Amazon Book Review - Real-time Analysis", fontsize=16, fontweight='bold')
     last_update = datetime.now(timezone.utc)
+    aggregator = aggregator or PaneWindowAggregator(WINDOW_SECONDS, SLIDING_INTERVAL_SECONDS)
+    shard_sequences = dict(shard_sequences or {})
+    checkpointer = Checkpointer(CHECKPOINT_PATH)
+
+    def update_sequence(marker):
+        shard_id, sequence = marker.split(" ", 1)
+        shard_sequences[shard_id] = sequence
 
     while True:
         now = datetime.now(timezone.utc)
 
-        # 오래된 데이터 제거
-        while shared_window and (now - shared_window[0][0]) > timedelta(seconds=WINDOW_SECONDS):
-            del shared_window[0]
+        # 링 버퍼에 쌓인 레코드를 한 번에 가져와 pane에 누적
+        for ts, words, sentiment in ring.pop_records(on_marker=update_sequence):
+            aggregator.add(ts, words, sentiment)
 
-        # 일정 간격마다 시각화 갱신
-        if (now - last_update).total_seconds() >= SLIDING_INTERVAL_SECONDS and shared_window:
-            word_counter = Counter()
-            sentiment_counter = Counter({'positive': 0, 'neutral': 0, 'negative': 0})
+        # watermark 기준으로 만료된 pane 제거 (벽시계는 유휴 스트림 감지에만 사용)
+        aggregator.expire(now.timestamp())
 
-            for _, words, sentiment in shared_window:
-                word_counter.update(words)
-                if sentiment:
-                    sentiment_counter[sentiment.lower()] += 1
+        # 일정 간격마다 시각화 갱신
+        if (now - last_update).total_seconds() >= SLIDING_INTERVAL_SECONDS and aggregator.record_count:
+            sentiment_counter = aggregator.sentiments()
 
             # 막대그래프 (단어 카운트)
             ax1.cla()
-            top_words = word_counter.most_common(10)
+            top_words = aggregator.top_words(10)
             words = [w for w, _ in top_words]
             counts = [c for _, c in top_words]
             bars = ax1.bar(words, counts, color='skyblue', edgecolor='black')
@@ -130,19 +122,28 @@ def run_visualization(shared_window):
                     colors=pie_colors,
                     textprops={'fontsize': 10}
                 )
-            ax2.set_title("Sentiment Distribution", fontsize=14, fontweight='bold') 
+            ax2.set_title("Sentiment Distribution", fontsize=14, fontweight='bold')
+            ax2.set_xlabel(f"Late records dropped: {aggregator.late_records}", fontsize=10)
 
             plt.tight_layout()
             plt.pause(0.01)
             last_update = now
 
+        # 주기적으로 샤드 시퀀스와 윈도우 집계를 체크포인트로 저장
+        if checkpointer.due():
+            checkpointer.save(shard_sequences, aggregator.to_state())
+
         time.sleep(0.5)
 
 # 메인 함수
 if __name__ == "__main__":
     print("📡 Starting Consumer and Visualization...")
-    with Manager() as manager:
-        shared_window = manager.list()
-        consumer_proc = Process(target=consume_data, args=(shared_window,))
+    shard_sequences, restored_window = load_checkpoint(CHECKPOINT_PATH, PaneWindowAggregator)
+    ring = SharedRing()
+    try:
+        consumer_proc = Process(target=consume_data, args=(ring, shard_sequences), daemon=True)
         consumer_proc.start()
-        run_visualization(shared_window)
+        run_visualization(ring, restored_window, shard_sequences)
+    finally:
+        ring.close()
+        ring.unlink()
@@ -6,17 +6,24 @@ import time
 from collections import deque, Counter
 from datetime import datetime, timedelta, timezone
 import threading
+from Window_aggregator import MultiWindowAggregator, MULTI_WINDOWS
+from Record_codec import decode_events
+from Kinesis_consumer import KinesisConsumer, event_time
+from Checkpoint import Checkpointer, load_checkpoint, DASHBOARD_CHECKPOINT_PATH
 
 # ✅ AWS Kinesis 설정
 REGION_NAME = "us-east-1"
 STREAM_NAME = "book-reviews-stream"
 
-# ✅ 슬라이딩 윈도우 설정 (3분 유지, 5초마다 갱신)
-WINDOW_SECONDS = 180
+# ✅ 슬라이딩 윈도우 설정 (1분/3분/15분/1시간 동시 유지, 5초마다 갱신)
+WINDOWS = MULTI_WINDOWS
 SLIDING_INTERVAL_SECONDS = 5
 
-# ✅ 상태 저장용
-shared_window = deque()
+# ✅ 상태 저장용 (5초 pane + 1분 bucket 계층 집계, 체크포인트가 있으면 복원)
+shard_sequences, restored_window = load_checkpoint(DASHBOARD_CHECKPOINT_PATH, MultiWindowAggregator)
+window_aggregator = restored_window or MultiWindowAggregator(WINDOWS, SLIDING_INTERVAL_SECONDS)
+window_lock = threading.Lock()
+checkpointer = Checkpointer(DASHBOARD_CHECKPOINT_PATH)
 
 # ✅ 텍스트 전처리 함수
 def tokenize(text):
@@ -24,42 +31,30 @@ def tokenize(text):
         return []
     return text.lower().split()
 
-# ✅ Kinesis 소비 스레드
-def consume_data():
-    kinesis = boto3.client("kinesis", region_name=REGION_NAME)
-    shards = kinesis.describe_stream(StreamName=STREAM_NAME)["StreamDescription"]["Shards"]
-    shard_iterators = []
-
-    for shard in shards:
+# ✅ Kinesis 레코드 처리 (샤드별 fetch 스레드에서 호출)
+def handle_records(shard_id, records):
+    now = datetime.now(timezone.utc).timestamp()
+    parsed = []
+    for record in records:
         try:
-            iterator = kinesis.get_shard_iterator(
-                StreamName=STREAM_NAME,
-                ShardId=shard["ShardId"],
-                ShardIteratorType="LATEST"
-            )["ShardIterator"]
-            shard_iterators.append((shard["ShardId"], iterator))
-        except Exception as e:
-            print(f"❌ Shard iterator error: {e}")
-
-    while True:
-        for idx, (shard_id, iterator) in enumerate(shard_iterators):
-            try:
-                response = kinesis.get_records(ShardIterator=iterator, Limit=100)
-                shard_iterators[idx] = (shard_id, response.get("NextShardIterator"))
-                now = datetime.now(timezone.utc)
-
-                for record in response.get("Records", []):
-                    try:
-                        data = json.loads(record["Data"])
-                        text = data.get("text", "")
-                        sentiment = data.get("sentiment", "")
-                        words = tokenize(text)
-                        shared_window.append((now, words, sentiment))
-                    except:
-                        continue
-            except:
-                continue
-        time.sleep(0.5)
+            # JSON 단건 레코드와 집계 레코드 모두 (text, sentiment, 생산자 시각) 리스트로 변환
+            for text, sentiment, ts in decode_events(record["Data"]):
+                parsed.append((event_time(record, ts, now), tokenize(text), sentiment))
+        except:
+            continue
+
+    with window_lock:
+        # 이벤트 시각의 pane에 반영 (윈도우가 이미 지나간 레코드는 late_records로만 집계)
+        for ts, words, sentiment in parsed:
+            window_aggregator.add(ts, words, sentiment)
+        # 윈도우에 반영된 마지막 시퀀스 (체크포인트와 같은 lock으로 보호)
+        shard_sequences[shard_id] = records[-1]["SequenceNumber"]
+
+# ✅ Kinesis 소비 엔진 (샤드마다 fetch 스레드, 리샤딩 자동 감지)
+# client: boto3 Kinesis 클라이언트 대신 다른 구현을 주입할 때 사용
+def consume_data(client=None):
+    kinesis = client or boto3.client("kinesis", region_name=REGION_NAME)
+    KinesisConsumer(kinesis, STREAM_NAME, handle_records, start_sequences=shard_sequences).run_forever()
 
 # ✅ Streamlit 설정
 st.set_page_config(layout="wide")
@@ -71,86 +66,99 @@ placeholder = st.empty()
 # ✅ 소비 스레드 실행
 threading.Thread(target=consume_data, daemon=True).start()
 
+# ✅ 윈도우 하나의 Top Words 막대그래프 / 감정 파이차트
+def draw_window(name, top_words, sentiment_counter):
+    words, counts = zip(*top_words) if top_words else ([], [])
+
+    fig1, ax1 = plt.subplots(figsize=(6, 4))
+    ax1.bar(words, counts, color='#87CEFA', edgecolor='black')
+    ax1.set_title(f"Top 10 Words (Last {name})", fontsize=14, fontweight='bold')
+    ax1.set_ylabel("Count", fontsize=12)
+    ax1.tick_params(axis='x', labelrotation=45)
+    ax1.grid(axis='y', linestyle='--', alpha=0.5)
+    for i, count in enumerate(counts):
+        ax1.text(i, count + max(counts) * 0.01, str(count), ha='center', fontsize=9)
+
+    labels, sizes, pie_colors = [], [], []
+    color_map = {'positive': '#A1D6E2', 'neutral': '#CCCCCC', 'negative': '#FF9999'}
+
+    for s in ['positive', 'neutral', 'negative']:
+        if sentiment_counter[s] > 0:
+            labels.append(s.capitalize())
+            sizes.append(sentiment_counter[s])
+            pie_colors.append(color_map[s])
+
+    fig2, ax2 = plt.subplots(figsize=(5, 4))
+    if sizes:
+        wedges, texts, autotexts = ax2.pie(
+            sizes,
+            labels=labels,
+            autopct='%1.1f%%',
+            startangle=140,
+            colors=pie_colors,
+            textprops={'fontsize': 10}
+        )
+        for text in texts:
+            text.set_fontweight('bold')
+    ax2.set_title(f"Sentiment Distribution (Last {name})", fontsize=14, fontweight='bold')
+    return fig1, fig2
+
 # ✅ 실시간 시각화 루프
 while True:
     now = datetime.now(timezone.utc)
 
-    # 오래된 항목 제거
-    while shared_window and (now - shared_window[0][0]) > timedelta(seconds=WINDOW_SECONDS):
-        shared_window.popleft()
-
-    # 스냅샷 복사 후 분석
-    snapshot = list(shared_window)
-    if snapshot:
-        start_time = time.time()
-        
-        word_counter = Counter()
-        sentiment_counter = Counter({'positive': 0, 'neutral': 0, 'negative': 0})
-        for _, words, sentiment in snapshot:
-            word_counter.update(words)
-            if sentiment:
-                sentiment_counter[sentiment.lower()] += 1
-        
-        end_time = time.time()
+    # watermark 기준으로 만료된 pane/bucket 제거 후 윈도우별 증분 집계 결과 조회
+    start_time = time.time()
+    with window_lock:
+        window_aggregator.expire(now.timestamp())
+        window_size = window_aggregator.record_count
+        late_records = window_aggregator.late_records
+        watermark = window_aggregator.watermark
+        snapshots = {
+            name: (window_aggregator.counts(name), window_aggregator.top_words(name, 10),
+                   window_aggregator.sentiments(name))
+            for name in WINDOWS
+        }
+        bucket_count = len(window_aggregator.base.panes) + len(window_aggregator.buckets)
+    end_time = time.time()
+
+    if window_size:
         elapsed = end_time - start_time
-        throughput = len(snapshot) / elapsed if elapsed > 0 else 0
-        latency = (elapsed / max(len(snapshot), 1)) * 1000  # ms
-
-        # Top Words 시각화
-        top_words = word_counter.most_common(10)
-        words, counts = zip(*top_words) if top_words else ([], [])
-
-        fig1, ax1 = plt.subplots(figsize=(6, 4))
-        bars = ax1.bar(words, counts, color='#87CEFA', edgecolor='black')
-        ax1.set_title("Top 10 Words (Last 3 Minutes)", fontsize=14, fontweight='bold')
-        ax1.set_ylabel("Count", fontsize=12)
-        ax1.tick_params(axis='x', labelrotation=45)
-        ax1.grid(axis='y', linestyle='--', alpha=0.5)
-        for i, count in enumerate(counts):
-            ax1.text(i, count + max(counts) * 0.01, str(count), ha='center', fontsize=9)
-
-        # Sentiment Pie 시각화
-        labels, sizes, pie_colors = [], [], []
-        color_map = {'positive': '#A1D6E2', 'neutral': '#CCCCCC', 'negative': '#FF9999'}
-
-        for s in ['positive', 'neutral', 'negative']:
-            if sentiment_counter[s] > 0:
-                labels.append(s.capitalize())
-                sizes.append(sentiment_counter[s])
-                pie_colors.append(color_map[s])
-
-        fig2, ax2 = plt.subplots(figsize=(5, 4))
-        if sizes:
-            wedges, texts, autotexts = ax2.pie(
-                sizes,
-                labels=labels,
-                autopct='%1.1f%%',
-                startangle=140,
-                colors=pie_colors,
-                textprops={'fontsize': 10}
-            )
-            for text in texts:
-                text.set_fontweight('bold')
-        ax2.set_title("Sentiment Distribution", fontsize=14, fontweight='bold')
+        throughput = window_size / elapsed if elapsed > 0 else 0
+        latency = (elapsed / max(window_size, 1)) * 1000  # ms
 
         # Streamlit 표시
         with placeholder.container():
             
             # 실시간 성능 지표
             st.subheader("🔧 Stream Processing Performance")
-            col_perf1, col_perf2, col_perf3 = st.columns(3)
+            col_perf1, col_perf2, col_perf3, col_perf4, col_perf5 = st.columns(5)
             col_perf1.metric("Throughput", f"{throughput:.2f}", "records/sec")
             col_perf2.metric("Latency", f"{latency:.4f}", "ms/record")
-            col_perf3.metric("Snapshot Size", f"{len(snapshot)}")
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                st.subheader("Top 10 Words (Last 3 Minutes)")
-                st.pyplot(fig1)
-                plt.close(fig1)
-            with col2:
-                st.subheader("Sentiment Distribution")
-                st.pyplot(fig2)
-                plt.close(fig2)
+            col_perf3.metric("Snapshot Size", f"{window_size}", f"{bucket_count} panes/buckets")
+            col_perf4.metric("Late Records", f"{late_records}", "dropped")
+            # 이벤트 시각이 벽시계보다 얼마나 뒤처져 있는지 (backlog 따라잡는 중이면 큼)
+            col_perf5.metric("Event-time Lag", f"{now.timestamp() - watermark:.1f}" if watermark else "-", "sec")
+
+            # 윈도우 길이별 탭
+            tabs = st.tabs([f"{name} ({snapshots[name][0]} reviews)" for name in WINDOWS])
+            for tab, name in zip(tabs, WINDOWS):
+                _, top_words, sentiment_counter = snapshots[name]
+                fig1, fig2 = draw_window(name, top_words, sentiment_counter)
+                with tab:
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.pyplot(fig1)
+                        plt.close(fig1)
+                    with col2:
+                        st.pyplot(fig2)
+                        plt.close(fig2)
+
+    # 주기적으로 샤드 시퀀스와 윈도우 집계를 체크포인트로 저장
+    if checkpointer.due():
+        with window_lock:
+            sequences = dict(shard_sequences)
+            window_state = window_aggregator.to_state()
+        checkpointer.save(sequences, window_state)
 
     time.sleep(SLIDING_INTERVAL_SECONDS)
@@ -0,0 +1,214 @@
+import json
+import os
+import sys
+import time
+
+import boto3
+import numpy as np
+import pandas as pd
+
+S3_BUCKET = "bookreview-results"
+CACHE_DIR = os.environ.get("DATASET_CACHE_DIR", "/home/ubuntu/dataset_cache")
+COLUMNS = ["cleaned_text", "sentiment"]
+PARSE_CHUNK_ROWS = 100000
+CACHE_VERSION = 1
+
+s3 = boto3.client("s3", region_name="us-east-1")
+
+
+# 캐시 디렉터리 구조 (S3 key 하나당 디렉터리 하나)
+#   meta.json        : ETag, 행 수, 감정 카테고리
+#   text.bin         : 모든 리뷰 텍스트를 이어 붙인 UTF-8 바이트 (memory-map)
+#   byte_offsets.npy : 행 i의 텍스트 = text.bin[byte_offsets[i]:byte_offsets[i+1]]
+#   char_offsets.npy : 같은 위치의 문자 단위 offset (한 번 decode 후 str 슬라이싱용)
+#   text_null.npy    : 텍스트 결측 여부
+#   sentiment.npy    : 감정 카테고리 코드 (int8, -1 = 결측)
+def cache_path(key):
+    return os.path.join(CACHE_DIR, key.replace("/", "__"))
+
+
+def _read_meta(path):
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        return meta if meta.get("version") == CACHE_VERSION else None
+    except Exception:
+        return None
+
+
+def remote_etag(key, bucket=S3_BUCKET):
+    return s3.head_object(Bucket=bucket, Key=key)["ETag"]
+
+
+# CSV를 chunk 단위로 읽어 컬럼형 캐시로 변환 (메모리는 chunk 크기로 제한)
+def build_cache(csv_path, path, etag=None):
+    tmp_path = path + ".tmp"
+    os.makedirs(tmp_path, exist_ok=True)
+
+    byte_parts = [np.zeros(1, dtype=np.int64)]
+    char_parts = [np.zeros(1, dtype=np.int64)]
+    nulls = []
+    sentiments = []
+    categories = {}
+
+    with open(os.path.join(tmp_path, "text.bin"), "wb") as text_file:
+        for chunk in pd.read_csv(csv_path, usecols=lambda c: c in COLUMNS, chunksize=PARSE_CHUNK_ROWS):
+            n = len(chunk)
+            text = chunk["cleaned_text"] if "cleaned_text" in chunk else pd.Series([np.nan] * n)
+            sentiment = chunk["sentiment"] if "sentiment" in chunk else pd.Series([np.nan] * n)
+
+            is_null = text.isna().to_numpy()
+            values = text.where(~is_null, "").astype(str).tolist()
+            encoded = [v.encode("utf-8") for v in values]
+            text_file.write(b"".join(encoded))
+
+            byte_lens = np.fromiter(map(len, encoded), dtype=np.int64, count=n)
+            char_lens = np.fromiter(map(len, values), dtype=np.int64, count=n)
+            byte_parts.append(byte_parts[-1][-1] + np.cumsum(byte_lens))
+            char_parts.append(char_parts[-1][-1] + np.cumsum(char_lens))
+            nulls.append(is_null)
+
+            # 감정 값은 처음 본 순서대로 카테고리 번호 부여, 결측은 -1
+            for value in sentiment.dropna().unique():
+                categories.setdefault(value, len(categories))
+            sentiments.append(sentiment.map(categories).fillna(-1).to_numpy().astype(np.int8))
+
+    byte_offsets = np.concatenate(byte_parts)
+    char_offsets = np.concatenate(char_parts)
+    np.save(os.path.join(tmp_path, "byte_offsets.npy"), byte_offsets)
+    np.save(os.path.join(tmp_path, "char_offsets.npy"), char_offsets)
+    np.save(os.path.join(tmp_path, "text_null.npy"), np.concatenate(nulls) if nulls else np.zeros(0, bool))
+    np.save(os.path.join(tmp_path, "sentiment.npy"), np.concatenate(sentiments) if sentiments else np.zeros(0, np.int8))
+    with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+        json.dump({
+            "version": CACHE_VERSION,
+            "etag": etag,
+            "rows": len(byte_offsets) - 1,
+            "categories": sorted(categories, key=categories.get),
+        }, f)
+
+    # 완성된 캐시만 보이도록 디렉터리 단위로 교체
+    if os.path.exists(path):
+        old_path = path + ".old"
+        os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        for name in os.listdir(old_path):
+            os.remove(os.path.join(old_path, name))
+        os.rmdir(old_path)
+    else:
+        os.replace(tmp_path, path)
+
+
+# S3 객체를 한 번만 받아 캐시하고, ETag가 바뀌었을 때만 다시 받음
+def ensure_cached(key, bucket=S3_BUCKET):
+    path = cache_path(key)
+    meta = _read_meta(path)
+
+    try:
+        etag = remote_etag(key, bucket)
+    except Exception as e:
+        if meta is not None:
+            print(f"⚠️ Could not check ETag for {key} ({e}), using local cache")
+            return path
+        raise
+
+    if meta is not None and meta.get("etag") == etag:
+        return path
+
+    print(f"📥 Caching s3://{bucket}/{key} ...")
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    local_csv = path + ".csv"
+    s3.download_file(bucket, key, local_csv)
+    try:
+        build_cache(local_csv, path, etag)
+    finally:
+        if os.path.exists(local_csv):
+            os.remove(local_csv)
+    print(f"✅ Cached {key} -> {path}")
+    return path
+
+
+# memory-map된 컬럼 묶음
+class ColumnarDataset:
+    def __init__(self, path):
+        self.path = path
+        self.meta = _read_meta(path)
+        self.rows = self.meta["rows"]
+        self.categories = self.meta["categories"]
+
+        text_size = os.path.getsize(os.path.join(path, "text.bin"))
+        if text_size:
+            self.text_bytes = np.memmap(os.path.join(path, "text.bin"), dtype=np.uint8, mode="r")
+        else:
+            self.text_bytes = np.zeros(0, dtype=np.uint8)
+        self.byte_offsets = np.load(os.path.join(path, "byte_offsets.npy"), mmap_mode="r")
+        self.char_offsets = np.load(os.path.join(path, "char_offsets.npy"), mmap_mode="r")
+        self.text_null = np.load(os.path.join(path, "text_null.npy"), mmap_mode="r")
+        self.sentiment_codes = np.load(os.path.join(path, "sentiment.npy"), mmap_mode="r")
+
+    def __len__(self):
+        return self.rows
+
+    # [start, stop) 행의 텍스트 목록 (결측은 None): 구간 전체를 한 번에 decode 후 슬라이싱
+    def texts(self, start=0, stop=None):
+        stop = self.rows if stop is None else stop
+        b0, b1 = int(self.byte_offsets[start]), int(self.byte_offsets[stop])
+        joined = self.text_bytes[b0:b1].tobytes().decode("utf-8")
+        c = (self.char_offsets[start:stop + 1] - self.char_offsets[start]).tolist()
+        nulls = self.text_null[start:stop].tolist()
+        return [None if nulls[i] else joined[c[i]:c[i + 1]] for i in range(stop - start)]
+
+    def sentiments(self, start=0, stop=None):
+        stop = self.rows if stop is None else stop
+        codes = np.asarray(self.sentiment_codes[start:stop])
+        return pd.Categorical.from_codes(codes, categories=self.categories)
+
+    def to_frame(self, start=0, stop=None, columns=COLUMNS):
+        data = {}
+        if "cleaned_text" in columns:
+            data["cleaned_text"] = pd.Series(self.texts(start, stop), dtype=object)
+        if "sentiment" in columns:
+            data["sentiment"] = pd.Series(self.sentiments(start, stop))
+        return pd.DataFrame(data)
+
+
+def open_dataset(key, bucket=S3_BUCKET):
+    return ColumnarDataset(ensure_cached(key, bucket))
+
+
+# 스크립트에서 pd.read_csv 대신 사용: cleaned_text/sentiment 컬럼만 빠르게 로드
+def load_frame(key, bucket=S3_BUCKET, columns=COLUMNS):
+    return open_dataset(key, bucket).to_frame(columns=columns)
+
+
+# ---------------- 벤치마크: pd.read_csv vs 캐시 (cold / warm) ----------------
+
+def bench_cache(csv_path):
+    results = {}
+
+    start = time.perf_counter()
+    df_csv = pd.read_csv(csv_path)
+    results["read_csv"] = time.perf_counter() - start
+
+    path = os.path.join(CACHE_DIR, "bench__" + os.path.basename(csv_path))
+    start = time.perf_counter()
+    build_cache(csv_path, path)
+    df_cold = ColumnarDataset(path).to_frame()
+    results["cold (convert + load)"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df_warm = ColumnarDataset(path).to_frame()
+    results["warm load"] = time.perf_counter() - start
+
+    assert len(df_csv) == len(df_cold) == len(df_warm)
+    for name, elapsed in results.items():
+        print(f"{name:22s}: {elapsed:.4f}s")
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        bench_cache(sys.argv[1])
+    else:
+        for percent in [25, 50, 75, 100]:
+            ensure_cached(f"cleaned/cleaned_books_{percent}.csv")
@@ -0,0 +1,196 @@
+import bisect
+import hashlib
+import threading
+import time
+
+# 실제 Kinesis 샤드 한도 (초당)
+PUT_RECORDS_PER_SEC = 1000
+PUT_BYTES_PER_SEC = 1024 * 1024
+GET_CALLS_PER_SEC = 5
+GET_BYTES_PER_SEC = 2 * 1024 * 1024
+MAX_GET_LIMIT = 10000
+ITERATOR_TTL_SECONDS = 300
+HASH_SPACE = 2 ** 128
+
+
+# boto3 예외와 같은 이름 (KinesisSender/KinesisConsumer는 예외 이름으로 구분)
+class ProvisionedThroughputExceededException(Exception):
+    pass
+
+
+class ExpiredIteratorException(Exception):
+    pass
+
+
+class ResourceNotFoundException(Exception):
+    pass
+
+
+# 초당 rate만큼 채워지는 토큰 버킷 (rate가 None이면 무제한)
+class TokenBucket:
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate or 0
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    # 차감 없이 확인만 (여러 버킷을 모두 통과할 때만 차감하기 위해)
+    def can_take(self, amount):
+        if self.rate is None:
+            return True
+        self._refill()
+        return self.tokens >= amount
+
+    def take(self, amount):
+        if not self.can_take(amount):
+            return False
+        if self.rate is not None:
+            self.tokens -= amount
+        return True
+
+
+class FakeShard:
+    def __init__(self, shard_id, start_hash, end_hash, limits):
+        self.shard_id = shard_id
+        self.start_hash = start_hash
+        self.end_hash = end_hash
+        self.sequences = []
+        self.arrivals = []
+        self.records = []
+        self.put_records = TokenBucket(limits["put_records"])
+        self.put_bytes = TokenBucket(limits["put_bytes"])
+        self.get_calls = TokenBucket(limits["get_calls"])
+        self.get_bytes = TokenBucket(limits["get_bytes"])
+
+
+# boto3 Kinesis 클라이언트 대신 쓸 수 있는 프로세스 내 가짜 스트림
+# - put_records / describe_stream / get_shard_iterator / get_records 만 구현
+# - 파티션 키의 MD5로 샤드 배정, 샤드별 초당 한도를 토큰 버킷으로 흉내
+#   (put 한도 초과는 레코드별 ErrorCode, get 한도 초과는 예외)
+# - limits의 값을 None으로 주면 해당 한도 없음
+class FakeKinesis:
+    def __init__(self, shard_count=2, stream_name="book-reviews-stream", put_records_per_sec=PUT_RECORDS_PER_SEC,
+                 put_bytes_per_sec=PUT_BYTES_PER_SEC, get_calls_per_sec=GET_CALLS_PER_SEC,
+                 get_bytes_per_sec=GET_BYTES_PER_SEC):
+        self.stream_name = stream_name
+        limits = {"put_records": put_records_per_sec, "put_bytes": put_bytes_per_sec,
+                  "get_calls": get_calls_per_sec, "get_bytes": get_bytes_per_sec}
+        step = HASH_SPACE // shard_count
+        self.shards = [
+            FakeShard(f"shardId-{i:012d}", i * step, HASH_SPACE - 1 if i == shard_count - 1 else (i + 1) * step - 1,
+                      limits)
+            for i in range(shard_count)
+        ]
+        self._by_id = {s.shard_id: s for s in self.shards}
+        self._lock = threading.Lock()
+        self._next_sequence = 1
+        self.throttled_puts = 0
+        self.throttled_gets = 0
+
+    def _check_stream(self, name):
+        if name != self.stream_name:
+            raise ResourceNotFoundException(f"Stream {name} not found")
+
+    def _shard_for(self, partition_key):
+        h = int(hashlib.md5(partition_key.encode("utf-8")).hexdigest(), 16)
+        return self.shards[min(len(self.shards) - 1, h // (HASH_SPACE // len(self.shards)))]
+
+    def put_records(self, StreamName, Records):
+        self._check_stream(StreamName)
+        results = []
+        failed = 0
+        now = time.time()
+        with self._lock:
+            for record in Records:
+                data = record["Data"]
+                if isinstance(data, str):
+                    data = data.encode("utf-8")
+                shard = self._shard_for(record["PartitionKey"])
+                # 레코드 수/바이트 한도를 모두 확인한 뒤에만 차감 (거절된 레코드는 한도를 쓰지 않음)
+                if not shard.put_records.can_take(1) or not shard.put_bytes.can_take(len(data)):
+                    failed += 1
+                    self.throttled_puts += 1
+                    results.append({"ErrorCode": "ProvisionedThroughputExceededException",
+                                    "ErrorMessage": f"Rate exceeded for shard {shard.shard_id}"})
+                    continue
+                shard.put_records.take(1)
+                shard.put_bytes.take(len(data))
+                sequence = f"{self._next_sequence:056d}"
+                self._next_sequence += 1
+                shard.sequences.append(sequence)
+                shard.arrivals.append(now)
+                shard.records.append({"SequenceNumber": sequence, "Data": data,
+                                      "PartitionKey": record["PartitionKey"], "ApproximateArrivalTimestamp": now})
+                results.append({"SequenceNumber": sequence, "ShardId": shard.shard_id})
+        return {"FailedRecordCount": failed, "Records": results}
+
+    def describe_stream(self, StreamName):
+        self._check_stream(StreamName)
+        return {"StreamDescription": {
+            "StreamName": self.stream_name,
+            "StreamStatus": "ACTIVE",
+            "Shards": [{"ShardId": s.shard_id,
+                        "HashKeyRange": {"StartingHashKey": str(s.start_hash), "EndingHashKey": str(s.end_hash)}}
+                       for s in self.shards],
+        }}
+
+    # iterator = "shard_id|다음 위치|발급 시각"
+    def get_shard_iterator(self, StreamName, ShardId, ShardIteratorType, StartingSequenceNumber=None, Timestamp=None):
+        self._check_stream(StreamName)
+        shard = self._by_id[ShardId]
+        with self._lock:
+            if ShardIteratorType == "TRIM_HORIZON":
+                position = 0
+            elif ShardIteratorType == "LATEST":
+                position = len(shard.records)
+            elif ShardIteratorType == "AT_SEQUENCE_NUMBER":
+                position = bisect.bisect_left(shard.sequences, StartingSequenceNumber)
+            elif ShardIteratorType == "AFTER_SEQUENCE_NUMBER":
+                position = bisect.bisect_right(shard.sequences, StartingSequenceNumber)
+            elif ShardIteratorType == "AT_TIMESTAMP":
+                # boto3처럼 datetime 또는 epoch 초
+                ts = Timestamp.timestamp() if hasattr(Timestamp, "timestamp") else float(Timestamp)
+                position = bisect.bisect_left(shard.arrivals, ts)
+            else:
+                raise ValueError(f"Unsupported iterator type {ShardIteratorType}")
+        return {"ShardIterator": f"{ShardId}|{position}|{time.time()}"}
+
+    def get_records(self, ShardIterator, Limit=MAX_GET_LIMIT):
+        shard_id, position, issued = ShardIterator.split("|")
+        position = int(position)
+        if time.time() - float(issued) > ITERATOR_TTL_SECONDS:
+            raise ExpiredIteratorException(f"Iterator for {shard_id} expired")
+        shard = self._by_id[shard_id]
+
+        with self._lock:
+            if not shard.get_calls.take(1):
+                self.throttled_gets += 1
+                raise ProvisionedThroughputExceededException(f"GetRecords rate exceeded for {shard_id}")
+            records = shard.records[position:position + min(Limit, MAX_GET_LIMIT)]
+            size = sum(len(r["Data"]) for r in records)
+            # 바이트 한도를 넘으면 이번 호출은 실패 (실제 Kinesis와 같이 이후 호출도 지연됨)
+            if records and not shard.get_bytes.take(min(size, shard.get_bytes.rate or size)):
+                self.throttled_gets += 1
+                raise ProvisionedThroughputExceededException(f"GetRecords bytes exceeded for {shard_id}")
+            end = position + len(records)
+            behind = 0
+            if end < len(shard.records):
+                behind = int((time.time() - shard.records[end]["ApproximateArrivalTimestamp"]) * 1000)
+
+        return {
+            "Records": [dict(r) for r in records],
+            "NextShardIterator": f"{shard_id}|{end}|{time.time()}",
+            "MillisBehindLatest": behind,
+        }
+
+    def stats(self):
+        with self._lock:
+            return {
+                "records": {s.shard_id: len(s.records) for s in self.shards},
+                "throttled_puts": self.throttled_puts,
+                "throttled_gets": self.throttled_gets,
+            }
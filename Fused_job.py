@@ -0,0 +1,222 @@
+import multiprocessing as mp
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+from Sentiment_engine import to_categorical
+from Word_engine import count_arrays, pack_arrays, unpack_arrays, WordCounts, MAPREDUCE_STRIP
+
+LENGTH_BINS = [0, 100, 250, 500, 1000, 2000, 5000, 10000]
+CHUNK_ROWS = 50000
+
+
+# 워커가 chunk 하나를 한 번만 훑도록 공유되는 중간 결과
+# - 감정별로 행을 묶어 토큰화/집계를 한 번 수행 → 전체 단어 수와 감정별 단어 수가 같은 결과를 공유
+# - 감정 라벨은 소문자로 통합, 감정이 없는 행은 None 그룹
+class ChunkView:
+    def __init__(self, texts, sentiments, strip_pattern=None, coerce=False):
+        self.texts = texts
+        self.sentiments = to_categorical(sentiments)
+        self.strip_pattern = strip_pattern
+        self.coerce = coerce
+        self._labels = None
+        self._groups = None
+
+    # 행별 감정 라벨 코드 (-1 = 없음)와 라벨 이름
+    def labels(self):
+        if self._labels is None:
+            names = []
+            remap = np.full(len(self.sentiments.categories) + 1, -1, dtype=np.int64)
+            for code, name in enumerate(self.sentiments.categories):
+                if isinstance(name, str):
+                    label = name.lower()
+                    if label not in names:
+                        names.append(label)
+                    remap[code] = names.index(label)
+            codes = remap[np.asarray(self.sentiments.codes, dtype=np.int64)]
+            self._labels = (codes, names)
+        return self._labels
+
+    # {라벨(또는 None): (고유 단어, count 배열)}
+    def word_groups(self):
+        if self._groups is None:
+            codes, names = self.labels()
+            self._groups = {}
+            for code in np.unique(codes).tolist():
+                idx = np.flatnonzero(codes == code).tolist()
+                texts = [self.texts[i] for i in idx]
+                if not self.coerce:
+                    texts = [t for t in texts if isinstance(t, str)]
+                else:
+                    texts = [t for t in texts if t is not None and t == t]
+                label = names[code] if code >= 0 else None
+                self._groups[label] = count_arrays(texts, self.strip_pattern, self.coerce)
+        return self._groups
+
+    def lengths(self):
+        return np.fromiter((len(t) for t in self.texts if isinstance(t, str) and t),
+                           dtype=np.int64)
+
+
+# ---------------- 집계 종류 ----------------
+# map(view) → 부분 결과 (워커에서, IPC로 보낼 수 있는 형태)
+# initial() / fold(state, partial) → 부모에서 누적 / finalize(state) → 최종 결과
+
+class TopWords:
+    def __init__(self, top_n=10):
+        self.top_n = top_n
+
+    def map(self, view):
+        total = WordCounts()
+        for words, counts in view.word_groups().values():
+            total.add(words, counts)
+        return pack_arrays(total.words, total.counts[:len(total)])
+
+    def initial(self):
+        return WordCounts()
+
+    def fold(self, state, partial):
+        return state.add_packed(partial)
+
+    def finalize(self, state):
+        return state.most_common(self.top_n)
+
+
+class SentimentDistribution:
+    def map(self, view):
+        codes, names = view.labels()
+        counts = np.bincount(codes[codes >= 0], minlength=len(names))
+        return dict(zip(names, counts.tolist()))
+
+    def initial(self):
+        return Counter()
+
+    def fold(self, state, partial):
+        state.update(partial)
+        return state
+
+    def finalize(self, state):
+        return dict(state)
+
+
+class SentimentTopWords:
+    def __init__(self, top_n=10):
+        self.top_n = top_n
+
+    def map(self, view):
+        return {label: pack_arrays(*pair) for label, pair in view.word_groups().items() if label is not None}
+
+    def initial(self):
+        return {}
+
+    def fold(self, state, partial):
+        for label, packed in partial.items():
+            state.setdefault(label, WordCounts()).add(*unpack_arrays(packed))
+        return state
+
+    def finalize(self, state):
+        return {label: counts.most_common(self.top_n) for label, counts in state.items()}
+
+
+# 리뷰 길이(문자 수) 히스토그램, 마지막 구간은 상한 없음 (결측/빈 리뷰 제외)
+class LengthHistogram:
+    def __init__(self, bins=LENGTH_BINS):
+        self.bins = list(bins)
+
+    def map(self, view):
+        idx = np.searchsorted(self.bins, view.lengths(), side="right") - 1
+        return np.bincount(idx[idx >= 0], minlength=len(self.bins))
+
+    def initial(self):
+        return np.zeros(len(self.bins), dtype=np.int64)
+
+    def fold(self, state, partial):
+        return state + partial
+
+    def finalize(self, state):
+        labels = [f"{lo}-{hi - 1}" for lo, hi in zip(self.bins, self.bins[1:])] + [f"{self.bins[-1]}+"]
+        return dict(zip(labels, state.tolist()))
+
+
+# 여러 집계를 등록해 두고 chunk마다 한 번의 스캔으로 모두 계산
+#   job = FusedJob().register("top_words", TopWords(10)).register("sentiment", SentimentDistribution())
+#   results = job.run_sequential(texts, sentiments)  → {"top_words": [...], "sentiment": {...}}
+class FusedJob:
+    def __init__(self, strip_pattern=None, coerce=False):
+        self.strip_pattern = strip_pattern
+        self.coerce = coerce
+        self.aggregations = {}
+
+    def register(self, name, aggregation):
+        self.aggregations[name] = aggregation
+        return self
+
+    # 워커: chunk 하나 → {집계 이름: 부분 결과}
+    def map_chunk(self, texts, sentiments):
+        view = ChunkView(texts, sentiments, self.strip_pattern, self.coerce)
+        return {name: agg.map(view) for name, agg in self.aggregations.items()}
+
+    def initial(self):
+        return {name: agg.initial() for name, agg in self.aggregations.items()}
+
+    def fold(self, state, partials):
+        for name, agg in self.aggregations.items():
+            state[name] = agg.fold(state[name], partials[name])
+        return state
+
+    def finalize(self, state):
+        return {name: agg.finalize(state[name]) for name, agg in self.aggregations.items()}
+
+    def run_sequential(self, texts, sentiments, chunk_rows=CHUNK_ROWS):
+        state = self.initial()
+        for i in range(0, len(texts), chunk_rows):
+            state = self.fold(state, self.map_chunk(texts[i:i + chunk_rows], sentiments[i:i + chunk_rows]))
+        return self.finalize(state)
+
+    def run_parallel(self, pool, texts, sentiments, chunk_rows=CHUNK_ROWS):
+        tasks = ((self, texts[i:i + chunk_rows], sentiments[i:i + chunk_rows])
+                 for i in range(0, len(texts), chunk_rows))
+        state = self.initial()
+        for partials in pool.imap_unordered(map_task, tasks):
+            state = self.fold(state, partials)
+        return self.finalize(state)
+
+
+def map_task(task):
+    job, texts, sentiments = task
+    return job.map_chunk(texts, sentiments)
+
+
+# Hybrid 스크립트 기본 구성: 상위 단어, 감정 분포, 감정별 상위 단어, 리뷰 길이 분포
+def default_job(top_n=10, strip_pattern=None, coerce=False):
+    return (FusedJob(strip_pattern, coerce)
+            .register("top_words", TopWords(top_n))
+            .register("sentiment", SentimentDistribution())
+            .register("sentiment_top_words", SentimentTopWords(top_n))
+            .register("length_histogram", LengthHistogram()))
+
+
+def print_results(results):
+    for name, value in results.items():
+        print(f"📦 {name}: {value}")
+
+
+# MapReduce_wordcount + MapReduce_sentiment를 한 번의 로드/스캔으로 실행
+#   python Fused_job.py [percent]
+if __name__ == "__main__":
+    from Dataset_cache import load_frame
+
+    percent = int(sys.argv[1]) if len(sys.argv) > 1 else 25
+    df = load_frame(f"cleaned/cleaned_books_{percent}.csv")
+    texts = df["cleaned_text"].tolist()
+    sentiments = df["sentiment"].array
+
+    job = default_job(strip_pattern=MAPREDUCE_STRIP, coerce=True)
+    start = time.time()
+    with mp.Pool(mp.cpu_count()) as pool:
+        results = job.run_parallel(pool, texts, sentiments)
+    elapsed = time.time() - start
+    print(f"⏱️ Fused pass over {len(texts)} rows: {elapsed:.2f}s | 📈 {len(texts) / elapsed:.2f} rows/s")
+    print_results(results)
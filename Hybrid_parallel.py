@@ -2,79 +2,72 @@ import pandas as pd
 import time
 import csv
 import os
+import sys
 from collections import Counter
 from multiprocessing import Pool
 import boto3
+from Dataset_cache import load_frame
+from Sentiment_engine import count_sentiments_vectorized, PARALLEL_MIN_ROWS
+from Shared_columns import (SharedColumns, split_ranges, attach_worker, count_words_range, count_sentiments_range,
+                            fused_range)
+from Word_engine import count_arrays, WordCounts
+from Task_scheduler import adaptive_map, print_worker_report
+from Load_sweep import parse_loads, is_incremental, is_fused, incremental_sweep, sweep_row, print_sweep_row
+from Fused_job import default_job, print_results
 
 S3_BUCKET = "bookreview-results"
 S3_KEY = "cleaned/cleaned_books_100.csv"
-LOCAL_FILE = "temp_100.csv"
 OUTPUT_FILE = "benchmark_metrics_parallel.csv"
-LOADS = [25, 50, 75, 100]  # 데이터 비율 (%)
-NUM_PROCESSES = 4
-
-def download_from_s3():
-    print("\n📥 Downloading data from S3...")
-    s3 = boto3.client("s3")
-    s3.download_file(S3_BUCKET, S3_KEY, LOCAL_FILE)
-    print("✅ complete  Download")
+# --fused 결과는 task 구성이 달라 benchmark_plot.py가 읽는 파일과 따로 저장
+FUSED_OUTPUT_FILE = "benchmark_metrics_parallel_fused.csv"
+LOADS = parse_loads(default=[25, 50, 75, 100])  # 데이터 비율 (%), --step N으로 변경 가능
+NUM_PROCESSES = int(sys.argv[sys.argv.index("--processes") + 1]) if "--processes" in sys.argv else 4
 
+# 벡터화 토큰화 + bincount (text.lower().split()과 같은 결과)
 def word_count(texts):
-    counter = Counter()
-    for text in texts:
-        if isinstance(text, str):
-            words = text.lower().split()
-            counter.update(words)
-    return counter
-
-def parallel_wordcount(texts):
-    chunk_size = len(texts) // NUM_PROCESSES
-    chunks = [texts[i*chunk_size:(i+1)*chunk_size] for i in range(NUM_PROCESSES)]
-    with Pool(processes=NUM_PROCESSES) as pool:
-        results = pool.map(word_count, chunks)
-    total = Counter()
-    for part in results:
-        total.update(part)
-    return total
+    words, counts = count_arrays(texts)
+    return Counter(dict(zip(words, counts.tolist())))
 
+# 워커는 공유 메모리에서 자기 행 범위만 읽고 (고유 단어, count 배열)을 압축해서 반환
+# 작업은 보정으로 정한 크기의 텍스트 바이트 균형 구간, 먼저 끝난 워커가 다음 구간을 가져감
+def parallel_wordcount(pool, columns, start, end, num_workers=None):
+    total, report = adaptive_map(pool, count_words_range, lambda s, e: (s, e), columns.offsets,
+                                 start, end, WordCounts.add_packed, WordCounts(), num_workers or NUM_PROCESSES)
+    print_worker_report(report)
+    return total.to_counter()
 
+
+# categorical 코드 + bincount (문자열이 아닌 값 제외, 대소문자 통합)
 def sentiment_count(sentiments):
-    counter = Counter()
-    for s in sentiments:
-        if isinstance(s, str):
-            counter[s.lower()] += 1
-    return counter
-
-def parallel_sentiment(sentiments):
-    chunk_size = len(sentiments) // NUM_PROCESSES
-    chunks = [sentiments[i*chunk_size:(i+1)*chunk_size] for i in range(NUM_PROCESSES)]
-    with Pool(processes=NUM_PROCESSES) as pool:
-        results = pool.map(sentiment_count, chunks)
+    return count_sentiments_vectorized(sentiments)
+
+# 3가지 값뿐인 컬럼이라 대부분 벡터 연산 한 번이 더 빠름, 충분히 클 때만 pool 사용
+def parallel_sentiment(pool, columns, start, end, num_workers=None, min_parallel_rows=PARALLEL_MIN_ROWS):
+    if end - start < min_parallel_rows:
+        return sentiment_count(columns.sentiments(start, end))
     total = Counter()
-    for part in results:
+    for part in pool.map(count_sentiments_range, split_ranges(start, end, num_workers or NUM_PROCESSES)):
         total.update(part)
     return total
 
 
-def run_parallel_tasks():
-    download_from_s3()
-    df = pd.read_csv(LOCAL_FILE)
-    total_rows = len(df)
+# 단계마다 df.iloc[:n]을 처음부터 다시 계산 (기존 방식)
+def run_prefix_loads(pool, columns):
+    total_rows = len(columns)
 
     results = []
 
     for pct in LOADS:
-        subset = df.iloc[: total_rows * pct // 100]
+        records = total_rows * pct // 100
 
         # --- 워드카운트 ---
-        texts = subset["cleaned_text"].tolist()
         print(f"\n🚀 Parallel WordCount start ({pct}%)")
         start = time.time()
-        word_counter = parallel_wordcount(texts)
+        word_counter = parallel_wordcount(pool, columns, 0, records)
         end = time.time()
         elapsed = end - start
-        throughput = len(texts) / elapsed
-        latency = elapsed / len(texts)
+        throughput = records / elapsed
+        latency = elapsed / records
         
         print("=========================================")
         print(f"1. Processing Time: {elapsed:.4f} sec")
@@ -85,21 +78,20 @@ def run_parallel_tasks():
             "type": "parallel",
             "task": "wordcount",
             "percent": pct,
-            "records": len(texts),
+            "records": records,
             "time_sec": round(elapsed, 4),
             "throughput_rps": round(throughput, 2),
             "latency_spr": round(latency, 6)
         })
 
         # --- 감정 분석 ---
-        sentiments = subset["sentiment"].tolist()
         print(f"\n🚀 Parallel Sentiment start ({pct}%)")
         start = time.time()
-        sentiment_counter = parallel_sentiment(sentiments)
+        sentiment_counter = parallel_sentiment(pool, columns, 0, records)
         end = time.time()
         elapsed = end - start
-        throughput = len(sentiments) / elapsed
-        latency = max(elapsed / len(sentiments), 1e-6)
+        throughput = records / elapsed
+        latency = max(elapsed / records, 1e-6)
         
         print("=========================================")
         print(f"1. Processing Time: {elapsed:.4f} sec")
@@ -110,23 +102,112 @@ def run_parallel_tasks():
             "type": "parallel",
             "task": "sentiment",
             "percent": pct,
-            "records": len(sentiments),
+            "records": records,
             "time_sec": round(elapsed, 4),
             "throughput_rps": round(throughput, 2),
             "latency_spr": round(latency, 6)
         })
 
+    return results
+
+
+# 증분 스윕: 0–25, 25–50, ... 구간만 처리해 누적 Counter에 합침
+def run_incremental_loads(pool, columns):
+    total_rows = len(columns)
+    results = []
+
+    def fold(total, part):
+        total.update(part)
+        return total
+
+    print(f"\n🚀 Parallel WordCount incremental sweep {LOADS}")
+    for pct, delta, records, delta_sec, total_sec, _ in incremental_sweep(
+            total_rows, LOADS, lambda start, end: parallel_wordcount(pool, columns, start, end), fold, Counter()):
+        row = sweep_row("parallel", "wordcount", pct, delta, records, delta_sec, total_sec)
+        print(f"\n📈 WordCount ({pct}%)")
+        print_sweep_row(row)
+        results.append(row)
+
+    print(f"\n🚀 Parallel Sentiment incremental sweep {LOADS}")
+    for pct, delta, records, delta_sec, total_sec, _ in incremental_sweep(
+            total_rows, LOADS, lambda start, end: parallel_sentiment(pool, columns, start, end), fold, Counter()):
+        row = sweep_row("parallel", "sentiment", pct, delta, records, delta_sec, total_sec)
+        print(f"\n📈 Sentiment ({pct}%)")
+        print_sweep_row(row)
+        results.append(row)
+
+    return results
+
+
+# 단일 스캔: 워드카운트/감정 분포/감정별 상위 단어/길이 분포를 같은 워커가 한 번에 계산
+def run_fused_loads(pool, columns):
+    total_rows = len(columns)
+    job = default_job()
+    results = []
+
+    for pct in LOADS:
+        records = total_rows * pct // 100
+        print(f"\n🚀 Parallel fused pass start ({pct}%)")
+        start = time.time()
+        state, report = adaptive_map(pool, fused_range, lambda s, e: (job, s, e), columns.offsets,
+                                     0, records, job.fold, job.initial(), NUM_PROCESSES)
+        fused = job.finalize(state)
+        elapsed = time.time() - start
+        throughput = records / elapsed
+        latency = elapsed / records
+
+        print("=========================================")
+        print(f"1. Processing Time: {elapsed:.4f} sec")
+        print(f"2. Throughput: {throughput:.2f} records/sec")
+        print(f"3. Latency: {latency:.6f} sec/record")
+        print_worker_report(report)
+        print_results(fused)
+
+        results.append({
+            "type": "parallel",
+            "task": "fused",
+            "percent": pct,
+            "records": records,
+            "time_sec": round(elapsed, 4),
+            "throughput_rps": round(throughput, 2),
+            "latency_spr": round(latency, 6)
+        })
+
+    return results
+
+
+def run_parallel_tasks():
+    # 로컬 컬럼형 캐시에서 로드 (ETag가 같으면 다시 받지 않음)
+    df = load_frame(S3_KEY, S3_BUCKET)
+
+    # 텍스트/감정 컬럼은 공유 메모리에 한 번만 올리고, 실행 전체에서 pool 하나를 재사용
+    columns = SharedColumns.from_frame(df)
+    del df
+    # 작업 크기 보정은 부모에서 첫 구간을 직접 처리하며 측정하므로 부모도 attach
+    attach_worker(columns)
+    try:
+        with Pool(processes=NUM_PROCESSES, initializer=attach_worker, initargs=(columns,)) as pool:
+            # --incremental: 단계마다 새로 추가된 구간만 처리 / 기본: 단계마다 처음부터 다시 계산
+            # --fused: 모든 집계를 한 번의 스캔으로 계산
+            if is_fused():
+                results = run_fused_loads(pool, columns)
+            elif is_incremental():
+                results = run_incremental_loads(pool, columns)
+            else:
+                results = run_prefix_loads(pool, columns)
+    finally:
+        columns.close()
+        columns.unlink()
+
     # 결과 CSV 저장
-    with open(OUTPUT_FILE, "w", newline="") as f:
+    output_file = FUSED_OUTPUT_FILE if is_fused() else OUTPUT_FILE
+    with open(output_file, "w", newline="") as f:
         writer = csv.DictWriter(f, fieldnames=results[0].keys())
         writer.writeheader()
         writer.writerows(results)
 
-    print(f"\n✅ complete: {OUTPUT_FILE}")
-
-    # 임시 파일 삭제
-    if os.path.exists(LOCAL_FILE):
-        os.remove(LOCAL_FILE)
+    print(f"\n✅ complete: {output_file}")
+    return output_file
 
 def upload_to_s3(local_file, bucket, s3_key):
     s3 = boto3.client("s3")
@@ -137,5 +218,5 @@ def upload_to_s3(local_file, bucket, s3_key):
         print(f"❌ Failed to upload to S3: {e}")
 
 if __name__ == "__main__":
-    run_parallel_tasks()
-    upload_to_s3("benchmark_metrics_parallel.csv", "bookreview-results", "hybrid/benchmark_metrics_parallel.csv")
\ No newline at end of file
+    output_file = run_parallel_tasks()
+    upload_to_s3(output_file, "bookreview-results", f"hybrid/{output_file}")
\ No newline at end of file
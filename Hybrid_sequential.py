@@ -4,42 +4,34 @@ import csv
 import os
 from collections import Counter
 import boto3
+from Dataset_cache import load_frame
+from Sentiment_engine import count_sentiments_vectorized
+from Word_engine import count_arrays
+from Load_sweep import parse_loads, is_incremental, is_fused, incremental_sweep, sweep_row, print_sweep_row
+from Fused_job import default_job, print_results
 
 
 S3_BUCKET = "bookreview-results"
 S3_KEY = "cleaned/cleaned_books_100.csv"
-LOCAL_FILE = "temp_100.csv"
 OUTPUT_FILE = "benchmark_metrics_sequential.csv"
-LOADS = [25, 50, 75, 100]  # 데이터 비율 (%)
-
-
-def download_from_s3():
-    print("\n📥 Downloading data from S3...")
-    s3 = boto3.client("s3")
-    s3.download_file(S3_BUCKET, S3_KEY, LOCAL_FILE)
-    print("✅ complete  Download")
+# --fused 결과는 task 구성이 달라 benchmark_plot.py가 읽는 파일과 따로 저장
+FUSED_OUTPUT_FILE = "benchmark_metrics_sequential_fused.csv"
+LOADS = parse_loads(default=[25, 50, 75, 100])  # 데이터 비율 (%), --step N으로 변경 가능
 
 
+# 벡터화 토큰화 + bincount (text.lower().split()과 같은 결과)
 def word_count(texts):
-    counter = Counter()
-    for text in texts:
-        if isinstance(text, str):
-            words = text.lower().split()
-            counter.update(words)
-    return counter
+    words, counts = count_arrays(texts)
+    return Counter(dict(zip(words, counts.tolist())))
 
 
+# categorical 코드 + bincount (문자열이 아닌 값 제외, 대소문자 통합)
 def sentiment_count(sentiments):
-    counter = Counter()
-    for s in sentiments:
-        if isinstance(s, str):
-            counter[s.lower()] += 1
-    return counter
+    return count_sentiments_vectorized(sentiments)
 
 
-def run_sequential_tasks():
-    download_from_s3()
-    df = pd.read_csv(LOCAL_FILE)
+# 단계마다 df.iloc[:n]을 처음부터 다시 계산 (기존 방식)
+def run_prefix_loads(df):
     total_rows = len(df)
 
     results = []
@@ -97,17 +89,97 @@ def run_sequential_tasks():
             "latency_spr": round(latency, 6)
         })
 
+    return results
+
+
+# 증분 스윕: 0–25, 25–50, ... 구간만 처리해 누적 Counter에 합침
+def run_incremental_loads(df):
+    total_rows = len(df)
+    texts = df["cleaned_text"].tolist()
+    sentiments = df["sentiment"].tolist()
+    results = []
+
+    def fold(total, part):
+        total.update(part)
+        return total
+
+    print(f"\n🚀 Sequential WordCount incremental sweep {LOADS}")
+    for pct, delta, records, delta_sec, total_sec, _ in incremental_sweep(
+            total_rows, LOADS, lambda start, end: word_count(texts[start:end]), fold, Counter()):
+        row = sweep_row("sequential", "wordcount", pct, delta, records, delta_sec, total_sec)
+        print(f"\n📈 WordCount ({pct}%)")
+        print_sweep_row(row)
+        results.append(row)
+
+    print(f"\n🚀 Sequential Sentiment incremental sweep {LOADS}")
+    for pct, delta, records, delta_sec, total_sec, _ in incremental_sweep(
+            total_rows, LOADS, lambda start, end: sentiment_count(sentiments[start:end]), fold, Counter()):
+        row = sweep_row("sequential", "sentiment", pct, delta, records, delta_sec, total_sec)
+        print(f"\n📈 Sentiment ({pct}%)")
+        print_sweep_row(row)
+        results.append(row)
+
+    return results
+
+
+# 단일 스캔: 워드카운트/감정 분포/감정별 상위 단어/길이 분포를 chunk마다 한 번에 계산
+def run_fused_loads(df):
+    total_rows = len(df)
+    job = default_job()
+    texts = df["cleaned_text"].tolist()
+    sentiments = df["sentiment"].array
+    results = []
+
+    for pct in LOADS:
+        records = total_rows * pct // 100
+        print(f"\n🚀 Sequential fused pass start ({pct}%)")
+        start = time.time()
+        fused = job.run_sequential(texts[:records], sentiments[:records])
+        elapsed = time.time() - start
+        throughput = records / elapsed
+        latency = elapsed / records
+
+        print("=========================================")
+        print(f"1. Processing Time: {elapsed:.4f} sec")
+        print(f"2. Throughput: {throughput:.2f} records/sec")
+        print(f"3. Latency: {latency:.6f} sec/record")
+        print_results(fused)
+
+        results.append({
+            "type": "sequential",
+            "task": "fused",
+            "percent": pct,
+            "records": records,
+            "time_sec": round(elapsed, 4),
+            "throughput_rps": round(throughput, 2),
+            "latency_spr": round(latency, 6)
+        })
+
+    return results
+
+
+def run_sequential_tasks():
+    # 로컬 컬럼형 캐시에서 로드 (ETag가 같으면 다시 받지 않음)
+    df = load_frame(S3_KEY, S3_BUCKET)
+
+    # --incremental: 단계마다 새로 추가된 구간만 처리 / 기본: 단계마다 처음부터 다시 계산
+    # --fused: 모든 집계를 한 번의 스캔으로 계산
+    if is_fused():
+        results = run_fused_loads(df)
+    elif is_incremental():
+        results = run_incremental_loads(df)
+    else:
+        results = run_prefix_loads(df)
+
     # 결과 CSV 저장
-    with open(OUTPUT_FILE, "w", newline="") as f:
+    output_file = FUSED_OUTPUT_FILE if is_fused() else OUTPUT_FILE
+    with open(output_file, "w", newline="") as f:
         writer = csv.DictWriter(f, fieldnames=results[0].keys())
         writer.writeheader()
         writer.writerows(results)
 
-    print(f"\n✅ complete: {OUTPUT_FILE}")
-
-    # 임시 파일 삭제
-    if os.path.exists(LOCAL_FILE):
-        os.remove(LOCAL_FILE)
+    print(f"\n✅ complete: {output_file}")
+    return output_file
 
 def upload_to_s3(local_file, bucket, s3_key):
     s3 = boto3.client("s3")
@@ -118,5 +190,5 @@ def upload_to_s3(local_file, bucket, s3_key):
         print(f"❌ Failed to upload to S3: {e}")
 
 if __name__ == "__main__":
-    run_sequential_tasks()
-    upload_to_s3("benchmark_metrics_sequential.csv", "bookreview-results", "hybrid/benchmark_metrics_sequential.csv")
+    output_file = run_sequential_tasks()
+    upload_to_s3(output_file, "bookreview-results", f"hybrid/{output_file}")
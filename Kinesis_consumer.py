@@ -0,0 +1,228 @@
+import threading
+import time
+
+# get_records 한 번에 가져올 레코드 수 범위 (Kinesis 최대 10000)
+MIN_LIMIT = 100
+MAX_LIMIT = 10000
+# 샤드당 GetRecords는 초당 5회까지 허용되므로 호출 간격은 최소 0.2초
+MIN_POLL_INTERVAL = 0.2
+# 빈 응답이 이어질 때 대기 시간 (지수 증가, 상한 있음)
+IDLE_BACKOFF_START = 0.25
+IDLE_BACKOFF_MAX = 2.0
+# 이 값 이상 뒤처져 있으면 "밀린 상태"로 보고 Limit을 키우고 바로 다시 조회
+BEHIND_THRESHOLD_MS = 1000
+# 리샤딩 감지를 위한 샤드 재조회 주기
+REDISCOVER_SECONDS = 30
+THROTTLE_BACKOFF = 1.0
+
+
+# 레코드의 이벤트 시각: 생산자 시각(ts)이 있으면 그대로, 없으면(이전 생산자) Kinesis 도착 시각
+# (boto3는 datetime, Fake_kinesis는 epoch float), 둘 다 없으면 default
+def event_time(record, ts, default):
+    if ts is not None:
+        return ts
+    arrival = record.get("ApproximateArrivalTimestamp")
+    if arrival is None:
+        return default
+    return arrival.timestamp() if hasattr(arrival, "timestamp") else float(arrival)
+
+
+# 샤드 하나를 담당하는 fetch 워커
+class ShardFetcher(threading.Thread):
+    def __init__(self, consumer, shard_id, iterator_type, starting_sequence=None):
+        super().__init__(daemon=True, name=f"fetch-{shard_id}")
+        self.consumer = consumer
+        self.shard_id = shard_id
+        self.iterator_type = iterator_type
+        self.last_sequence = starting_sequence
+        # LATEST로 처음 iterator를 받은 시각 (그 뒤 iterator를 다시 받을 때 시작 위치로 사용)
+        self.started_at = None
+
+        self.limit = MIN_LIMIT
+        self.idle_delay = 0
+        self.millis_behind = 0
+        self.records = 0
+        self.closed = False
+
+    def _get_iterator(self):
+        client = self.consumer.client
+        if self.last_sequence:
+            return client.get_shard_iterator(
+                StreamName=self.consumer.stream_name,
+                ShardId=self.shard_id,
+                ShardIteratorType="AFTER_SEQUENCE_NUMBER",
+                StartingSequenceNumber=self.last_sequence
+            )["ShardIterator"]
+        # 아직 받은 레코드가 없을 때 LATEST로 다시 받으면 그 사이 들어온 레코드가 빠지므로
+        # 처음 LATEST iterator를 받은 시각부터 다시 읽음 (TRIM_HORIZON은 그대로 처음부터)
+        if self.started_at is not None:
+            return client.get_shard_iterator(
+                StreamName=self.consumer.stream_name,
+                ShardId=self.shard_id,
+                ShardIteratorType="AT_TIMESTAMP",
+                Timestamp=self.started_at
+            )["ShardIterator"]
+        if self.iterator_type == "LATEST":
+            self.started_at = time.time()
+        return client.get_shard_iterator(
+            StreamName=self.consumer.stream_name,
+            ShardId=self.shard_id,
+            ShardIteratorType=self.iterator_type
+        )["ShardIterator"]
+
+    # 만료된 iterator 재발급, 실패하면 잠시 쉬고 기존 iterator를 돌려줌 (다음 호출에서 다시 만료 → 재시도)
+    def _refresh_iterator(self, iterator):
+        try:
+            return self._get_iterator()
+        except Exception as e:
+            print(f"❌ Failed to refresh shard iterator for {self.shard_id}: {e}")
+            self.consumer.stopped.wait(THROTTLE_BACKOFF)
+            return iterator
+
+    # 관찰된 backlog(MillisBehindLatest)와 응답 크기로 Limit/대기 시간 조정
+    def _adapt(self, count):
+        if self.millis_behind >= BEHIND_THRESHOLD_MS or count >= self.limit:
+            self.limit = min(MAX_LIMIT, self.limit * 2)
+            self.idle_delay = 0
+            return MIN_POLL_INTERVAL
+        if count == 0:
+            self.limit = max(MIN_LIMIT, self.limit // 2)
+            self.idle_delay = min(IDLE_BACKOFF_MAX, max(IDLE_BACKOFF_START, self.idle_delay * 2))
+            return self.idle_delay
+        self.idle_delay = 0
+        return MIN_POLL_INTERVAL
+
+    def run(self):
+        consumer = self.consumer
+        # 어떤 경우로 끝나든 (예상 못 한 예외 포함) 소비 엔진에 알려야 discovery가 샤드를 다시 맡길 수 있음
+        try:
+            try:
+                iterator = self._get_iterator()
+            except Exception as e:
+                print(f"❌ Failed to get shard iterator for {self.shard_id}: {e}")
+                return
+
+            while iterator and not consumer.stopped.is_set():
+                started = time.time()
+                try:
+                    response = consumer.client.get_records(ShardIterator=iterator, Limit=self.limit)
+                except Exception as e:
+                    name = type(e).__name__
+                    if "ExpiredIterator" in name or "ExpiredIterator" in str(e):
+                        iterator = self._refresh_iterator(iterator)
+                        continue
+                    if "ProvisionedThroughputExceeded" not in name and "ProvisionedThroughputExceeded" not in str(e):
+                        print(f"❌ Error on shard {self.shard_id}: {e}")
+                    consumer.stopped.wait(THROTTLE_BACKOFF)
+                    continue
+
+                records = response.get("Records", [])
+                iterator = response.get("NextShardIterator")
+                self.millis_behind = response.get("MillisBehindLatest", 0)
+
+                if records:
+                    self.last_sequence = records[-1]["SequenceNumber"]
+                    self.records += len(records)
+                    # 처리 콜백의 오류로 fetch 스레드가 죽지 않도록 (해당 배치는 건너뜀)
+                    try:
+                        consumer.on_records(self.shard_id, records)
+                    except Exception as e:
+                        print(f"❌ Failed to process {len(records)} records from {self.shard_id}: {e}")
+                        consumer.stopped.wait(THROTTLE_BACKOFF)
+                        continue
+
+                delay = self._adapt(len(records)) - (time.time() - started)
+                if delay > 0:
+                    consumer.stopped.wait(delay)
+
+            # NextShardIterator가 없으면 리샤딩 등으로 샤드가 닫힌 것
+            self.closed = iterator is None
+        finally:
+            consumer._fetcher_done(self)
+
+
+# 샤드별 fetch 워커를 관리하는 Kinesis 소비 엔진
+# - 샤드마다 스레드 1개, 느린 샤드가 다른 샤드를 막지 않음
+# - 주기적으로 describe_stream을 다시 호출해 리샤딩으로 생긴 새 샤드를 감지
+# - on_records(shard_id, records)는 여러 스레드에서 호출되므로 thread-safe 해야 함
+class KinesisConsumer:
+    def __init__(self, client, stream_name, on_records, iterator_type="LATEST",
+                 rediscover_seconds=REDISCOVER_SECONDS, start_sequences=None):
+        self.client = client
+        self.stream_name = stream_name
+        self.on_records = on_records
+        self.iterator_type = iterator_type
+        self.rediscover_seconds = rediscover_seconds
+        # 체크포인트에서 복원한 샤드별 마지막 처리 시퀀스 (있으면 AFTER_SEQUENCE_NUMBER로 재개)
+        self.start_sequences = dict(start_sequences or {})
+
+        self.stopped = threading.Event()
+        self._lock = threading.Lock()
+        self.fetchers = {}        # shard_id -> 실행 중인 ShardFetcher
+        self.finished = set()     # 끝까지 읽은(닫힌) 샤드
+        self._discovered_once = False
+
+    def list_shards(self):
+        description = self.client.describe_stream(StreamName=self.stream_name)["StreamDescription"]
+        return description["Shards"]
+
+    # 아직 담당 워커가 없는 샤드에 워커 시작
+    def discover(self):
+        try:
+            shards = self.list_shards()
+        except Exception as e:
+            print(f"❌ Failed to describe stream {self.stream_name}: {e}")
+            return
+
+        with self._lock:
+            for shard in shards:
+                shard_id = shard["ShardId"]
+                if shard_id in self.fetchers or shard_id in self.finished:
+                    continue
+                # 시작 후에 새로 생긴 샤드(리샤딩의 자식 샤드)나 체크포인트에 없는 샤드는
+                # 처음부터 읽어야 유실이 없음
+                fresh_start = not self._discovered_once and not self.start_sequences
+                iterator_type = self.iterator_type if fresh_start else "TRIM_HORIZON"
+                fetcher = ShardFetcher(self, shard_id, iterator_type, self.starting_sequence(shard_id))
+                self.fetchers[shard_id] = fetcher
+                fetcher.start()
+            self._discovered_once = True
+
+    def starting_sequence(self, shard_id):
+        return self.start_sequences.get(shard_id)
+
+    def _fetcher_done(self, fetcher):
+        with self._lock:
+            self.fetchers.pop(fetcher.shard_id, None)
+            if fetcher.closed:
+                self.finished.add(fetcher.shard_id)
+            elif fetcher.last_sequence:
+                # 오류로 끝난 워커를 discovery가 다시 시작할 때 마지막 처리 위치부터 이어서 읽도록
+                self.start_sequences[fetcher.shard_id] = fetcher.last_sequence
+        if fetcher.closed:
+            # 닫힌 샤드가 생기면 자식 샤드를 바로 찾아봄
+            self.discover()
+
+    def start(self):
+        self.stopped.clear()
+        self.discover()
+        threading.Thread(target=self._discovery_loop, daemon=True, name="shard-discovery").start()
+
+    def _discovery_loop(self):
+        while not self.stopped.wait(self.rediscover_seconds):
+            self.discover()
+
+    def stop(self):
+        self.stopped.set()
+
+    def run_forever(self):
+        self.start()
+        while not self.stopped.wait(1.0):
+            pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                shard_id: {"records": f.records, "limit": f.limit, "millis_behind": f.millis_behind}
+                for shard_id, f in self.fetchers.items()
+            }
@@ -0,0 +1,302 @@
+import hashlib
+import json
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from json.encoder import encode_basestring_ascii
+
+import pandas as pd
+
+# put_records 한 번에 보낼 수 있는 최대 레코드 수 / 요청 크기 (5 MiB, 여유분 제외)
+BATCH_SIZE = 500
+MAX_BATCH_BYTES = 5 * 1024 * 1024 - 64 * 1024
+MAX_IN_FLIGHT = 4
+MAX_RETRIES = 6
+BASE_BACKOFF_SECONDS = 0.1
+MAX_BACKOFF_SECONDS = 5.0
+# 스트리밍 모드에서 한 번에 파싱할 CSV 행 수
+CHUNK_ROWS = 20000
+PREFETCH_CHUNKS = 2
+
+
+# 레코드 내용으로 파티션 키 생성 (MD5 해시라 샤드 전체에 고르게 분산됨)
+def partition_key(data):
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.md5(data).hexdigest()
+
+
+# 샤드 수를 고려한 Kinesis 전송 엔진
+# - 여러 put_records 호출을 스레드 풀에서 동시에 진행 (최대 max_in_flight개)
+# - 응답의 FailedRecordCount를 확인해 실패한 레코드만 지수 백오프로 재전송
+# - 전송 통계(records/sec 등)를 stats()로 제공
+class KinesisSender:
+    def __init__(self, client, stream_name, max_in_flight=MAX_IN_FLIGHT, max_retries=MAX_RETRIES,
+                 base_backoff=BASE_BACKOFF_SECONDS, max_backoff=MAX_BACKOFF_SECONDS):
+        self.client = client
+        self.stream_name = stream_name
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.bytes_sent = 0
+        self.started_at = None
+        self.first_sent_at = None
+        self.finished_at = None
+
+    def _backoff(self, attempt):
+        delay = min(self.max_backoff, self.base_backoff * (2 ** attempt))
+        return delay * (0.5 + random.random() / 2)
+
+    # 배치 하나 전송: 실패한 레코드만 골라 재시도
+    def _put_batch(self, records):
+        pending = records
+        attempt = 0
+        while pending:
+            try:
+                response = self.client.put_records(StreamName=self.stream_name, Records=pending)
+            except Exception as e:
+                # 호출 자체가 throttling 등으로 실패하면 배치 전체를 재시도
+                if attempt >= self.max_retries:
+                    print(f"❌ put_records failed after {attempt} retries: {e}")
+                    with self._lock:
+                        self.failed += len(pending)
+                    return
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                with self._lock:
+                    self.retried += len(pending)
+                continue
+
+            failed_count = response.get("FailedRecordCount", 0)
+            if failed_count:
+                results = response.get("Records", [])
+                retry = [rec for rec, res in zip(pending, results) if res.get("ErrorCode")]
+            else:
+                retry = []
+
+            delivered = len(pending) - len(retry)
+            delivered_bytes = sum(len(rec["Data"]) for rec in pending) - sum(len(rec["Data"]) for rec in retry)
+            with self._lock:
+                self.sent += delivered
+                self.bytes_sent += delivered_bytes
+                if delivered and self.first_sent_at is None:
+                    self.first_sent_at = time.time()
+
+            if not retry:
+                return
+            if attempt >= self.max_retries:
+                print(f"❌ Dropping {len(retry)} records after {attempt} retries")
+                with self._lock:
+                    self.failed += len(retry)
+                return
+
+            time.sleep(self._backoff(attempt))
+            attempt += 1
+            with self._lock:
+                self.retried += len(retry)
+            pending = retry
+
+    # 배치 iterable을 받아 동시에 전송, 진행 중인 호출 수는 max_in_flight로 제한
+    def send_batches(self, batches):
+        self.started_at = time.time()
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            in_flight = set()
+            for batch in batches:
+                if not batch:
+                    continue
+                if len(in_flight) >= self.max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for f in done:
+                        f.result()
+                in_flight.add(executor.submit(self._put_batch, list(batch)))
+            for f in in_flight:
+                f.result()
+        self.finished_at = time.time()
+        return self.stats()
+
+    # 레코드 iterable을 BATCH_SIZE 단위로 묶어 전송
+    def send_records(self, records, batch_size=BATCH_SIZE):
+        return self.send_batches(iter_batches(records, batch_size))
+
+    def stats(self):
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "bytes": self.bytes_sent,
+            "time": elapsed,
+            "time_to_first": self.first_sent_at - self.started_at if self.first_sent_at else None,
+            "throughput": self.sent / elapsed if elapsed > 0 else 0,
+        }
+
+
+def iter_batches(records, batch_size=BATCH_SIZE, max_bytes=MAX_BATCH_BYTES):
+    batch = []
+    size = 0
+    for record in records:
+        record_size = len(record["Data"]) + len(record["PartitionKey"])
+        if batch and size + record_size > max_bytes:
+            yield batch
+            batch = []
+            size = 0
+        batch.append(record)
+        size += record_size
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+            size = 0
+    if batch:
+        yield batch
+
+
+# payload(str/bytes) 목록을 파티션 키가 붙은 Kinesis 레코드로 변환
+def make_records(payloads):
+    for data in payloads:
+        yield {"Data": data, "PartitionKey": partition_key(data)}
+
+
+# 컬럼을 결측치 없는 문자열 Series로 정리 (iterrows 버전의 pd.notna/str()과 동일)
+def string_column(df, column):
+    if column not in df.columns:
+        return pd.Series([""] * len(df), index=df.index, dtype=object)
+    col = df[column]
+    return col.where(col.notna(), "").astype(str)
+
+
+# DataFrame 전체를 컬럼 단위 연산으로 JSON payload Series로 변환
+# 결과는 json.dumps({"text": ..., "sentiment": ...})와 바이트 단위로 동일
+# closed=False면 마지막 '}'를 빼고 반환 (전송 직전에 ', "ts": ...}'를 붙이기 위함)
+def encode_payloads(df, closed=True):
+    text = string_column(df, "cleaned_text")
+    sentiment = string_column(df, "sentiment").str.lower()
+
+    text_json = text.map(encode_basestring_ascii)
+    # 감정 값은 종류가 몇 개뿐이므로 고유값만 인코딩 후 매핑
+    sentiment_json = sentiment.map({s: encode_basestring_ascii(s) for s in sentiment.unique()})
+
+    payloads = '{"text": ' + text_json + ', "sentiment": ' + sentiment_json
+    return payloads + '}' if closed else payloads
+
+
+# payload Series의 해시값으로 파티션 키 생성 (행 단위 루프 없이 계산)
+def partition_keys(payloads):
+    return pd.util.hash_pandas_object(payloads, index=False).to_numpy().astype(str)
+
+
+# DataFrame을 바로 전송 가능한 Kinesis 레코드 배치로 변환해 batch_size 단위로 반환
+# timestamps=True면 배치를 꺼내는 시점(= 전송 직전)의 시각을 "ts" 필드로 추가
+def encode_batches(df, batch_size=BATCH_SIZE, timestamps=False):
+    payloads = encode_payloads(df, closed=not timestamps)
+    data = payloads.tolist()
+    keys = partition_keys(payloads).tolist()
+    for start in range(0, len(data), batch_size):
+        end = start + batch_size
+        if timestamps:
+            suffix = f', "ts": {time.time():.6f}}}'
+            yield [{"Data": d + suffix, "PartitionKey": k} for d, k in zip(data[start:end], keys[start:end])]
+        else:
+            yield [{"Data": d, "PartitionKey": k} for d, k in zip(data[start:end], keys[start:end])]
+
+
+# 별도 스레드에서 iterable을 미리 읽어 두는 제한된 크기의 파이프라인
+# (S3 읽기/CSV 파싱이 인코딩/전송과 겹쳐서 진행되고, 메모리는 depth개 청크로 제한됨)
+def prefetch(iterable, depth=PREFETCH_CHUNKS):
+    q = queue.Queue(maxsize=depth)
+    done = object()
+
+    def worker():
+        try:
+            for item in iterable:
+                q.put(item)
+        except Exception as e:
+            q.put(e)
+        q.put(done)
+
+    threading.Thread(target=worker, daemon=True).start()
+    while True:
+        item = q.get()
+        if item is done:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+
+# CSV(로컬 경로 또는 S3 StreamingBody 같은 file-like)를 chunk 단위로 파싱
+def iter_csv_chunks(source, chunk_rows=CHUNK_ROWS):
+    usecols = lambda c: c in ("cleaned_text", "sentiment")
+    for chunk in pd.read_csv(source, chunksize=chunk_rows, usecols=usecols):
+        yield chunk
+
+
+# 전체 파일을 받지 않고 chunk 단위로 파싱 → 인코딩 → 배치 반환
+def stream_batches(source, chunk_rows=CHUNK_ROWS, batch_size=BATCH_SIZE, encoder=None):
+    encoder = encoder or encode_batches
+    for chunk in prefetch(iter_csv_chunks(source, chunk_rows)):
+        yield from encoder(chunk, batch_size)
+
+
+# ---------------- 마이크로 벤치마크: iterrows vs 컬럼 단위 인코딩 ----------------
+
+# 기존 Producer.send_chunk의 행 단위 인코딩
+def _iterrows_batches(df, batch_size=BATCH_SIZE):
+    batch = []
+    for _, row in df.iterrows():
+        text_val = row.get("cleaned_text", "")
+        sentiment_val = row.get("sentiment", "")
+        payload = {
+            "text": str(text_val) if pd.notna(text_val) else "",
+            "sentiment": str(sentiment_val).lower() if pd.notna(sentiment_val) else "",
+        }
+        batch.append({"Data": json.dumps(payload), "PartitionKey": "partition-key"})
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def bench_encoding(df, loads=(25, 50, 75, 100)):
+    results = []
+    total_rows = len(df)
+    for pct in loads:
+        subset = df.iloc[: total_rows * pct // 100]
+
+        start = time.perf_counter()
+        old_count = sum(len(b) for b in _iterrows_batches(subset))
+        old_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        new_count = sum(len(b) for b in encode_batches(subset))
+        new_time = time.perf_counter() - start
+
+        results.append({
+            "percent": pct,
+            "records": new_count,
+            "iterrows_sec": round(old_time, 4),
+            "vectorized_sec": round(new_time, 4),
+            "iterrows_rps": round(old_count / old_time, 2) if old_time > 0 else 0,
+            "vectorized_rps": round(new_count / new_time, 2) if new_time > 0 else 0,
+            "speedup": round(old_time / new_time, 2) if new_time > 0 else 0,
+        })
+        print(f"{pct}% | iterrows: {old_time:.4f}s | vectorized: {new_time:.4f}s | "
+              f"speedup: {results[-1]['speedup']}x")
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else "/home/ubuntu/cleaned_books_100.csv"
+    print(f"📊 Encoding benchmark on {csv_path}")
+    bench_encoding(pd.read_csv(csv_path))
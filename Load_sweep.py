@@ -0,0 +1,74 @@
+import sys
+import time
+
+DEFAULT_LOADS = [25, 50, 75, 100]
+
+
+# 명령행 옵션으로 부하 단계 결정: --step 10 → 10, 20, ..., 100
+def parse_loads(argv=None, default=DEFAULT_LOADS):
+    argv = sys.argv if argv is None else argv
+    if "--step" not in argv:
+        return list(default)
+    step = int(argv[argv.index("--step") + 1])
+    loads = list(range(step, 100, step))
+    return loads + [100]
+
+
+def is_incremental(argv=None):
+    argv = sys.argv if argv is None else argv
+    return "--incremental" in argv
+
+
+# --fused: 워드카운트/감정 분석 등을 한 번의 스캔으로 함께 계산
+def is_fused(argv=None):
+    argv = sys.argv if argv is None else argv
+    return "--fused" in argv
+
+
+# 각 단계에서 새로 추가되는 구간만 반환: (percent, start, end)
+def prefix_deltas(total_rows, loads):
+    prev = 0
+    for pct in sorted(loads):
+        end = total_rows * pct // 100
+        yield pct, prev, end
+        prev = end
+
+
+# 증분 스윕: 구간(delta)만 처리하고 누적 결과에 합침
+#   process(start, end) -> 부분 결과, fold(state, partial) -> 새 누적 결과
+# 단계마다 (percent, delta 행 수, 누적 행 수, delta 처리 시간, 처음부터 처리했을 때의 추정 시간, 누적 결과)
+# 추정 시간 = 지금까지의 delta 시간 합 (0%부터 해당 단계까지 한 번에 처리한 비용과 같음)
+def incremental_sweep(total_rows, loads, process, fold, state):
+    cumulative = 0.0
+    for pct, start, end in prefix_deltas(total_rows, loads):
+        t0 = time.perf_counter()
+        partial = process(start, end)
+        state = fold(state, partial)
+        delta = time.perf_counter() - t0
+        cumulative += delta
+        yield pct, end - start, end, delta, cumulative, state
+
+
+# 결과 CSV용 행 (기존 컬럼 + delta 컬럼)
+def sweep_row(kind, task, pct, delta_records, records, delta_sec, total_sec):
+    throughput = records / total_sec if total_sec > 0 else 0
+    latency = total_sec / records if records else 0
+    return {
+        "type": kind,
+        "task": task,
+        "percent": pct,
+        "records": records,
+        "time_sec": round(total_sec, 4),
+        "throughput_rps": round(throughput, 2),
+        "latency_spr": round(latency, 6),
+        "delta_records": delta_records,
+        "delta_sec": round(delta_sec, 4),
+    }
+
+
+def print_sweep_row(row):
+    print("=========================================")
+    print(f"1. Delta Time: {row['delta_sec']:.4f} sec ({row['delta_records']} new records)")
+    print(f"2. From-scratch Estimate: {row['time_sec']:.4f} sec ({row['records']} records)")
+    print(f"3. Throughput: {row['throughput_rps']:.2f} records/sec")
+    print(f"4. Latency: {row['latency_spr']:.6f} sec/record")
@@ -6,30 +6,23 @@ import multiprocessing as mp
 import boto3
 import os
 import time
+from Dataset_cache import load_frame
+from Sentiment_engine import count_sentiments_vectorized, count_sentiments_auto
+from Load_sweep import parse_loads, is_incremental, incremental_sweep
 
 s3 = boto3.client("s3", region_name="us-east-1")
 bucket = "bookreview-results"
 key = "cleaned/cleaned_books_100.csv"
-local_path = "/home/ubuntu/cleaned_books_full.csv"
-
-try:
-    s3.download_file(bucket, key, local_path)
-    print("✅ Downloaded full dataset from S3")
-except Exception as e:
-    print(f"❌ Failed to download: {e}")
-    exit(1)
 
 # 전역 저장소
 performance = []
 sentiment_summary = {}
 BASE_PATH = "/home/ubuntu"
+LOADS = parse_loads(default=[25, 50, 75, 100])  # --step N으로 변경 가능
 
+# categorical 코드 + bincount (NaN 제외, 대소문자 통합)
 def count_sentiments(sentiments):
-    counter = Counter()
-    for s in sentiments:
-        if pd.notna(s):
-            counter[s.lower()] += 1
-    return counter
+    return count_sentiments_vectorized(sentiments)
 
 def merge_counters(results):
     total = Counter()
@@ -41,16 +34,11 @@ def process_sentiment(df_full, percent):
     print(f"\n🔁 Running Sentiment Analysis for {percent}% dataset...")
     subset_len = int(len(df_full) * percent / 100)
     df = df_full.iloc[:subset_len]
-    sentiments = df["sentiment"].dropna().tolist()
+    sentiments = df["sentiment"]
 
+    # 작은 입력은 벡터 연산 한 번, 충분히 클 때만 pool 사용
     start_time = time.time()
-    chunk_size = 50000
-    chunks = [sentiments[i:i + chunk_size] for i in range(0, len(sentiments), chunk_size)]
-
-    with mp.Pool(mp.cpu_count()) as pool:
-        results = pool.map(count_sentiments, chunks)
-
-    combined = merge_counters(results)
+    combined = count_sentiments_auto(sentiments, mp.cpu_count())
 
     end_time = time.time()
     elapsed = end_time - start_time
@@ -69,6 +57,35 @@ def process_sentiment(df_full, percent):
     print(f"⏱️ Time: {elapsed:.2f}s | 📈 Throughput: {throughput:.2f} rows/s | 🕒 Latency: {latency:.6f}s/row")
 
 
+# 증분 스윕: 단계별 새 구간(delta)만 세서 누적 Counter에 합침
+def process_sentiment_incremental(df_full, loads):
+    print(f"\n🔁 Running incremental Sentiment sweep for {loads}...")
+    sentiments = df_full["sentiment"]
+
+    def count_delta(start, end):
+        return count_sentiments_auto(sentiments.iloc[start:end], mp.cpu_count())
+
+    def fold(total, part):
+        total.update(part)
+        return total
+
+    for percent, delta_rows, total_rows, delta_sec, elapsed, combined in incremental_sweep(
+            len(df_full), loads, count_delta, fold, Counter()):
+        throughput = total_rows / elapsed if elapsed > 0 else 0
+        latency = (elapsed / total_rows) * 1000 if total_rows else 0
+
+        sentiment_summary[percent] = dict(combined)
+        performance.append({
+            "percent": percent,
+            "time": round(elapsed, 2),
+            "throughput": round(throughput, 2),
+            "latency": round(latency, 6),
+            "delta_time": round(delta_sec, 4)
+        })
+        print(f"{percent}% | ⏱️ Delta: {delta_sec:.2f}s ({delta_rows} rows) | From-scratch estimate: {elapsed:.2f}s "
+              f"| 📈 Throughput: {throughput:.2f} rows/s")
+
+
 def plot_pie_charts(data):
     fig, axs = plt.subplots(2, 2, figsize=(10, 8))
     labels = ["positive", "neutral", "negative"]
@@ -80,11 +97,13 @@ def plot_pie_charts(data):
     }
     positions = [(0, 0), (0, 1), (1, 0), (1, 1)]
 
-    for i, percent in enumerate([25, 50, 75, 100]):
+    # --step으로 단계가 바뀌면 마지막 4개 단계만 표시
+    levels = [p for p in [25, 50, 75, 100] if p in data] or sorted(data)[-4:]
+    for i, percent in enumerate(levels):
         row, col = positions[i]
         counts = [data[percent].get(label, 0) for label in labels]
         axs[row][col].pie(counts, labels=labels, autopct='%1.1f%%',
-                          colors=colors[percent], startangle=140,
+                          colors=colors.get(percent, colors[100]), startangle=140,
                           textprops={'fontsize': 10})
         axs[row][col].set_title(f"Sentiment Distribution - {percent}%", fontsize=12)
 
@@ -151,23 +170,21 @@ def plot_performance(perf_data):
 
 
 def main():
+    # 로컬 컬럼형 캐시에서 로드 (ETag가 같으면 다시 받지 않음)
     try:
-        df = pd.read_csv(local_path)
+        df = load_frame(key, bucket)
     except Exception as e:
         print(f"❌ Failed to load input file: {e}")
         return
 
-    for percent in [25, 50, 75, 100]:
-        process_sentiment(df, percent)
+    if is_incremental():
+        process_sentiment_incremental(df, LOADS)
+    else:
+        for percent in LOADS:
+            process_sentiment(df, percent)
 
     plot_pie_charts(sentiment_summary)
     plot_performance(performance)
 
-    try:
-        os.remove(local_path)
-        print("🧹 Deleted cleaned_books_full.csv to save space.")
-    except Exception as e:
-        print(f"⚠️ Failed to delete cleaned_books_full.csv: {e}")
-
 if __name__ == "__main__":
     main()
@@ -7,10 +7,31 @@ import time
 import os
 import matplotlib.pyplot as plt
 import numpy as np
+import sys
+from Dataset_cache import load_frame
+from Word_engine import count_arrays, pack_arrays, WordCounts, MAPREDUCE_STRIP
+from Topk_reduce import packed_size, HeavyHitters, sketch_size, SKETCH_CAPACITY
+from Task_scheduler import adaptive_map, offsets_from_lengths, print_worker_report, idle_fraction
+from Stream_mapreduce import (iter_column_chunks, stream_fold, peak_rss_mb, reset_peak_rss,
+                              worker_peak_rss_mb, MAX_IN_FLIGHT_FACTOR)
+from Spill_shuffle import (SPILL_DIR, MEMORY_BUDGET_MB, partitions_for_budget, prepare_spill_dir,
+                           cleanup_spill_dir, map_spill, reduce_partition, merge_partition_tops,
+                           read_partition_results)
+from functools import partial
 
 
 s3 = boto3.client('s3', region_name='us-east-1')
 S3_BUCKET_NAME = "bookreview-results"
+CHUNK_SIZE = 50000
+# "exact": 전체 부분 count를 도착 순서대로 합침 / "approx": heavy-hitter 요약으로 메모리 제한
+TOPK_MODE = "approx" if "--approx" in sys.argv else "exact"
+# --stream: 전체를 DataFrame으로 올리지 않고 S3에서 chunk 단위로 읽으며 처리
+STREAM_MODE = "--stream" in sys.argv
+# --out-of-core: map 결과를 해시 파티션별 스필 파일로 내리고 파티션마다 reduce
+#   --memory-mb N : 파티션 하나를 병합할 때의 메모리 예산 / --verify : 인메모리 결과와 비교
+OUT_OF_CORE = "--out-of-core" in sys.argv
+MEMORY_BUDGET = int(sys.argv[sys.argv.index("--memory-mb") + 1]) if "--memory-mb" in sys.argv else MEMORY_BUDGET_MB
+VERIFY = "--verify" in sys.argv
 
 # 텍스트 전처리
 def tokenize(text):
@@ -18,20 +39,82 @@ def tokenize(text):
     text = re.sub(r'[^a-z\s]', '', text)
     return text.split()
 
+# chunk 단위 벡터화 토큰화 + bincount (tokenize와 같은 규칙)
 def count_words(texts):
-    counter = Counter()
-    for text in texts:
-        tokens = tokenize(text)
-        counter.update(tokens)
-    return counter
-
-# Top-N 병합
-def merge_top_n_counters(results, top_n=10, local_top_k=100):
-    temp = Counter()
-    for partial in results:
-        top_local = partial.most_common(local_top_k)
-        temp.update(dict(top_local))
-    return temp.most_common(top_n)
+    words, counts = count_arrays(texts, MAPREDUCE_STRIP, coerce=True)
+    return Counter(dict(zip(words, counts.tolist())))
+
+# 워커: 담당 구간을 세고 압축된 Counter 하나만 반환 (chunk마다 Counter를 보내지 않음)
+def count_words_packed(texts):
+    total = WordCounts()
+    for i in range(0, len(texts), CHUNK_SIZE):
+        total.add(*count_arrays(texts[i:i + CHUNK_SIZE], MAPREDUCE_STRIP, coerce=True))
+    return pack_arrays(total.words, total.counts[:len(total)])
+
+# 워커: CHUNK_SIZE 단위로 정확히 센 뒤 heavy-hitter 요약에 합침 (메모리 = chunk + 요약 크기)
+def sketch_words(texts, capacity=SKETCH_CAPACITY):
+    sketch = HeavyHitters(capacity)
+    for i in range(0, len(texts), CHUNK_SIZE):
+        sketch.update(count_words(texts[i:i + CHUNK_SIZE]))
+    return sketch.packed()
+
+# Top-N 병합 (exact: 정확한 결과 / approx: 오차 범위와 함께 반환)
+# 고정 chunk 대신 Task_scheduler가 보정 결과로 작업 크기를 정하고 텍스트 바이트 기준으로 균형 분할,
+# 먼저 끝난 워커가 다음 작업을 가져가며 결과는 도착하는 대로 병합
+def reduce_top_n(pool, texts, lengths, num_processes, top_n=10, mode="exact"):
+    offsets = offsets_from_lengths(lengths)
+    make_arg = lambda start, end: texts[start:end]
+
+    if mode == "approx":
+        def fold(state, partial):
+            sketch, ipc = state
+            return sketch.merge(HeavyHitters.from_packed(partial)), ipc + sketch_size(partial)
+
+        (sketch, ipc_bytes), report = adaptive_map(
+            pool, sketch_words, make_arg, offsets, 0, len(texts), fold, (HeavyHitters(), 0), num_processes)
+        top, guaranteed = sketch.top(top_n)
+        print(f"🔎 Approx top-{top_n}: max undercount {sketch.error} "
+              f"(bound {sketch.error_bound():.1f}), exact ranking guaranteed: {guaranteed}")
+        return [(w, lower) for w, lower, _ in top], ipc_bytes, report
+
+    def fold(state, partial):
+        total, ipc = state
+        return total.add_packed(partial), ipc + packed_size(partial)
+
+    (total, ipc_bytes), report = adaptive_map(
+        pool, count_words_packed, make_arg, offsets, 0, len(texts), fold, (WordCounts(), 0), num_processes)
+    return total.most_common(top_n), ipc_bytes, report
+
+# 스트리밍 워커: chunk 하나의 결과와 워커의 최대 RSS를 함께 반환
+def count_chunk_stream(texts):
+    if TOPK_MODE == "approx":
+        return sketch_words(texts), worker_peak_rss_mb()
+    return pack_arrays(*count_arrays(texts, MAPREDUCE_STRIP, coerce=True)), worker_peak_rss_mb()
+
+# 스트리밍 Top-N: 읽기 → 워커 → 병합이 겹쳐서 진행, 메모리에는 최대 max_in_flight개 chunk만 존재
+def stream_top_n(pool, chunks, max_in_flight, top_n=10):
+    def fold(state, result):
+        partial, worker_rss = result
+        total, rss, ipc = state
+        if TOPK_MODE == "approx":
+            total.merge(HeavyHitters.from_packed(partial))
+            ipc += sketch_size(partial)
+        else:
+            total.add_packed(partial)
+            ipc += packed_size(partial)
+        return total, max(rss, worker_rss), ipc
+
+    initial = HeavyHitters() if TOPK_MODE == "approx" else WordCounts()
+    total, worker_rss, ipc_bytes = stream_fold(
+        pool, count_chunk_stream, chunks, fold, (initial, 0.0, 0), max_in_flight)
+    if TOPK_MODE == "approx":
+        top, guaranteed = total.top(top_n)
+        print(f"🔎 Approx top-{top_n}: max undercount {total.error} "
+              f"(bound {total.error_bound():.1f}), exact ranking guaranteed: {guaranteed}")
+        top_words = [(w, lower) for w, lower, _ in top]
+    else:
+        top_words = total.most_common(top_n)
+    return top_words, ipc_bytes, worker_rss
 
 # 결과 저장용 전역 변수
 performance = []
@@ -129,57 +212,181 @@ def plot_performance(perf_data):
         pass
 
 
+def process_wordcount_stream(percent):
+    print(f"\n🔁 Running streaming WordCount for {percent}% dataset...")
+    s3_input_key = f"cleaned/cleaned_books_{percent}.csv"
+    reset_peak_rss()
+
+    start_time = time.time()
+    try:
+        body = s3.get_object(Bucket=S3_BUCKET_NAME, Key=s3_input_key)["Body"]
+    except Exception as e:
+        print(f"❌ Failed to open {s3_input_key}: {e}")
+        return
+
+    num_processes = mp.cpu_count()
+    rows = [0]
+    chunks = iter_column_chunks(body, "cleaned_text", CHUNK_SIZE, rows)
+    with mp.Pool(processes=num_processes) as pool:
+        top_words, ipc_bytes, worker_rss = stream_top_n(
+            pool, chunks, num_processes * MAX_IN_FLIGHT_FACTOR, top_n=10)
+    end_time = time.time()
+
+    elapsed = end_time - start_time
+    total_rows = rows[0]
+    throughput = total_rows / elapsed
+    latency_ms = (elapsed / total_rows) * 1000
+    parent_rss = peak_rss_mb()
+
+    performance.append({
+        "percent": percent,
+        "time": round(elapsed, 2),
+        "throughput": round(throughput, 2),
+        "latency": round(latency_ms, 6),
+        "ipc_bytes": ipc_bytes,
+        "peak_rss_mb": round(parent_rss, 1),
+        "worker_peak_rss_mb": round(worker_rss, 1)
+    })
+
+    print(f"⏱️ Time: {elapsed:.2f}s | 📈 Throughput: {throughput:.2f} rows/s | 🕒 Latency: {latency_ms:.6f}s/row")
+    print(f"🧠 Peak RSS: parent {parent_rss:.1f} MiB | worker {worker_rss:.1f} MiB "
+          f"| 📦 Mode: {TOPK_MODE} (stream) | IPC: {ipc_bytes / 1024:.1f} KiB")
+
+    top_words_all[percent] = top_words
+
+
+# 인메모리 경로와 같은 규칙으로 전체 Counter 계산 (--verify 전용)
+def full_counter(texts):
+    total = WordCounts()
+    for i in range(0, len(texts), CHUNK_SIZE):
+        total.add(*count_arrays(texts[i:i + CHUNK_SIZE], MAPREDUCE_STRIP, coerce=True))
+    return total.to_counter()
+
+
+# 셔플 단계가 있는 out-of-core 워드카운트
+#   map    : S3에서 chunk 단위로 읽어 세고, (단어, count)를 해시 파티션별 스필 파일로 기록
+#   reduce : 워커마다 파티션 하나씩 스필 파일을 병합 → 파티션별 결과 파일 + top-N 후보
+def process_wordcount_out_of_core(percent):
+    print(f"\n🔁 Running out-of-core WordCount for {percent}% dataset...")
+    s3_input_key = f"cleaned/cleaned_books_{percent}.csv"
+    reset_peak_rss()
+
+    start_time = time.time()
+    try:
+        obj = s3.get_object(Bucket=S3_BUCKET_NAME, Key=s3_input_key)
+    except Exception as e:
+        print(f"❌ Failed to open {s3_input_key}: {e}")
+        return
+
+    budget_bytes = MEMORY_BUDGET * 1024 * 1024
+    num_partitions = partitions_for_budget(obj["ContentLength"], budget_bytes)
+    spill_dir = os.path.join(SPILL_DIR, f"wordcount_{percent}")
+    prepare_spill_dir(spill_dir, num_partitions)
+
+    num_processes = mp.cpu_count()
+    rows = [0]
+    chunks = enumerate(iter_column_chunks(obj["Body"], "cleaned_text", CHUNK_SIZE, rows))
+    with mp.Pool(processes=num_processes) as pool:
+        map_fn = partial(map_spill, spill_dir=spill_dir, num_partitions=num_partitions)
+        spilled = stream_fold(pool, map_fn, chunks, lambda total, r: total + r[1], 0,
+                              num_processes * MAX_IN_FLIGHT_FACTOR)
+        map_done = time.time()
+        reduce_fn = partial(reduce_partition, spill_dir=spill_dir, top_n=10)
+        results = pool.map(reduce_fn, range(num_partitions))
+    top_words = merge_partition_tops(results, top_n=10)
+    end_time = time.time()
+
+    elapsed = end_time - start_time
+    total_rows = rows[0]
+    throughput = total_rows / elapsed
+    latency_ms = (elapsed / total_rows) * 1000
+    parent_rss = peak_rss_mb()
+    largest = max(r[3] for r in results)
+    if largest > budget_bytes:
+        print(f"⚠️ Largest partition spill {largest / 1024 / 1024:.1f} MiB exceeds budget {MEMORY_BUDGET} MiB "
+              f"(hash skew) — rerun with a smaller --memory-mb")
+
+    performance.append({
+        "percent": percent,
+        "time": round(elapsed, 2),
+        "throughput": round(throughput, 2),
+        "latency": round(latency_ms, 6),
+        "spill_bytes": spilled,
+        "peak_rss_mb": round(parent_rss, 1),
+        "map_time": round(map_done - start_time, 2),
+        "reduce_time": round(end_time - map_done, 2),
+        "partitions": num_partitions
+    })
+
+    print(f"⏱️ Time: {elapsed:.2f}s (map {map_done - start_time:.2f}s, reduce {end_time - map_done:.2f}s) "
+          f"| 📈 Throughput: {throughput:.2f} rows/s | 🕒 Latency: {latency_ms:.6f}s/row")
+    print(f"💾 Spilled {spilled / 1024 / 1024:.1f} MiB into {num_partitions} partitions "
+          f"| largest {largest / 1024 / 1024:.1f} MiB | 🧠 Peak RSS: {parent_rss:.1f} MiB")
+
+    if VERIFY:
+        df = load_frame(s3_input_key, S3_BUCKET_NAME, columns=["cleaned_text"])
+        expected = full_counter(df["cleaned_text"].dropna().tolist())
+        same = read_partition_results(spill_dir, num_partitions) == expected
+        print(f"🔍 Matches in-memory result: {same}")
+    cleanup_spill_dir(spill_dir)
+
+    top_words_all[percent] = top_words
+
+
 def process_wordcount(percent):
     print(f"\n🔁 Running WordCount for {percent}% dataset...")
     s3_input_key = f"cleaned/cleaned_books_{percent}.csv"
-    base_path = "/home/ubuntu"
-    local_input = f"{base_path}/temp_input_{percent}.csv"
+    reset_peak_rss()
 
+    # 로컬 컬럼형 캐시에서 로드 (ETag가 같으면 다시 받지 않음)
     try:
-        s3.download_file(S3_BUCKET_NAME, s3_input_key, local_input)
+        df = load_frame(s3_input_key, S3_BUCKET_NAME, columns=["cleaned_text"])
     except Exception as e:
-        print(f"❌ Failed to download {s3_input_key}: {e}")
+        print(f"❌ Failed to load {s3_input_key}: {e}")
         return
 
-    df = pd.read_csv(local_input)
-    texts = df['cleaned_text'].dropna().tolist()
+    column = df['cleaned_text'].dropna()
+    texts = column.tolist()
+    lengths = column.astype(str).str.len().to_numpy()
 
     start_time = time.time()
     num_processes = mp.cpu_count()
-    chunk_size = 50000
-    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
 
     with mp.Pool(processes=num_processes) as pool:
-        results = pool.map(count_words, chunks)
-
-    top_words = merge_top_n_counters(results, top_n=10)
+        top_words, ipc_bytes, report = reduce_top_n(pool, texts, lengths, num_processes, top_n=10, mode=TOPK_MODE)
     end_time = time.time()
 
     elapsed = end_time - start_time
     total_rows = len(df)
     throughput = total_rows / elapsed
     latency_ms = (elapsed / total_rows) * 1000
+    parent_rss = peak_rss_mb()
 
     performance.append({
         "percent": percent,
         "time": round(elapsed, 2),
         "throughput": round(throughput, 2),
-        "latency": round(latency_ms, 6)
+        "latency": round(latency_ms, 6),
+        "ipc_bytes": ipc_bytes,
+        "peak_rss_mb": round(parent_rss, 1),
+        "idle_pct": round(idle_fraction(report) * 100, 1)
     })
     
     print(f"⏱️ Time: {elapsed:.2f}s | 📈 Throughput: {throughput:.2f} rows/s | 🕒 Latency: {latency_ms:.6f}s/row")
+    print(f"🧠 Peak RSS: {parent_rss:.1f} MiB | 📦 Mode: {TOPK_MODE} | IPC: {ipc_bytes / 1024:.1f} KiB")
+    print_worker_report(report)
 
     top_words_all[percent] = top_words
 
-    try:
-        os.remove(local_input)
-    except:
-        pass
-
 
 def main():
     for percent in [25, 50, 75, 100]:
-        process_wordcount(percent)
+        if OUT_OF_CORE:
+            process_wordcount_out_of_core(percent)
+        elif STREAM_MODE:
+            process_wordcount_stream(percent)
+        else:
+            process_wordcount(percent)
     plot_performance(performance)
     plot_all_top_words(top_words_all)
 
@@ -3,6 +3,11 @@ import pandas as pd
 import json
 import time
 import os
+import sys
+from Kinesis_producer import (KinesisSender, encode_batches, encode_payloads, stream_batches,
+                              string_column, make_records, iter_batches, BATCH_SIZE)
+from Record_codec import aggregate, AGG_TARGET_BYTES
+from Window_aggregator import SENTIMENT_CODES
 
 STREAM_NAME = "book-reviews-stream"
 REGION_NAME = "us-east-1"
@@ -12,31 +17,70 @@ BASE_PATH = "/home/ubuntu"
 s3 = boto3.client("s3", region_name=REGION_NAME)
 kinesis = boto3.client("kinesis", region_name=REGION_NAME)
 
-def send_chunk(df):
-    batch = []
-    for i, (_, row) in enumerate(df.iterrows()):
-        text_val = row.get("cleaned_text", "")
-        sentiment_val = row.get("sentiment", "")
+# 여러 리뷰를 하나의 Kinesis 레코드로 묶는 집계 레이어 (Record_codec 포맷, 묶는 시점의 생산자 시각 포함)
+def aggregate_batches(df, batch_size=BATCH_SIZE, target_bytes=AGG_TARGET_BYTES, compress=True, timestamps=True):
+    texts = string_column(df, "cleaned_text").tolist()
+    codes = string_column(df, "sentiment").str.lower().map(SENTIMENT_CODES).fillna(0).astype(int).tolist()
+    blobs = aggregate(zip(texts, codes), target_bytes, compress, timestamps)
+    return iter_batches(make_records(blobs), batch_size)
 
-        payload = {
-            "text": str(text_val) if pd.notna(text_val) else "",
-            "sentiment": str(sentiment_val).lower() if pd.notna(sentiment_val) else "",
-        }
+# JSON 단건 레코드에 전송 직전 시각("ts")을 생산자 시각으로 포함
+def stamped_batches(df, batch_size=BATCH_SIZE):
+    return encode_batches(df, batch_size, timestamps=True)
 
-        batch.append({
-            "Data": json.dumps(payload),
-            "PartitionKey": f"partition-key"
+# client: boto3 Kinesis 클라이언트 대신 다른 구현(예: Fake_kinesis.FakeKinesis)을 주입할 때 사용
+def send_chunk(df, aggregated=False, client=None):
+    sender = KinesisSender(client or kinesis, STREAM_NAME)
+    encoder = aggregate_batches if aggregated else stamped_batches
+    sender.send_batches(encoder(df))
+    return sender.stats()
+
+# JSON 단건 레코드 vs 집계 레코드의 인코딩 속도와 레코드당 바이트 비교
+def bench_aggregation(df):
+    results = []
+    variants = [
+        ("json", lambda: [p.encode("utf-8") for p in encode_payloads(df).tolist()]),
+        ("aggregated", lambda: [r["Data"] for b in aggregate_batches(df, compress=False) for r in b]),
+        ("aggregated+zlib", lambda: [r["Data"] for b in aggregate_batches(df) for r in b]),
+    ]
+    for name, encode in variants:
+        start = time.perf_counter()
+        blobs = encode()
+        elapsed = time.perf_counter() - start
+        total_bytes = sum(len(b) for b in blobs)
+        results.append({
+            "format": name,
+            "reviews": len(df),
+            "kinesis_records": len(blobs),
+            "reviews_per_sec": round(len(df) / elapsed, 2) if elapsed > 0 else 0,
+            "bytes_per_review": round(total_bytes / max(len(df), 1), 2),
         })
+        print(f"{name:16s} | records: {len(blobs):8d} | {results[-1]['reviews_per_sec']:.2f} reviews/sec | "
+              f"{results[-1]['bytes_per_review']:.2f} bytes/review")
+    return results
+
+def print_stats(stats):
+    print(f"✅ Data streaming complete. Sent: {stats['sent']} | Failed: {stats['failed']} | "
+          f"Retried: {stats['retried']} | 📈 Throughput: {stats['throughput']:.2f} records/sec")
+    if stats["time_to_first"] is not None:
+        print(f"⏱️ Time to first record: {stats['time_to_first']:.2f}s")
 
-        if len(batch) == 500:
-            kinesis.put_records(StreamName=STREAM_NAME, Records=batch)
-            time.sleep(0.2)
-            batch.clear()
+# 다운로드 없이 S3 객체(또는 로컬 파일)를 chunk 단위로 읽으며 바로 전송
+def run_streaming(source=None, aggregated=False, client=None):
+    if source is None:
+        s3_key = "cleaned/cleaned_books_100.csv"
+        print("📡 Streaming dataset from S3...")
+        source = s3.get_object(Bucket=S3_BUCKET, Key=s3_key)["Body"]
+    else:
+        print(f"📡 Streaming dataset from {source}...")
 
-    if batch:
-        kinesis.put_records(StreamName=STREAM_NAME, Records=batch)
+    sender = KinesisSender(client or kinesis, STREAM_NAME)
+    encoder = aggregate_batches if aggregated else stamped_batches
+    stats = sender.send_batches(stream_batches(source, encoder=encoder))
+    print_stats(stats)
+    return stats
 
-def run():
+def run(aggregated=False, client=None):
     s3_key = "cleaned/cleaned_books_100.csv"
     local_path = f"{BASE_PATH}/cleaned_books_100.csv"
 
@@ -46,9 +90,19 @@ def run():
     df = pd.read_csv(local_path)
     print(f"📦 Loaded {len(df)} rows. Sending to Kinesis...")
 
-    send_chunk(df)
-    print("✅ Data streaming complete.")
+    stats = send_chunk(df, aggregated, client)
+    print_stats(stats)
     os.remove(local_path)
 
+# 사용법: python Producer.py [--download | --file <local.csv>] [--aggregate]
+#         python Producer.py --bench <local.csv>
 if __name__ == "__main__":
-    run()
+    aggregated = "--aggregate" in sys.argv
+    if "--bench" in sys.argv:
+        bench_aggregation(pd.read_csv(sys.argv[sys.argv.index("--bench") + 1]))
+    elif "--download" in sys.argv:
+        run(aggregated)
+    elif "--file" in sys.argv:
+        run_streaming(sys.argv[sys.argv.index("--file") + 1], aggregated)
+    else:
+        run_streaming(aggregated=aggregated)
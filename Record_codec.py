@@ -0,0 +1,125 @@
+import json
+import struct
+import time
+import zlib
+
+from Window_aggregator import SENTIMENT_CODES, SENTIMENT_NAMES
+
+# 여러 리뷰를 하나의 Kinesis 레코드로 묶는 바이너리 포맷
+#   header : MAGIC(2바이트) + flags(1바이트)
+#   body   : 리뷰 수(uint32) + [감정 코드(uint8) + 텍스트 길이(uint32) + UTF-8 텍스트] * N
+#   flags & FLAG_ZLIB 이면 body 전체가 zlib 압축됨
+#   flags & FLAG_TS 이면 header 바로 뒤에 생산자 시각(float64, epoch 초)이 붙음
+# JSON 레코드는 '{'로 시작하므로 MAGIC과 겹치지 않아 두 포맷을 함께 받을 수 있다
+MAGIC = b"\x00B"
+FLAG_ZLIB = 0x01
+FLAG_TS = 0x02
+TS_FMT = "<d"
+TS_SIZE = struct.calcsize(TS_FMT)
+HEADER_FMT = "<2sB"
+HEADER_SIZE = struct.calcsize(HEADER_FMT)
+COUNT_FMT = "<I"
+ENTRY_FMT = "<BI"
+ENTRY_SIZE = struct.calcsize(ENTRY_FMT)
+
+# Kinesis 레코드 최대 크기는 1 MiB, 압축 전 기준으로 여유 있게 묶음
+AGG_TARGET_BYTES = 64 * 1024
+COMPRESS_LEVEL = 1
+
+
+def sentiment_code(sentiment):
+    return SENTIMENT_CODES.get(sentiment.lower() if sentiment else "", 0)
+
+
+def pack(entries, compress=True, ts=None):
+    body = bytearray(struct.pack(COUNT_FMT, len(entries)))
+    for code, text in entries:
+        body += struct.pack(ENTRY_FMT, code, len(text))
+        body += text
+    flags = 0
+    if compress:
+        body = zlib.compress(bytes(body), COMPRESS_LEVEL)
+        flags |= FLAG_ZLIB
+    stamp = b""
+    if ts is not None:
+        flags |= FLAG_TS
+        stamp = struct.pack(TS_FMT, ts)
+    return struct.pack(HEADER_FMT, MAGIC, flags) + stamp + bytes(body)
+
+
+# 리뷰를 누적하다가 target_bytes를 넘으면 하나의 레코드로 묶어 반환
+# timestamps=True면 묶는 시점의 시각을 생산자 시각으로 기록
+class RecordAggregator:
+    def __init__(self, target_bytes=AGG_TARGET_BYTES, compress=True, timestamps=False):
+        self.target_bytes = target_bytes
+        self.compress = compress
+        self.timestamps = timestamps
+        self.entries = []
+        self.size = 0
+
+    def add(self, text, code):
+        data = text.encode("utf-8")
+        blob = None
+        if self.entries and self.size + ENTRY_SIZE + len(data) > self.target_bytes:
+            blob = self.flush()
+        self.entries.append((code, data))
+        self.size += ENTRY_SIZE + len(data)
+        return blob
+
+    def flush(self):
+        if not self.entries:
+            return None
+        blob = pack(self.entries, self.compress, time.time() if self.timestamps else None)
+        self.entries = []
+        self.size = 0
+        return blob
+
+
+# (text, 감정 코드) 쌍을 묶인 레코드 바이트열로 변환
+def aggregate(pairs, target_bytes=AGG_TARGET_BYTES, compress=True, timestamps=False):
+    aggregator = RecordAggregator(target_bytes, compress, timestamps)
+    for text, code in pairs:
+        blob = aggregator.add(text, code)
+        if blob is not None:
+            yield blob
+    blob = aggregator.flush()
+    if blob is not None:
+        yield blob
+
+
+# Kinesis 레코드 하나를 (text, sentiment, 생산자 시각) 리스트로 풀어냄 (JSON 단일 레코드도 지원)
+# 생산자 시각이 없는 (예전 형식) 레코드는 None
+def decode_events(data):
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    if data[:len(MAGIC)] != MAGIC:
+        payload = json.loads(data)
+        return [(payload.get("text", ""), payload.get("sentiment", ""), payload.get("ts"))]
+
+    _, flags = struct.unpack_from(HEADER_FMT, data, 0)
+    offset = HEADER_SIZE
+    ts = None
+    if flags & FLAG_TS:
+        (ts,) = struct.unpack_from(TS_FMT, data, offset)
+        offset += TS_SIZE
+    body = data[offset:]
+    if flags & FLAG_ZLIB:
+        body = zlib.decompress(body)
+
+    view = memoryview(body)
+    (count,) = struct.unpack_from(COUNT_FMT, view, 0)
+    offset = struct.calcsize(COUNT_FMT)
+    reviews = []
+    for _ in range(count):
+        code, length = struct.unpack_from(ENTRY_FMT, view, offset)
+        offset += ENTRY_SIZE
+        text = bytes(view[offset:offset + length]).decode("utf-8")
+        offset += length
+        reviews.append((text, SENTIMENT_NAMES.get(code, ""), ts))
+    return reviews
+
+
+# (text, sentiment) 리스트만 필요한 경우
+def decode_record(data):
+    return [(text, sentiment) for text, sentiment, _ in decode_events(data)]
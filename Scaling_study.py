@@ -0,0 +1,228 @@
+import json
+import multiprocessing as mp
+import sys
+
+import numpy as np
+import pandas as pd
+
+from Benchmark_suite import BenchData, Workload, run_workload, load_bench_data
+from Word_engine import count_arrays
+
+FIT_ROWS = 200000
+GENERATOR_BLOCK_ROWS = 50000
+DEFAULT_SEED = 42
+DEFAULT_REPEAT = 3
+OUTPUT_PREFIX = "scaling_study"
+TASKS = ("wordcount", "sentiment")
+
+
+# 실제 데이터의 분포를 따르는 결정적(seed 고정) 합성 리뷰 생성기
+# - 단어: 실제 토큰 빈도 분포에서 샘플링 (Zipf 꼬리 그대로 유지)
+# - 리뷰 길이(토큰 수)와 감정: 실제 값의 경험적 분포에서 샘플링
+# - 블록마다 (seed, 블록 번호)로 난수를 만들어 어떤 크기로 만들어도 앞부분은 항상 같음
+class SyntheticReviews:
+    def __init__(self, words, word_probs, lengths, sentiments, sentiment_probs, seed=DEFAULT_SEED):
+        self.words = np.asarray(words, dtype=object)
+        self.word_cdf = np.cumsum(word_probs)
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        self.sentiments = list(sentiments)
+        self.sentiment_probs = np.asarray(sentiment_probs, dtype=np.float64)
+        self.seed = seed
+
+    @classmethod
+    def fit(cls, df, seed=DEFAULT_SEED, fit_rows=FIT_ROWS):
+        sample = df.iloc[:fit_rows]
+        texts = [t for t in sample["cleaned_text"].tolist() if isinstance(t, str)]
+        words, counts = count_arrays(texts)
+        lengths = [len(t.split()) for t in texts] or [0]
+        sentiment_share = sample["sentiment"].dropna().astype(str).value_counts(normalize=True)
+        return cls(words, counts / max(1, counts.sum()), lengths,
+                   sentiment_share.index.tolist(), sentiment_share.to_numpy(), seed)
+
+    def _block(self, block, rows):
+        rng = np.random.default_rng([self.seed, block])
+        lengths = self.lengths[rng.integers(0, len(self.lengths), rows)]
+        idx = np.searchsorted(self.word_cdf, rng.random(int(lengths.sum())), side="right")
+        tokens = self.words[np.minimum(idx, len(self.words) - 1)].tolist()
+        bounds = np.concatenate(([0], np.cumsum(lengths))).tolist()
+        texts = [" ".join(tokens[bounds[i]:bounds[i + 1]]) for i in range(rows)]
+        sentiments = rng.choice(len(self.sentiments), size=rows, p=self.sentiment_probs)
+        return texts, [self.sentiments[i] for i in sentiments.tolist()]
+
+    def generate(self, rows):
+        texts, sentiments = [], []
+        for block, start in enumerate(range(0, rows, GENERATOR_BLOCK_ROWS)):
+            t, s = self._block(block, min(GENERATOR_BLOCK_ROWS, rows - start))
+            texts.extend(t)
+            sentiments.extend(s)
+        return pd.DataFrame({"cleaned_text": texts, "sentiment": sentiments})
+
+
+# 실제 데이터의 multiplier배 크기: 1 이하면 앞부분, 넘으면 실제 데이터 + 합성 리뷰
+def scale_frame(df, multiplier, generator):
+    rows = int(len(df) * multiplier)
+    if rows <= len(df):
+        scaled = df.iloc[:rows]
+    else:
+        scaled = pd.concat([df, generator.generate(rows - len(df))], ignore_index=True)
+    scaled = scaled.copy()
+    scaled["sentiment"] = scaled["sentiment"].astype("category")
+    return scaled
+
+
+# ---------------- 측정 ----------------
+
+def _parallel_workload(task, workers):
+    def setup(data):
+        import Hybrid_parallel
+        from Shared_columns import SharedColumns, attach_worker
+        columns = SharedColumns.from_frame(data.df)
+        attach_worker(columns)
+        pool = mp.Pool(workers, initializer=attach_worker, initargs=(columns,))
+        return Hybrid_parallel, pool, columns
+
+    def run(ctx):
+        module, pool, columns = ctx
+        if task == "wordcount":
+            module.parallel_wordcount(pool, columns, 0, len(columns), workers)
+        else:
+            # 기본값이면 PARALLEL_MIN_ROWS 미만에서 pool을 쓰지 않고 부모에서 세므로, 워커 수별 비교를 위해 항상 pool.map
+            module.parallel_sentiment(pool, columns, 0, len(columns), workers, min_parallel_rows=0)
+        return len(columns)
+
+    def teardown(ctx):
+        _, pool, columns = ctx
+        pool.close()
+        pool.join()
+        columns.close()
+        columns.unlink()
+
+    return Workload(f"{task}@{workers}", run, setup, teardown)
+
+
+def measure(task, workers, df, repeat=DEFAULT_REPEAT):
+    summary = run_workload(_parallel_workload(task, workers), BenchData(df), repeat, warmup=1)
+    print(f"📊 {task:9s} | {workers:2d} workers | {len(df):>9d} rows | median {summary['median_sec']:.4f}s "
+          f"| 📈 {summary['throughput_rps']:.2f} rows/s")
+    return summary["median_sec"]
+
+
+# Amdahl: T(p) = T(1) × (f + (1 - f) / p) → 직렬 비율 f를 최소제곱으로 추정
+def amdahl_fit(workers, times):
+    t1 = times[workers.index(1)] if 1 in workers else times[0] * workers[0]
+    x = np.array([1 - 1 / p for p in workers if p > 1])
+    y = np.array([t / t1 - 1 / p for p, t in zip(workers, times) if p > 1])
+    if not len(x) or not (x * x).sum():
+        return 0.0
+    return float(np.clip((x * y).sum() / (x * x).sum(), 0.0, 1.0))
+
+
+# 강한 스케일링: 입력 고정, 워커 수만 증가 → speedup = T(1)/T(p), 효율 = speedup/p
+def strong_scaling(df, worker_counts, repeat=DEFAULT_REPEAT):
+    results = {}
+    for task in TASKS:
+        times = [measure(task, p, df, repeat) for p in worker_counts]
+        speedup = [times[0] / t for t in times]
+        results[task] = {
+            "rows": len(df),
+            "workers": worker_counts,
+            "time_sec": times,
+            "speedup": speedup,
+            "efficiency": [s / p for s, p in zip(speedup, worker_counts)],
+            "serial_fraction": amdahl_fit(worker_counts, times),
+        }
+        print(f"🔎 {task}: Amdahl serial fraction ≈ {results[task]['serial_fraction']:.3f} "
+              f"(max speedup ≈ {1 / max(results[task]['serial_fraction'], 1e-9):.1f}x)")
+    return results
+
+
+# 약한 스케일링: 워커당 입력 고정 (p개 워커 → p × rows_per_worker행) → 효율 = T(1)/T(p)
+def weak_scaling(df, generator, worker_counts, multiplier_per_worker, repeat=DEFAULT_REPEAT):
+    results = {}
+    for task in TASKS:
+        times, rows = [], []
+        for p in worker_counts:
+            scaled = scale_frame(df, multiplier_per_worker * p, generator)
+            rows.append(len(scaled))
+            times.append(measure(task, p, scaled, repeat))
+        results[task] = {
+            "rows": rows,
+            "workers": worker_counts,
+            "time_sec": times,
+            "efficiency": [times[0] / t for t in times],
+        }
+    return results
+
+
+def plot_study(strong, weak, path):
+    import matplotlib.pyplot as plt
+
+    fig, axs = plt.subplots(len(TASKS), 3, figsize=(16, 5 * len(TASKS)))
+    for row, task in enumerate(TASKS):
+        s, w = strong[task], weak[task]
+        p = s["workers"]
+        f = s["serial_fraction"]
+        amdahl = [1 / (f + (1 - f) / n) for n in p]
+
+        axs[row][0].plot(p, s["speedup"], marker="o", color="tomato", label="Measured")
+        axs[row][0].plot(p, p, linestyle="--", color="gray", label="Ideal")
+        axs[row][0].plot(p, amdahl, linestyle=":", color="plum", label=f"Amdahl fit (f={f:.3f})")
+        axs[row][0].set_title(f"{task}: strong scaling speedup ({s['rows']} rows)")
+        axs[row][0].set_xlabel("Workers")
+        axs[row][0].set_ylabel("Speedup")
+        axs[row][0].legend()
+
+        axs[row][1].plot(p, s["efficiency"], marker="o", color="skyblue", label="Strong")
+        axs[row][1].plot(w["workers"], w["efficiency"], marker="s", color="lightgreen", label="Weak")
+        axs[row][1].axhline(1.0, linestyle="--", color="gray")
+        axs[row][1].set_title(f"{task}: parallel efficiency")
+        axs[row][1].set_xlabel("Workers")
+        axs[row][1].set_ylim(0, 1.1)
+        axs[row][1].legend()
+
+        axs[row][2].plot(p, s["time_sec"], marker="o", color="orange", label="Strong (fixed input)")
+        axs[row][2].plot(w["workers"], w["time_sec"], marker="s", color="salmon", label="Weak (input ∝ workers)")
+        axs[row][2].set_title(f"{task}: processing time")
+        axs[row][2].set_xlabel("Workers")
+        axs[row][2].set_ylabel("Time (s)")
+        axs[row][2].legend()
+
+    fig.suptitle("Scaling Study: Speedup, Efficiency and Amdahl Serial Fraction", fontsize=16)
+    plt.tight_layout()
+    plt.subplots_adjust(top=0.93)
+    plt.savefig(path)
+    plt.close()
+
+
+def _arg(argv, name, default=None):
+    return argv[argv.index(name) + 1] if name in argv else default
+
+
+# 사용법
+#   python Scaling_study.py --csv cleaned_books_100.csv [--max-workers 8] [--strong-multiplier 2]
+#          [--weak-multiplier 0.25] [--seed 42] [--repeat 3] [--rows N]
+if __name__ == "__main__":
+    argv = sys.argv
+    csv_path = _arg(argv, "--csv", "/home/ubuntu/cleaned_books_100.csv")
+    max_workers = int(_arg(argv, "--max-workers", mp.cpu_count()))
+    repeat = int(_arg(argv, "--repeat", DEFAULT_REPEAT))
+    rows = _arg(argv, "--rows")
+    worker_counts = list(range(1, max_workers + 1))
+
+    real = load_bench_data(csv_path, int(rows) if rows else None).df
+    generator = SyntheticReviews.fit(real, int(_arg(argv, "--seed", DEFAULT_SEED)))
+    print(f"🧪 Generator fitted: {len(generator.words)} words, {len(generator.sentiments)} sentiments")
+
+    strong_df = scale_frame(real, float(_arg(argv, "--strong-multiplier", 1)), generator)
+    print(f"\n🚀 Strong scaling on {len(strong_df)} rows, workers {worker_counts}")
+    strong = strong_scaling(strong_df, worker_counts, repeat)
+    del strong_df
+
+    weak_multiplier = float(_arg(argv, "--weak-multiplier", 1 / max_workers))
+    print(f"\n🚀 Weak scaling: {weak_multiplier:.3f}× dataset per worker")
+    weak = weak_scaling(real, generator, worker_counts, weak_multiplier, repeat)
+
+    with open(f"{OUTPUT_PREFIX}.json", "w") as f:
+        json.dump({"strong": strong, "weak": weak, "cpu_count": mp.cpu_count(), "source": csv_path}, f, indent=2)
+    plot_study(strong, weak, f"{OUTPUT_PREFIX}.png")
+    print(f"\n✅ complete: {OUTPUT_PREFIX}.json, {OUTPUT_PREFIX}.png")
@@ -0,0 +1,106 @@
+import multiprocessing as mp
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+# 이 행 수보다 작으면 pool 시작 비용을 회수할 수 없어 단일 프로세스 벡터 연산만 사용
+# (bench_sentiment 결과 기준, 인스턴스에 따라 조정)
+PARALLEL_MIN_ROWS = 5_000_000
+CHUNK_SIZE = 1_000_000
+
+
+# 값 목록/Series를 categorical로 한 번 변환 (이미 categorical이면 그대로 사용)
+def to_categorical(values):
+    if isinstance(values, pd.Categorical):
+        return values
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.CategoricalDtype):
+        return values.array
+    return pd.Categorical(values)
+
+
+# categorical 코드에 bincount 한 번 → 카테고리(몇 개뿐)만 소문자화해서 합침
+# 결측(NaN)과 문자열이 아닌 값은 제외
+def count_sentiments_vectorized(values):
+    cat = to_categorical(values)
+    codes = np.asarray(cat.codes)
+    counts = np.bincount(codes[codes >= 0], minlength=len(cat.categories))
+    result = Counter()
+    for name, count in zip(cat.categories, counts.tolist()):
+        if count and isinstance(name, str):
+            result[name.lower()] += count
+    return result
+
+
+# 입력이 충분히 클 때만 multiprocessing으로 나눠 처리
+def count_sentiments_auto(values, processes=None, pool=None, min_parallel_rows=PARALLEL_MIN_ROWS):
+    n = len(values)
+    if n < min_parallel_rows:
+        return count_sentiments_vectorized(values)
+
+    if isinstance(values, pd.Series):
+        values = values.tolist()
+    chunks = [values[i:i + CHUNK_SIZE] for i in range(0, n, CHUNK_SIZE)]
+    if pool is not None:
+        parts = pool.map(count_sentiments_vectorized, chunks)
+    else:
+        with mp.Pool(processes or mp.cpu_count()) as new_pool:
+            parts = new_pool.map(count_sentiments_vectorized, chunks)
+
+    total = Counter()
+    for part in parts:
+        total.update(part)
+    return total
+
+
+# ---------------- 벤치마크: 경로별로 어느 크기에서 유리한지 ----------------
+
+def _loop_count(sentiments):
+    counter = Counter()
+    for s in sentiments:
+        if isinstance(s, str):
+            counter[s.lower()] += 1
+    return counter
+
+
+def _pool_loop_count(sentiments):
+    chunk = max(1, len(sentiments) // mp.cpu_count())
+    chunks = [sentiments[i:i + chunk] for i in range(0, len(sentiments), chunk)]
+    with mp.Pool(mp.cpu_count()) as pool:
+        parts = pool.map(_loop_count, chunks)
+    return sum(parts, Counter())
+
+
+def bench_sentiment(sentiments, sizes=(10_000, 100_000, 1_000_000, 5_000_000)):
+    rows = []
+    for size in sizes:
+        if size > len(sentiments):
+            reps = size // len(sentiments) + 1
+            sample = (sentiments * reps)[:size]
+        else:
+            sample = sentiments[:size]
+
+        variants = [
+            ("python loop", lambda: _loop_count(sample)),
+            ("pool + python loop", lambda: _pool_loop_count(sample)),
+            ("vectorized", lambda: count_sentiments_vectorized(sample)),
+            ("pool + vectorized", lambda: count_sentiments_auto(sample, min_parallel_rows=0)),
+        ]
+        timings = {}
+        for name, fn in variants:
+            start = time.perf_counter()
+            result = fn()
+            timings[name] = time.perf_counter() - start
+        best = min(timings, key=timings.get)
+        print(f"{size:>10d} rows | " + " | ".join(f"{k}: {v:.4f}s" for k, v in timings.items()) + f" | 🏆 {best}")
+        rows.append({"rows": size, **timings, "best": best})
+    return rows
+
+
+if __name__ == "__main__":
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else "/home/ubuntu/cleaned_books_100.csv"
+    values = pd.read_csv(csv_path, usecols=["sentiment"])["sentiment"].tolist()
+    print(f"📊 Sentiment aggregation benchmark ({len(values)} source rows)")
+    bench_sentiment(values)
@@ -0,0 +1,124 @@
+import struct
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from Sentiment_engine import count_sentiments_vectorized, to_categorical
+from Word_engine import count_arrays, pack_arrays
+
+# 헤더: 행 수, arena 바이트 수 (64바이트로 패딩)
+HEADER_FMT = "<QQ"
+HEADER_SIZE = 64
+SEPARATOR = b" "
+
+
+# 텍스트/감정 컬럼을 한 번만 shared_memory에 올려 두고 워커는 (start, end) 행 범위만 받음
+#   [헤더][byte offsets int64 (rows+1)][감정 코드 int32 (rows)][텍스트 arena]
+# - 행 i의 텍스트 = arena[offsets[i]:offsets[i+1]] (끝에 공백 구분자 1바이트 포함)
+# - 결측/문자열이 아닌 텍스트는 빈 문자열 → 토큰 0개 (Hybrid word_count와 같은 규칙)
+# - 구분자가 공백이라 구간 전체를 한 번 decode해서 바로 split 가능
+class SharedColumns:
+    def __init__(self, rows=0, arena_bytes=0, categories=(), name=None, create=True):
+        if create:
+            size = HEADER_SIZE + (rows + 1) * 8 + rows * 4 + arena_bytes
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=max(size, 1))
+            struct.pack_into(HEADER_FMT, self.shm.buf, 0, rows, arena_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            rows, arena_bytes = struct.unpack_from(HEADER_FMT, self.shm.buf, 0)
+
+        self.owner = create
+        self.rows = rows
+        self.arena_bytes = arena_bytes
+        self.categories = list(categories)
+
+        codes_offset = HEADER_SIZE + (rows + 1) * 8
+        arena_offset = codes_offset + rows * 4
+        self.offsets = np.ndarray((rows + 1,), dtype=np.int64, buffer=self.shm.buf, offset=HEADER_SIZE)
+        self.codes = np.ndarray((rows,), dtype=np.int32, buffer=self.shm.buf, offset=codes_offset)
+        self.arena = np.ndarray((arena_bytes,), dtype=np.uint8, buffer=self.shm.buf, offset=arena_offset)
+
+    # DataFrame의 cleaned_text / sentiment 컬럼을 한 번 인코딩해서 공유 메모리 생성
+    @classmethod
+    def from_frame(cls, df):
+        texts = df["cleaned_text"].tolist()
+        encoded = [t.encode("utf-8") if isinstance(t, str) else b"" for t in texts]
+        data = SEPARATOR.join(encoded) + SEPARATOR if encoded else b""
+        lens = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)) + len(SEPARATOR)
+
+        cat = to_categorical(df["sentiment"])
+        columns = cls(len(encoded), len(data), cat.categories.tolist())
+        columns.offsets[0] = 0
+        np.cumsum(lens, out=columns.offsets[1:])
+        columns.codes[:] = np.asarray(cat.codes)
+        columns.arena[:] = np.frombuffer(data, dtype=np.uint8)
+        return columns
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def __len__(self):
+        return self.rows
+
+    # 다른 프로세스로 넘길 때는 이름으로 다시 attach (카테고리 이름만 함께 전달)
+    def __reduce__(self):
+        return (SharedColumns, (0, 0, self.categories, self.shm.name, False))
+
+    # [start, end) 행 텍스트를 공백으로 이은 문자열 하나로 반환
+    def joined_text(self, start, end):
+        b0, b1 = int(self.offsets[start]), int(self.offsets[end])
+        return self.arena[b0:b1].tobytes().decode("utf-8")
+
+    # [start, end) 행 텍스트 목록 (결측은 빈 문자열): 구간을 한 번 복사한 뒤 행별로 decode
+    def texts(self, start, end):
+        b0 = int(self.offsets[start])
+        data = self.arena[b0:int(self.offsets[end])].tobytes()
+        rel = (self.offsets[start:end + 1] - b0).tolist()
+        return [data[rel[i]:rel[i + 1] - len(SEPARATOR)].decode("utf-8") for i in range(end - start)]
+
+    def sentiments(self, start, end):
+        return pd.Categorical.from_codes(self.codes[start:end], categories=self.categories)
+
+    def close(self):
+        # numpy 뷰가 남아 있으면 shm.close()가 실패하므로 먼저 해제
+        self.offsets = self.codes = self.arena = None
+        self.shm.close()
+
+    def unlink(self):
+        if self.owner:
+            self.shm.unlink()
+
+
+# [start, end)를 parts개 연속 구간으로 빠짐없이 분할 (나머지 행도 포함)
+def split_ranges(start, end, parts):
+    parts = max(1, min(parts, end - start))
+    bounds = [start + (end - start) * i // parts for i in range(parts + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(parts)]
+
+
+# ---------------- 워커 측: Pool initializer로 한 번 attach ----------------
+
+_worker_columns = None
+
+
+def attach_worker(columns):
+    global _worker_columns
+    _worker_columns = columns
+
+
+def count_words_range(bounds):
+    start, end = bounds
+    return pack_arrays(*count_arrays([_worker_columns.joined_text(start, end)]))
+
+
+def count_sentiments_range(bounds):
+    start, end = bounds
+    return count_sentiments_vectorized(_worker_columns.sentiments(start, end))
+
+
+# 등록된 모든 집계를 행 범위 하나에 대해 한 번의 스캔으로 계산 (task = (FusedJob, start, end))
+def fused_range(task):
+    job, start, end = task
+    return job.map_chunk(_worker_columns.texts(start, end), _worker_columns.sentiments(start, end))
@@ -0,0 +1,205 @@
+import struct
+import time
+from multiprocessing import Process, Manager, shared_memory
+
+from Window_aggregator import SENTIMENT_CODES, SENTIMENT_NAMES
+
+# 헤더: head, tail, arena_head, arena_tail, capacity, arena_size (64바이트로 패딩)
+HEADER_FMT = "<QQQQQQ"
+HEADER_SIZE = 64
+# 슬롯: timestamp(float64), arena offset(uint64), 길이(uint32), 감정 코드(uint8)
+SLOT_FMT = "<dQIB3x"
+SLOT_SIZE = struct.calcsize(SLOT_FMT)
+
+HEAD, TAIL, ARENA_HEAD, ARENA_TAIL, CAPACITY, ARENA_SIZE = range(6)
+
+# 리뷰가 아닌 제어용 레코드 (예: 체크포인트용 "shard_id sequence" 표시)
+MARKER_CODE = 255
+
+DEFAULT_CAPACITY = 65536
+DEFAULT_ARENA_BYTES = 64 * 1024 * 1024
+
+
+# multiprocessing.shared_memory 기반 고정 크기 링 버퍼
+# - 단일 생산자 / 단일 소비자 전용, lock 없음
+# - head/tail은 단조 증가하는 uint64, 생산자만 head를, 소비자만 tail을 쓴다
+# - 슬롯에는 고정 크기 레코드, 토큰 바이트는 별도 arena(바이트 링)에 저장
+# - 데이터를 먼저 쓰고 인덱스를 마지막에 갱신해 반대편에 공개 (x86 TSO 기준)
+class SharedRing:
+    def __init__(self, capacity=DEFAULT_CAPACITY, arena_bytes=DEFAULT_ARENA_BYTES, name=None, create=True):
+        if create:
+            size = HEADER_SIZE + capacity * SLOT_SIZE + arena_bytes
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            struct.pack_into(HEADER_FMT, self.shm.buf, 0, 0, 0, 0, 0, capacity, arena_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            capacity = self._read(CAPACITY)
+            arena_bytes = self._read(ARENA_SIZE)
+
+        self.owner = create
+        self.capacity = capacity
+        self.arena_bytes = arena_bytes
+        self.slots_offset = HEADER_SIZE
+        self.arena_offset = HEADER_SIZE + capacity * SLOT_SIZE
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    # 다른 프로세스로 넘길 때는 이름으로 다시 attach
+    def __reduce__(self):
+        return (SharedRing, (0, 0, self.shm.name, False))
+
+    def _read(self, field):
+        return struct.unpack_from("<Q", self.shm.buf, field * 8)[0]
+
+    def _write(self, field, value):
+        struct.pack_into("<Q", self.shm.buf, field * 8, value)
+
+    def __len__(self):
+        return self._read(HEAD) - self._read(TAIL)
+
+    # 생산자: 레코드 1건 기록, 가득 찼으면 False
+    def push(self, ts, code, payload):
+        head = self._read(HEAD)
+        if head - self._read(TAIL) >= self.capacity:
+            return False
+
+        n = len(payload)
+        if n > self.arena_bytes:
+            return False
+
+        a_head = self._read(ARENA_HEAD)
+        pos = a_head % self.arena_bytes
+        if pos + n > self.arena_bytes:
+            # arena 끝에 들어가지 않으면 남은 부분은 건너뛰고 처음부터 기록
+            a_head += self.arena_bytes - pos
+            pos = 0
+        if a_head + n - self._read(ARENA_TAIL) > self.arena_bytes:
+            return False
+
+        buf = self.shm.buf
+        start = self.arena_offset + pos
+        buf[start:start + n] = payload
+        slot = self.slots_offset + (head % self.capacity) * SLOT_SIZE
+        struct.pack_into(SLOT_FMT, buf, slot, ts, a_head, n, code)
+
+        self._write(ARENA_HEAD, a_head + n)
+        self._write(HEAD, head + 1)
+        return True
+
+    # 소비자: 쌓인 레코드를 (ts, code, payload) 리스트로 꺼냄
+    def pop_many(self, max_items=None):
+        head = self._read(HEAD)
+        tail = self._read(TAIL)
+        if max_items is not None:
+            head = min(head, tail + max_items)
+
+        buf = self.shm.buf
+        out = []
+        arena_tail = None
+        while tail < head:
+            slot = self.slots_offset + (tail % self.capacity) * SLOT_SIZE
+            ts, offset, n, code = struct.unpack_from(SLOT_FMT, buf, slot)
+            start = self.arena_offset + offset % self.arena_bytes
+            out.append((ts, code, bytes(buf[start:start + n])))
+            arena_tail = offset + n
+            tail += 1
+
+        if arena_tail is not None:
+            self._write(ARENA_TAIL, arena_tail)
+            self._write(TAIL, tail)
+        return out
+
+    # 토큰화된 리뷰 단위 헬퍼
+    def push_record(self, ts, words, sentiment):
+        code = SENTIMENT_CODES.get(sentiment.lower() if sentiment else "", 0)
+        return self.push(ts, code, " ".join(words).encode("utf-8"))
+
+    def push_marker(self, ts, text):
+        return self.push(ts, MARKER_CODE, text.encode("utf-8"))
+
+    # 마커 레코드는 결과에서 빼고 on_marker(text)로 전달
+    def pop_records(self, max_items=None, on_marker=None):
+        records = []
+        for ts, code, payload in self.pop_many(max_items):
+            if code == MARKER_CODE:
+                if on_marker is not None:
+                    on_marker(payload.decode("utf-8"))
+                continue
+            words = payload.decode("utf-8").split(" ") if payload else []
+            records.append((ts, words, SENTIMENT_NAMES.get(code, "")))
+        return records
+
+    def close(self):
+        self.shm.close()
+
+    def unlink(self):
+        if self.owner:
+            self.shm.unlink()
+
+
+# ---------------- 벤치마크: Manager().list() vs SharedRing ----------------
+
+BENCH_WORDS = "this book was a great read and the story kept me hooked until the end".split()
+
+
+def _manager_writer(shared_window, n):
+    for i in range(n):
+        shared_window.append((time.time(), BENCH_WORDS, "positive"))
+
+
+def _ring_writer(ring, n):
+    for i in range(n):
+        while not ring.push_record(time.time(), BENCH_WORDS, "positive"):
+            time.sleep(0.0005)
+
+
+def bench_manager(n):
+    with Manager() as manager:
+        shared_window = manager.list()
+        start = time.time()
+        proc = Process(target=_manager_writer, args=(shared_window, n))
+        proc.start()
+        received = 0
+        # 기존 Consumer.py 방식: [0] 조회 후 del [0]
+        while received < n:
+            if len(shared_window) == 0:
+                time.sleep(0.0005)
+                continue
+            _ = shared_window[0]
+            del shared_window[0]
+            received += 1
+        proc.join()
+        return n / (time.time() - start)
+
+
+def bench_ring(n):
+    ring = SharedRing(capacity=8192, arena_bytes=8 * 1024 * 1024)
+    try:
+        start = time.time()
+        proc = Process(target=_ring_writer, args=(ring, n))
+        proc.start()
+        received = 0
+        while received < n:
+            batch = ring.pop_records()
+            if not batch:
+                time.sleep(0.0005)
+            received += len(batch)
+        proc.join()
+        return n / (time.time() - start)
+    finally:
+        ring.close()
+        ring.unlink()
+
+
+if __name__ == "__main__":
+    import sys
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"📊 Transferring {n} records between processes...")
+    manager_rps = bench_manager(n)
+    print(f"Manager().list(): {manager_rps:.2f} records/sec")
+    ring_rps = bench_ring(n)
+    print(f"SharedRing      : {ring_rps:.2f} records/sec")
+    print(f"Speedup         : {ring_rps / manager_rps:.2f}x")
@@ -0,0 +1,121 @@
+import math
+import os
+import shutil
+import struct
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from Word_engine import count_arrays, pack_arrays, unpack_arrays, WordCounts, MAPREDUCE_STRIP
+
+SPILL_DIR = os.environ.get("SPILL_DIR", "/home/ubuntu/spill")
+MEMORY_BUDGET_MB = 512
+MIN_PARTITIONS = 8
+# 스필 파일 전체 크기 ≈ 입력 CSV 크기 × 이 값 (chunk마다 중복되는 단어 + int64 count 포함한 보수적 추정)
+SPILL_EXPANSION = 2.0
+
+# 스필 파일: (단어 blob 길이, 단어 수) 헤더 + \0로 이은 단어 bytes + int64 count 배열
+SPILL_HEADER_FMT = "<QQ"
+SPILL_HEADER_SIZE = struct.calcsize(SPILL_HEADER_FMT)
+
+
+# 디렉터리 구조 (Hadoop의 map output / reduce input과 같은 역할)
+#   part-0003/map-000017.bin : map 작업 17이 파티션 3에 보낸 (단어, count)
+#   result-0003.bin          : 파티션 3의 최종 (단어, count)
+def partition_dir(spill_dir, p):
+    return os.path.join(spill_dir, f"part-{p:04d}")
+
+
+def result_path(spill_dir, p):
+    return os.path.join(spill_dir, f"result-{p:04d}.bin")
+
+
+# 입력 크기와 메모리 예산으로 파티션 수 결정: reducer 하나가 파티션 하나를 예산 안에서 병합
+def partitions_for_budget(input_bytes, budget_bytes, min_partitions=MIN_PARTITIONS):
+    return max(min_partitions, math.ceil(input_bytes * SPILL_EXPANSION / budget_bytes))
+
+
+def prepare_spill_dir(spill_dir, num_partitions):
+    shutil.rmtree(spill_dir, ignore_errors=True)
+    for p in range(num_partitions):
+        os.makedirs(partition_dir(spill_dir, p))
+
+
+def cleanup_spill_dir(spill_dir):
+    shutil.rmtree(spill_dir, ignore_errors=True)
+
+
+# 프로세스마다 같은 값이 나오는 해시로 파티션 번호 계산 (파이썬 hash()는 프로세스마다 다를 수 있음)
+def partition_of(words, num_partitions):
+    hashes = pd.util.hash_array(np.asarray(words, dtype=object))
+    return (hashes % np.uint64(num_partitions)).astype(np.int64)
+
+
+def write_spill(path, words, counts):
+    words_blob, counts_blob = pack_arrays(words, counts)
+    with open(path, "wb") as f:
+        f.write(struct.pack(SPILL_HEADER_FMT, len(words_blob), len(words)))
+        f.write(words_blob)
+        f.write(counts_blob)
+    return SPILL_HEADER_SIZE + len(words_blob) + len(counts_blob)
+
+
+def read_spill(path):
+    with open(path, "rb") as f:
+        words_len, n = struct.unpack(SPILL_HEADER_FMT, f.read(SPILL_HEADER_SIZE))
+        words_blob = f.read(words_len)
+        counts_blob = f.read(n * 8)
+    return unpack_arrays((words_blob, counts_blob))
+
+
+# map 작업: chunk 하나를 센 뒤 (단어, count)를 해시 파티션별 스필 파일로 기록
+# 반환값: (map 번호, 기록한 바이트 수) — 결과는 디스크로만 전달
+def map_spill(task, spill_dir, num_partitions, strip_pattern=MAPREDUCE_STRIP, coerce=True):
+    map_id, texts = task
+    words, counts = count_arrays(texts, strip_pattern, coerce)
+    if not words:
+        return map_id, 0
+
+    parts = partition_of(words, num_partitions)
+    order = np.argsort(parts, kind="stable")
+    bounds = np.searchsorted(parts[order], np.arange(num_partitions + 1))
+    written = 0
+    for p in range(num_partitions):
+        idx = order[bounds[p]:bounds[p + 1]]
+        if len(idx) == 0:
+            continue
+        path = os.path.join(partition_dir(spill_dir, p), f"map-{map_id:06d}.bin")
+        written += write_spill(path, [words[i] for i in idx], counts[idx])
+    return map_id, written
+
+
+# reduce 작업: 파티션 하나의 스필 파일을 하나씩 읽어 병합 (메모리 = 파티션의 고유 단어 수)
+# 반환값: (파티션 번호, 파티션 내 top_n, 고유 단어 수, 읽은 스필 바이트 수)
+def reduce_partition(p, spill_dir, top_n=10):
+    part_dir = partition_dir(spill_dir, p)
+    total = WordCounts()
+    spill_bytes = 0
+    for name in sorted(os.listdir(part_dir)):
+        path = os.path.join(part_dir, name)
+        spill_bytes += os.path.getsize(path)
+        total.add(*read_spill(path))
+    write_spill(result_path(spill_dir, p), total.words, total.counts[:len(total)])
+    shutil.rmtree(part_dir, ignore_errors=True)
+    return p, total.most_common(top_n), len(total), spill_bytes
+
+
+# 파티션끼리 단어가 겹치지 않으므로 전체 top_n은 파티션별 top_n 후보 안에 있음
+def merge_partition_tops(results, top_n=10):
+    candidates = [wc for _, top, _, _ in results for wc in top]
+    candidates.sort(key=lambda wc: (-wc[1], wc[0]))
+    return candidates[:top_n]
+
+
+# 검증용: 모든 파티션 결과를 Counter 하나로 읽음
+def read_partition_results(spill_dir, num_partitions):
+    total = Counter()
+    for p in range(num_partitions):
+        words, counts = read_spill(result_path(spill_dir, p))
+        total.update(dict(zip(words, counts.tolist())))
+    return total
@@ -0,0 +1,140 @@
+import json
+import sys
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+import Producer
+from Fake_kinesis import FakeKinesis, PUT_BYTES_PER_SEC, PUT_RECORDS_PER_SEC
+from Kinesis_consumer import KinesisConsumer, event_time
+from Record_codec import decode_events
+from Window_aggregator import PaneWindowAggregator, WINDOW_SECONDS, SLIDING_INTERVAL_SECONDS
+
+# 생산자가 끝난 뒤 이 시간 동안 새로 보이는 레코드가 없으면 측정 종료
+IDLE_STOP_SECONDS = 3.0
+OUTPUT_FILE = "stream_benchmark.json"
+
+
+def tokenize(text):
+    if not isinstance(text, str):
+        return []
+    return text.lower().split()
+
+
+# 소비 측: Consumer_streamlit.handle_records와 같은 처리 후, 윈도우에 반영된 시각 - 생산자 시각을 지연으로 기록
+class LatencyProbe:
+    def __init__(self):
+        self.aggregator = PaneWindowAggregator(WINDOW_SECONDS, SLIDING_INTERVAL_SECONDS)
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.per_second = Counter()
+        self.visible = 0
+        self.last_visible = None
+
+    def handle_records(self, shard_id, records):
+        now = time.time()
+        parsed = []
+        for record in records:
+            try:
+                for text, sentiment, ts in decode_events(record["Data"]):
+                    parsed.append((tokenize(text), sentiment, ts, event_time(record, ts, now)))
+            except Exception:
+                continue
+
+        with self.lock:
+            for words, sentiment, _, event_ts in parsed:
+                self.aggregator.add(event_ts, words, sentiment)
+            visible = time.time()
+            self.latencies.extend(visible - ts for _, _, ts, _ in parsed if ts is not None)
+            self.visible += len(parsed)
+            self.per_second[int(visible)] += len(parsed)
+            self.last_visible = visible
+
+
+def summarize(probe, sender_stats, fake, started):
+    lat = np.asarray(probe.latencies) * 1000 if probe.latencies else np.zeros(1)
+    # 처음/마지막 1초는 부분 구간이라 제외한 초당 처리량
+    seconds = sorted(probe.per_second)[1:-1]
+    steady = [probe.per_second[s] for s in seconds] or list(probe.per_second.values()) or [0]
+    span = (probe.last_visible or started) - started
+    return {
+        "reviews_visible": probe.visible,
+        "kinesis_records_sent": sender_stats["sent"],
+        "kinesis_records_failed": sender_stats["failed"],
+        "kinesis_records_retried": sender_stats["retried"],
+        "producer_records_per_sec": sender_stats["throughput"],
+        "ingest_reviews_per_sec": probe.visible / span if span > 0 else 0,
+        "sustained_reviews_per_sec_median": float(np.median(steady)),
+        "sustained_reviews_per_sec_min": float(min(steady)),
+        "latency_ms_p50": float(np.percentile(lat, 50)),
+        "latency_ms_p95": float(np.percentile(lat, 95)),
+        "latency_ms_p99": float(np.percentile(lat, 99)),
+        "latency_ms_max": float(lat.max()),
+        "throttled_puts": fake.throttled_puts,
+        "throttled_gets": fake.throttled_gets,
+    }
+
+
+# Producer → (가짜) Kinesis → 소비 엔진 → 윈도우 집계까지 한 프로세스에서 실행
+def run_benchmark(df, shards=2, put_limit=PUT_RECORDS_PER_SEC, aggregated=False):
+    # put_limit=0이면 put 한도(레코드/바이트) 없이 소비 측 처리량만 측정
+    fake = FakeKinesis(shard_count=shards, stream_name=Producer.STREAM_NAME,
+                       put_records_per_sec=put_limit or None, put_bytes_per_sec=PUT_BYTES_PER_SEC if put_limit else None)
+    probe = LatencyProbe()
+    consumer = KinesisConsumer(fake, Producer.STREAM_NAME, probe.handle_records, iterator_type="TRIM_HORIZON")
+    consumer.start()
+
+    started = time.time()
+    result = {}
+    producer = threading.Thread(target=lambda: result.update(Producer.send_chunk(df, aggregated, fake)))
+    producer.start()
+
+    last_seen = (0, time.time())
+    while True:
+        time.sleep(0.2)
+        if probe.visible != last_seen[0]:
+            last_seen = (probe.visible, time.time())
+        if not producer.is_alive() and time.time() - last_seen[1] >= IDLE_STOP_SECONDS:
+            break
+    consumer.stop()
+    producer.join()
+    return summarize(probe, result, fake, started)
+
+
+def print_summary(s):
+    print("=========================================")
+    print(f"1. Reviews visible: {s['reviews_visible']} (Kinesis records sent {s['kinesis_records_sent']}, "
+          f"failed {s['kinesis_records_failed']}, retried {s['kinesis_records_retried']})")
+    print(f"2. Ingest rate: {s['ingest_reviews_per_sec']:.2f} reviews/sec "
+          f"(sustained median {s['sustained_reviews_per_sec_median']:.0f}/s, min {s['sustained_reviews_per_sec_min']:.0f}/s)")
+    print(f"3. Produce-to-visible latency: p50 {s['latency_ms_p50']:.1f} ms | p95 {s['latency_ms_p95']:.1f} ms | "
+          f"p99 {s['latency_ms_p99']:.1f} ms | max {s['latency_ms_max']:.1f} ms")
+    print(f"4. Throttled: put {s['throttled_puts']} records | get {s['throttled_gets']} calls")
+
+
+def _arg(argv, name, default=None):
+    return argv[argv.index(name) + 1] if name in argv else default
+
+
+# 사용법: python Stream_benchmark.py --csv cleaned_books_25.csv [--rows 20000] [--shards 2]
+#                                    [--put-limit 1000 (샤드당 records/sec, 0 = 무제한)] [--aggregate]
+if __name__ == "__main__":
+    argv = sys.argv
+    csv_path = _arg(argv, "--csv", "/home/ubuntu/cleaned_books_25.csv")
+    rows = int(_arg(argv, "--rows", 20000))
+    shards = int(_arg(argv, "--shards", 2))
+    put_limit = int(_arg(argv, "--put-limit", PUT_RECORDS_PER_SEC))
+    aggregated = "--aggregate" in argv
+
+    df = pd.read_csv(csv_path, nrows=rows)
+    print(f"📡 End-to-end stream benchmark: {len(df)} reviews | {shards} shards | "
+          f"put limit {put_limit or 'unlimited'}/shard/s | {'aggregated' if aggregated else 'json'} records")
+    summary = run_benchmark(df, shards, put_limit, aggregated)
+    print_summary(summary)
+    with open(OUTPUT_FILE, "w") as f:
+        json.dump({"rows": len(df), "shards": shards, "put_limit": put_limit,
+                   "aggregated": aggregated, **summary}, f, indent=2)
+    print(f"\n✅ Results written to {OUTPUT_FILE}")
@@ -0,0 +1,73 @@
+import resource
+import threading
+
+import pandas as pd
+
+# 워커에 동시에 넘겨 둘 수 있는 최대 chunk 수 (= 메모리에 올라와 있는 입력 chunk 상한)
+MAX_IN_FLIGHT_FACTOR = 2
+STREAM_CHUNK_ROWS = 50000
+
+
+# 현재 프로세스의 최대 RSS (MiB): /proc의 VmHWM, 없으면 getrusage
+def peak_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# 단계별로 따로 측정하기 위해 최대 RSS 초기화 (Linux clear_refs, 실패하면 누적값 그대로)
+def reset_peak_rss():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+# 워커 결과에 함께 실어 보낼 워커 자신의 최대 RSS (MiB)
+def worker_peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# CSV(로컬 경로 또는 S3 StreamingBody)를 chunk 단위로 읽어 한 컬럼의 값 목록을 반환
+# rows에는 결측 포함 읽은 행 수를 누적
+def iter_column_chunks(source, column="cleaned_text", chunk_rows=STREAM_CHUNK_ROWS, rows=None):
+    for chunk in pd.read_csv(source, usecols=[column], chunksize=chunk_rows):
+        if rows is not None:
+            rows[0] += len(chunk)
+        yield chunk[column].dropna().tolist()
+
+
+# imap_unordered는 입력 iterable을 별도 스레드에서 끝까지 당겨 가므로
+# semaphore로 "보냈지만 아직 결과를 받지 않은" chunk 수를 max_in_flight개로 제한
+def bounded_imap_unordered(pool, fn, iterable, max_in_flight):
+    slots = threading.BoundedSemaphore(max_in_flight)
+    stop = threading.Event()
+
+    def feed():
+        for item in iterable:
+            while not slots.acquire(timeout=0.1):
+                if stop.is_set():
+                    return
+            yield item
+
+    try:
+        for result in pool.imap_unordered(fn, feed()):
+            slots.release()
+            yield result
+    finally:
+        # 중간에 멈추면 입력 스레드가 semaphore에서 기다리지 않도록 알림
+        stop.set()
+
+
+# 결과가 도착하는 순서대로 fold(state, result) → 최종 state
+def stream_fold(pool, fn, chunks, fold, state, max_in_flight):
+    for result in bounded_imap_unordered(pool, fn, chunks, max_in_flight):
+        state = fold(state, result)
+    return state
@@ -0,0 +1,107 @@
+import os
+import time
+from collections import defaultdict
+
+import numpy as np
+
+# 작업 하나가 워커에서 걸렸으면 하는 시간 (행 수가 아니라 시간 기준으로 크기 결정)
+TARGET_TASK_MS = 200
+# 보정(calibration)용으로 부모 프로세스에서 먼저 처리할 텍스트 양
+CALIBRATION_BYTES = 1024 * 1024
+MIN_TASK_BYTES = 64 * 1024
+MAX_TASK_BYTES = 64 * 1024 * 1024
+# 워커당 최소 작업 수 (느린 작업 하나가 전체 시간을 결정하지 않도록)
+MIN_TASKS_PER_WORKER = 4
+
+
+# 행별 텍스트 길이 → 누적 offset (행 i = offsets[i]:offsets[i+1])
+def offsets_from_lengths(lengths):
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+# [start, end) 행을 텍스트 양이 task_bytes 정도인 연속 구간으로 분할 (모든 행 포함, 빈 구간 없음)
+def byte_balanced_ranges(offsets, start, end, task_bytes):
+    if end <= start:
+        return []
+    base, total = int(offsets[start]), int(offsets[end]) - int(offsets[start])
+    parts = max(1, -(-total // max(1, task_bytes)))
+    targets = base + (np.arange(1, parts) * total) // parts
+    cuts = np.searchsorted(offsets[start:end + 1], targets, side="left") + start
+    bounds = np.unique(np.concatenate(([start], np.clip(cuts, start, end), [end])))
+    return [(int(bounds[i]), int(bounds[i + 1])) for i in range(len(bounds) - 1)]
+
+
+# 보정 결과(bytes/sec)로 작업 크기 결정: 목표 시간 × 처리 속도, 워커당 최소 작업 수 보장
+def task_bytes_for(rate, total_bytes, num_workers, target_ms=TARGET_TASK_MS):
+    size = int(rate * target_ms / 1000)
+    size = min(size, total_bytes // max(1, num_workers * MIN_TASKS_PER_WORKER))
+    return max(MIN_TASK_BYTES, min(MAX_TASK_BYTES, size))
+
+
+# 워커 측: 작업 결과와 함께 pid, 시작/종료 시각 반환
+def run_timed(task):
+    fn, arg = task
+    started = time.time()
+    result = fn(arg)
+    return result, os.getpid(), started, time.time()
+
+
+# 작업별 시간으로 워커별 busy/idle 집계 (idle = 전체 시간 - busy, 작업을 못 받은 워커는 전부 idle)
+def worker_report(busy, tasks, wall, num_workers):
+    report = [{"worker": pid, "tasks": tasks[pid], "busy": busy[pid], "idle": max(0.0, wall - busy[pid])}
+              for pid in sorted(busy)]
+    for i in range(num_workers - len(report)):
+        report.append({"worker": f"unused-{i}", "tasks": 0, "busy": 0.0, "idle": wall})
+    return report
+
+
+def print_worker_report(report):
+    for row in report:
+        total = row["busy"] + row["idle"]
+        share = row["busy"] / total * 100 if total else 0
+        print(f"   👷 {row['worker']}: {row['tasks']} tasks | busy {row['busy']:.2f}s | "
+              f"idle {row['idle']:.2f}s | {share:.0f}% busy")
+
+
+def idle_fraction(report):
+    busy = sum(r["busy"] for r in report)
+    total = busy + sum(r["idle"] for r in report)
+    return 1 - busy / total if total else 0.0
+
+
+# 동적 스케줄링: 작업을 하나씩 나눠 주고 (chunksize=1) 먼저 끝난 워커가 다음 작업을 가져감
+#   1) 앞부분 CALIBRATION_BYTES를 부모에서 처리하며 처리 속도 측정 (결과는 버리지 않고 fold)
+#   2) 나머지를 목표 시간에 맞는 바이트 균형 구간으로 나눠 imap_unordered로 분배
+# make_arg(start, end) → fn에 넘길 인자, fold(state, result) → 새 state
+# 반환값: (state, 워커별 busy/idle 보고)
+def adaptive_map(pool, fn, make_arg, offsets, start, end, fold, state, num_workers,
+                 target_ms=TARGET_TASK_MS):
+    if end <= start:
+        return state, []
+    calib_end = int(np.searchsorted(offsets, int(offsets[start]) + CALIBRATION_BYTES, side="left"))
+    calib_end = max(start + 1, min(end, calib_end))
+
+    t0 = time.perf_counter()
+    state = fold(state, fn(make_arg(start, calib_end)))
+    elapsed = max(time.perf_counter() - t0, 1e-6)
+    rate = (int(offsets[calib_end]) - int(offsets[start])) / elapsed
+
+    total_bytes = int(offsets[end]) - int(offsets[calib_end])
+    task_bytes = task_bytes_for(rate, total_bytes, num_workers, target_ms)
+    ranges = byte_balanced_ranges(offsets, calib_end, end, task_bytes)
+
+    busy = defaultdict(float)
+    tasks = defaultdict(int)
+    wall_start = time.time()
+    tasks_iter = ((fn, make_arg(s, e)) for s, e in ranges)
+    for result, pid, started, finished in pool.imap_unordered(run_timed, tasks_iter, chunksize=1):
+        state = fold(state, result)
+        busy[pid] += finished - started
+        tasks[pid] += 1
+    wall = time.time() - wall_start
+
+    print(f"🧮 Calibrated {rate / 1024 / 1024:.1f} MiB/s → {len(ranges)} tasks of ~{task_bytes / 1024:.0f} KiB "
+          f"(target {target_ms} ms)")
+    return state, worker_report(busy, tasks, wall, num_workers)
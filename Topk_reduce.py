@@ -0,0 +1,87 @@
+import heapq
+from array import array
+from collections import Counter
+
+# 근사 모드에서 워커/병합 단계가 유지하는 최대 후보 단어 수
+SKETCH_CAPACITY = 2000
+
+
+# Counter를 IPC용 압축 형태로 변환 (단어는 \0로 이어 붙인 bytes, count는 int64 배열)
+def pack_counter(counter):
+    words = list(counter.keys())
+    counts = array("q", counter.values())
+    return "\0".join(words).encode("utf-8"), counts.tobytes()
+
+
+def unpack_counter(packed):
+    words_blob, counts_blob = packed
+    if not words_blob:
+        return Counter()
+    counts = array("q")
+    counts.frombytes(counts_blob)
+    return Counter(dict(zip(words_blob.decode("utf-8").split("\0"), counts)))
+
+
+def packed_size(packed):
+    return len(packed[0]) + len(packed[1])
+
+
+# 병합 가능한 heavy-hitter 요약 (Misra-Gries, Space-Saving과 동형)
+# - 최대 capacity개의 단어만 유지, 넘치면 (capacity+1)번째 count만큼 모두 감소
+# - 추정치는 하한값이며 실제 값은 [count, count + error] 범위
+# - error <= total / (capacity + 1) 이 보장됨
+class HeavyHitters:
+    def __init__(self, capacity=SKETCH_CAPACITY):
+        self.capacity = capacity
+        self.counts = Counter()
+        self.error = 0
+        self.total = 0
+
+    # 정확히 센 부분 Counter(예: chunk 하나)를 요약에 합침
+    def update(self, counter):
+        self.counts.update(counter)
+        self.total += sum(counter.values())
+        self._prune()
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.error += other.error
+        self.total += other.total
+        self._prune()
+        return self
+
+    def _prune(self):
+        if len(self.counts) <= self.capacity:
+            return
+        kth = heapq.nlargest(self.capacity + 1, self.counts.values())[-1]
+        self.counts = Counter({w: c - kth for w, c in self.counts.items() if c > kth})
+        self.error += kth
+
+    def error_bound(self):
+        return self.total / (self.capacity + 1)
+
+    # (단어, 하한, 상한) 목록과 top_n이 확정적인지 여부
+    def top(self, top_n=10):
+        ranked = self.counts.most_common(top_n + 1)
+        result = [(w, c, c + self.error) for w, c in ranked[:top_n]]
+        if len(ranked) > top_n:
+            guaranteed = bool(result) and result[-1][1] >= ranked[top_n][1] + self.error
+        else:
+            guaranteed = True
+        return result, guaranteed
+
+    def packed(self):
+        return pack_counter(self.counts), self.error, self.total, self.capacity
+
+    @classmethod
+    def from_packed(cls, packed):
+        counts, error, total, capacity = packed
+        hh = cls(capacity)
+        hh.counts = unpack_counter(counts)
+        hh.error = error
+        hh.total = total
+        return hh
+
+
+def sketch_size(packed):
+    return packed_size(packed[0]) + 24
@@ -0,0 +1,712 @@
+import bisect
+import heapq
+import sys
+from array import array
+from collections import Counter
+from collections.abc import Mapping
+
+# 슬라이딩 윈도우 기본 설정 (Consumer와 동일)
+WINDOW_SECONDS = 180
+SLIDING_INTERVAL_SECONDS = 5
+TOP_N = 10
+# 이벤트 시각(생산자 시각) 기준 watermark = 지금까지 본 최대 이벤트 시각 - 허용 지연
+ALLOWED_LATENESS_SECONDS = 10
+# 이 시간 동안 이벤트 시각이 전진하지 않으면 벽시계 기준으로 watermark 전진 (유휴 스트림)
+IDLE_TIMEOUT_SECONDS = 30
+SENTIMENT_LABELS = ("positive", "neutral", "negative")
+
+# 동시에 유지할 윈도우 (이름 -> 초)
+MULTI_WINDOWS = {"1m": 60, "3m": 180, "15m": 900, "1h": 3600}
+# 긴 윈도우용 상위 bucket 크기 (pane 크기의 배수)
+BUCKET_SECONDS = 60
+# bucket이 이 개수 이상 들어가는 윈도우만 bucket 단위로 관리 (그보다 짧으면 pane 단위)
+MIN_BUCKETS_PER_WINDOW = 10
+
+# Top-N heap에 유지할 상위 후보 수 (어휘 전체가 아니라 이 개수에 비례하는 메모리)
+TOP_CANDIDATES = 1024
+# 어휘 크기가 (마지막 정리 때 살아 있던 단어 수 × 2 + 이 값)을 넘으면 안 쓰는 단어 정리
+VOCAB_COMPACT_MIN = 10000
+
+# 감정 라벨 <-> 1바이트 코드 (0 = 없음/알 수 없음)
+SENTIMENT_CODES = {"": 0, "positive": 1, "neutral": 2, "negative": 3}
+SENTIMENT_NAMES = {code: name for name, code in SENTIMENT_CODES.items()}
+
+
+# 봉인된 pane/bucket이 공유하는 단어 사전 (단어 문자열은 여기 한 번만 보관)
+# - 더 이상 어떤 pane/bucket에서도 쓰지 않는 id는 compact()로 비우고 free list로 재사용
+#   (id가 바뀌지 않으므로 이미 압축된 pane을 다시 쓸 필요 없음)
+class Vocabulary:
+    def __init__(self):
+        self.index = {}     # word -> id
+        self.words = []     # id -> word (비워진 id는 None)
+        self.free = []
+        self.sources = []   # 압축된 단어 집계(PackedWords)를 돌려주는 함수들
+        self.live_after_compaction = 0
+
+    def __len__(self):
+        return len(self.index)
+
+    def id(self, word):
+        i = self.index.get(word)
+        if i is None:
+            if self.free:
+                i = self.free.pop()
+                self.words[i] = word
+            else:
+                i = len(self.words)
+                self.words.append(word)
+            self.index[word] = i
+        return i
+
+    def register(self, source):
+        self.sources.append(source)
+
+    def due(self):
+        return len(self.index) > 2 * self.live_after_compaction + VOCAB_COMPACT_MIN
+
+    def compact(self):
+        live = set()
+        for source in self.sources:
+            for packed in source():
+                live.update(packed.ids)
+        removed = 0
+        for word, i in list(self.index.items()):
+            if i not in live:
+                del self.index[word]
+                self.words[i] = None
+                self.free.append(i)
+                removed += 1
+        self.live_after_compaction = len(self.index)
+        return removed
+
+
+# 봉인된 pane의 단어 집계: 정렬된 단어 id / count 배열 (단어당 8바이트)
+# Counter 대신 그대로 update/items/iter에 쓸 수 있는 읽기 전용 Mapping
+class PackedWords(Mapping):
+    __slots__ = ("vocab", "ids", "counts")
+
+    def __init__(self, vocab, ids, counts):
+        self.vocab = vocab
+        self.ids = ids
+        self.counts = counts
+
+    @classmethod
+    def pack(cls, vocab, counter):
+        pairs = sorted((vocab.id(w), c) for w, c in counter.items())
+        return cls(vocab, array("I", [i for i, _ in pairs]), array("I", [c for _, c in pairs]))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return map(self.vocab.words.__getitem__, self.ids)
+
+    def __getitem__(self, word):
+        i = self.vocab.index.get(word)
+        pos = len(self.ids) if i is None else bisect.bisect_left(self.ids, i)
+        if pos == len(self.ids) or self.ids[pos] != i:
+            raise KeyError(word)
+        return self.counts[pos]
+
+    def items(self):
+        return zip(iter(self), self.counts)
+
+    def unpack(self):
+        return Counter(dict(self.items()))
+
+
+# pane 하나에 해당하는 부분 집계 (봉인 후에는 words가 PackedWords, 다시 쓰면 Counter로 풀림)
+class Pane:
+    __slots__ = ("words", "sentiments", "records")
+
+    def __init__(self):
+        self.words = Counter()
+        self.sentiments = Counter()
+        self.records = 0
+
+    @property
+    def frozen(self):
+        return isinstance(self.words, PackedWords)
+
+    def freeze(self, vocab):
+        if not self.frozen:
+            self.words = PackedWords.pack(vocab, self.words)
+
+    def add(self, words, sentiment):
+        if self.frozen:
+            self.words = self.words.unpack()
+        self.words.update(words)
+        self.records += 1
+        if sentiment:
+            self.sentiments[sentiment] += 1
+
+    def merge(self, other):
+        if self.frozen:
+            self.words = self.words.unpack()
+        self.words.update(other.words)
+        self.sentiments.update(other.sentiments)
+        self.records += other.records
+
+
+# 윈도우 하나의 전체 합계 + 증분 Top-N
+# - 레코드/pane 단위로 더하고, 윈도우 밖으로 나간 pane을 빼는 방식으로 유지
+# - Top-N은 상위 후보만 담은 lazy heap으로 변경된 단어만 반영 (갱신 비용 = 변경된 단어 수에 비례)
+class WindowTotals:
+    def __init__(self, top_n=TOP_N):
+        self.top_n = top_n
+        self.word_counter = Counter()
+        self.sentiment_counter = Counter({s: 0 for s in SENTIMENT_LABELS})
+        self.record_count = 0
+
+        self._heap = []        # (-count, word), 오래된 항목은 조회 시 버림
+        self._floor = None     # heap 밖 단어는 모두 이 항목보다 순위가 낮음 (None이면 모든 단어가 heap에 있음)
+        self._dirty = set()    # 마지막 조회 이후 count가 바뀐 단어
+
+    def _add(self, words, sentiment):
+        self.word_counter.update(words)
+        self._dirty.update(words)
+        if sentiment:
+            self.sentiment_counter[sentiment] += 1
+        self.record_count += 1
+
+    def _add_pane(self, pane):
+        self.word_counter.update(pane.words)
+        self._dirty.update(pane.words)
+        self.sentiment_counter.update(pane.sentiments)
+        self.record_count += pane.records
+
+    def _subtract(self, pane):
+        wc = self.word_counter
+        for w, c in pane.words.items():
+            remaining = wc[w] - c
+            if remaining > 0:
+                wc[w] = remaining
+            else:
+                del wc[w]
+            self._dirty.add(w)
+
+        for s, c in pane.sentiments.items():
+            remaining = self.sentiment_counter[s] - c
+            if remaining > 0 or s in SENTIMENT_LABELS:
+                self.sentiment_counter[s] = max(remaining, 0)
+            else:
+                del self.sentiment_counter[s]
+
+        self.record_count -= pane.records
+
+    # 변경된 단어만 heap에 반영 후 상위 n개 반환
+    # heap에는 상위 후보(TOP_CANDIDATES개)만 유지: _floor보다 순위가 낮은 단어는 heap 밖에 있어도 됨
+    def top_words(self, n=None):
+        n = self.top_n if n is None else n
+        wc = self.word_counter
+        heap = self._heap
+        candidates = max(TOP_CANDIDATES, 4 * n)
+
+        # heap이 너무 커지면 현재 count로 재구성
+        if len(heap) + len(self._dirty) > 4 * candidates:
+            self._rebuild_heap(candidates)
+        else:
+            floor = self._floor
+            for w in self._dirty:
+                c = wc.get(w, 0)
+                if c > 0 and (floor is None or (-c, w) < floor):
+                    heapq.heappush(heap, (-c, w))
+        self._dirty.clear()
+
+        result = self._pop_top(n)
+        if result is None:
+            # 후보가 다 떨어지면 전체 Counter에서 다시 뽑음
+            self._rebuild_heap(candidates)
+            result = self._pop_top(n)
+        return result
+
+    def _rebuild_heap(self, candidates):
+        entries = ((-c, w) for w, c in self.word_counter.items())
+        if len(self.word_counter) > candidates:
+            self._heap = heapq.nsmallest(candidates, entries)  # 정렬된 리스트 = 유효한 heap
+            self._floor = self._heap[-1]
+        else:
+            self._heap = list(entries)
+            heapq.heapify(self._heap)
+            self._floor = None
+
+    # 유효한 항목 n개를 꺼냄 (heap 밖 단어가 있는데 후보가 모자라면 None)
+    def _pop_top(self, n):
+        wc = self.word_counter
+        heap = self._heap
+        result = []
+        seen = set()
+        while heap and len(result) < n:
+            neg, w = heapq.heappop(heap)
+            if w in seen or wc.get(w, 0) != -neg:
+                continue
+            seen.add(w)
+            result.append((w, -neg))
+
+        for w, c in result:
+            heapq.heappush(heap, (-c, w))
+        if len(result) < n and self._floor is not None:
+            return None
+        return result
+
+    def sentiments(self):
+        return Counter(self.sentiment_counter)
+
+
+# pane 단위 증분 슬라이딩 윈도우 집계기 (이벤트 시각 기준)
+# - 윈도우를 SLIDING_INTERVAL_SECONDS 크기의 pane으로 나누고 pane마다 부분 Counter 유지
+# - 레코드는 도착 시각이 아니라 이벤트 시각(ts)의 pane에 더하고, 만료된 pane은 전체 합계에서 뺀다
+# - 윈도우 = [watermark - window_seconds, 최대 이벤트 시각], watermark보다 윈도우 이상 늦은
+#   레코드는 버리고 late_records로만 센다 → 밀린 backlog를 따라잡는 동안에도 pane 수가 고정
+# - compact=True면 watermark를 지난 pane은 단어 id 배열로 압축 (늦은 레코드가 오면 풀었다가 다시 압축)
+class PaneWindowAggregator(WindowTotals):
+    def __init__(self, window_seconds=WINDOW_SECONDS, pane_seconds=SLIDING_INTERVAL_SECONDS, top_n=TOP_N,
+                 allowed_lateness=ALLOWED_LATENESS_SECONDS, idle_timeout=IDLE_TIMEOUT_SECONDS, compact=True):
+        super().__init__(top_n)
+        self.window_seconds = window_seconds
+        self.pane_seconds = pane_seconds
+        self.allowed_lateness = allowed_lateness
+        self.idle_timeout = idle_timeout
+
+        self.panes = {}        # pane index -> Pane
+        self.pane_order = []   # 오래된 순서로 정렬된 pane index
+        self.max_event_ts = None    # 지금까지 본 최대 이벤트 시각 (유휴 시 벽시계로 전진)
+        self.late_records = 0       # 윈도우가 이미 지나가 버린 레코드 수
+        self.total_added = 0
+        self._progress = (None, None)  # (마지막으로 확인한 max_event_ts, 그때의 벽시계)
+
+        self.compact = compact
+        self.vocab = Vocabulary()
+        self.vocab.register(lambda: (p.words for p in self.panes.values() if p.frozen))
+        self.frozen_before = None  # 이 index 미만의 pane은 압축됨
+        self._thawed = set()       # 압축 후 늦은 레코드로 다시 풀린 pane
+
+    def pane_index(self, ts):
+        return int(ts // self.pane_seconds)
+
+    @property
+    def watermark(self):
+        if self.max_event_ts is None:
+            return None
+        return self.max_event_ts - self.allowed_lateness
+
+    # 이 pane index 미만은 윈도우 밖 (아직 이벤트가 없으면 None)
+    def cutoff(self):
+        watermark = self.watermark
+        return None if watermark is None else self.pane_index(watermark - self.window_seconds)
+
+    # 레코드 1건 추가 (ts: 이벤트 시각 epoch seconds), 늦게 도착해 버려지면 False
+    def add(self, ts, words, sentiment=""):
+        idx = self.pane_index(ts)
+        cutoff = self.cutoff()
+        if cutoff is not None and idx < cutoff:
+            self.late_records += 1
+            return False
+
+        if self.max_event_ts is None or ts > self.max_event_ts:
+            self.max_event_ts = ts
+            # watermark가 전진하면 바로 만료 (expire 호출 사이에 몰려 들어와도 pane 수가 늘지 않음)
+            cutoff = self.cutoff()
+            if self.pane_order and self.pane_order[0] < cutoff:
+                self._expire_before(cutoff)
+
+        pane = self.panes.get(idx)
+        if pane is None:
+            pane = Pane()
+            self.panes[idx] = pane
+            bisect.insort(self.pane_order, idx)
+
+        if pane.frozen:
+            self._thawed.add(idx)
+        if self.compact:
+            # 같은 단어가 pane/윈도우 Counter마다 별도 문자열 객체로 남지 않도록 intern
+            words = list(map(sys.intern, words))
+        s = sentiment.lower() if sentiment else ""
+        pane.add(words, s)
+        self._add(words, s)
+        self.total_added += 1
+        return True
+
+    # 유휴 감지: idle_timeout 동안 이벤트 시각이 그대로면 now(벽시계) - idle_timeout까지 전진
+    def advance_idle(self, now):
+        if self._progress[0] != self.max_event_ts or self._progress[1] is None:
+            self._progress = (self.max_event_ts, now)
+        elif self.max_event_ts is not None and now - self._progress[1] >= self.idle_timeout:
+            self.max_event_ts = max(self.max_event_ts, now - self.idle_timeout)
+            self._progress = (self.max_event_ts, self._progress[1])
+
+    # watermark 기준으로 윈도우 밖으로 나간 pane 제거 (now는 유휴 감지에만 사용)
+    def expire(self, now=None):
+        if now is not None:
+            self.advance_idle(now)
+        cutoff = self.cutoff()
+        if cutoff is None:
+            return 0
+        removed = self._expire_before(cutoff)
+        if self.compact:
+            self._freeze_sealed()
+        return removed
+
+    # watermark를 지난 pane(= 이후 레코드는 늦은 레코드뿐)을 압축, 필요하면 어휘 정리
+    def _freeze_sealed(self):
+        seal = self.pane_index(self.watermark)
+        start = 0 if self.frozen_before is None else bisect.bisect_left(self.pane_order, self.frozen_before)
+        for idx in self.pane_order[start:bisect.bisect_left(self.pane_order, seal)]:
+            self.panes[idx].freeze(self.vocab)
+        for idx in self._thawed:
+            if idx in self.panes:
+                self.panes[idx].freeze(self.vocab)
+        self._thawed.clear()
+        self.frozen_before = seal if self.frozen_before is None else max(seal, self.frozen_before)
+        if self.vocab.due():
+            self.vocab.compact()
+
+    def _expire_before(self, cutoff):
+        removed = 0
+        while self.pane_order and self.pane_order[0] < cutoff:
+            idx = self.pane_order.pop(0)
+            pane = self.panes.pop(idx)
+            self._subtract(pane)
+            removed += pane.records
+        return removed
+
+    # 체크포인트용 압축 상태 (원본 레코드 대신 pane별 부분 집계만 저장)
+    def to_state(self):
+        return {
+            "window_seconds": self.window_seconds,
+            "pane_seconds": self.pane_seconds,
+            "allowed_lateness": self.allowed_lateness,
+            "idle_timeout": self.idle_timeout,
+            "compact": self.compact,
+            "max_event_ts": self.max_event_ts,
+            "late_records": self.late_records,
+            "panes": [
+                [idx, pane.records, dict(pane.words.items()), dict(pane.sentiments)]
+                for idx, pane in ((i, self.panes[i]) for i in self.pane_order)
+            ],
+        }
+
+    @classmethod
+    def from_state(cls, state, top_n=TOP_N):
+        # 설정 필드가 없는 이전 체크포인트는 모듈 기본값으로
+        agg = cls(state["window_seconds"], state["pane_seconds"], top_n,
+                  state.get("allowed_lateness", ALLOWED_LATENESS_SECONDS),
+                  state.get("idle_timeout", IDLE_TIMEOUT_SECONDS), state.get("compact", True))
+        for idx, pane in _panes_from_state(state["panes"]):
+            agg.panes[idx] = pane
+            agg.pane_order.append(idx)
+            agg._add_pane(pane)
+        agg.pane_order.sort()
+        agg.max_event_ts = state.get("max_event_ts")
+        agg.late_records = state.get("late_records", 0)
+        return agg
+
+
+def _panes_from_state(rows):
+    for idx, records, words, sentiments in rows:
+        pane = Pane()
+        pane.words.update(words)
+        pane.sentiments.update(sentiments)
+        pane.records = records
+        yield idx, pane
+
+
+# 여러 길이의 윈도우(1분/3분/15분/1시간)를 한 번의 계층형 집계로 유지
+# - 짧은 윈도우: 5초 pane (가장 긴 짧은 윈도우가 PaneWindowAggregator로 pane과 watermark를 소유)
+# - 긴 윈도우: watermark를 지난(봉인된) pane을 BUCKET_SECONDS bucket에 한 번 합치고, bucket 단위로 더하고 뺌
+#   → 긴 윈도우는 watermark까지의 이벤트를 반영 (봉인 뒤 늦게 온 레코드는 bucket에 직접 더함)
+# - 메모리 = pane 수 + bucket 수 (1시간 윈도우도 원본 레코드를 보관하지 않음)
+#   compact=True면 다 채워진 bucket도 pane과 같은 어휘로 압축
+class MultiWindowAggregator:
+    def __init__(self, windows=None, pane_seconds=SLIDING_INTERVAL_SECONDS, bucket_seconds=BUCKET_SECONDS,
+                 top_n=TOP_N, allowed_lateness=ALLOWED_LATENESS_SECONDS, idle_timeout=IDLE_TIMEOUT_SECONDS,
+                 compact=True):
+        self.windows = dict(windows or MULTI_WINDOWS)
+        self.pane_seconds = pane_seconds
+        self.bucket_seconds = bucket_seconds
+
+        coarse_min = bucket_seconds * MIN_BUCKETS_PER_WINDOW
+        self.fine = {n: s for n, s in self.windows.items() if s < coarse_min}
+        self.coarse = {n: s for n, s in self.windows.items() if s >= coarse_min}
+        base_seconds = max(self.fine.values(), default=bucket_seconds)
+        self.base = PaneWindowAggregator(base_seconds, pane_seconds, top_n, allowed_lateness, idle_timeout, compact)
+
+        # 가장 긴 짧은 윈도우는 base 자체, 나머지는 각자의 합계
+        self.base_name = max(self.fine, key=self.fine.get) if self.fine else None
+        self.views = {name: self.base if name == self.base_name else WindowTotals(top_n) for name in self.windows}
+        self.expired_before = {name: None for name in self.windows}  # 윈도우별로 이미 뺀 pane/bucket index
+
+        self.buckets = {}        # bucket index -> Pane (봉인된 pane의 합)
+        self.bucket_order = []
+        self.sealed_before = None  # 이 pane index 미만은 bucket에 합쳐짐
+        self.late_records = 0      # 모든 윈도우에서 벗어나 버려진 레코드
+
+        self.compact = compact
+        self.bucket_frozen_before = None
+        self._thawed_buckets = set()
+        self._register_buckets()
+
+    def _register_buckets(self):
+        self.base.vocab.register(lambda: (b.words for b in self.buckets.values() if b.frozen))
+
+    @property
+    def watermark(self):
+        return self.base.watermark
+
+    @property
+    def record_count(self):
+        return max(view.record_count for view in self.views.values())
+
+    def bucket_of(self, pane_idx):
+        return pane_idx * self.pane_seconds // self.bucket_seconds
+
+    def _cutoff(self, name, watermark):
+        start = watermark - self.windows[name]
+        if name in self.coarse:
+            return int(start // self.bucket_seconds)
+        return self.base.pane_index(start)
+
+    def add(self, ts, words, sentiment=""):
+        if self.base.max_event_ts is None or ts > self.base.max_event_ts:
+            # base가 pane을 만료시키기 전에 봉인/짧은 윈도우 정리부터
+            self._advance(ts - self.base.allowed_lateness)
+
+        idx = self.base.pane_index(ts)
+        if self.compact:
+            words = list(map(sys.intern, words))
+        s = sentiment.lower() if sentiment else ""
+        accepted = self.base.add(ts, words, sentiment)
+        if accepted:
+            for name in self.fine:
+                view = self.views[name]
+                if view is not self.base and idx >= self.expired_before[name]:
+                    view._add(words, s)
+
+        # 아직 봉인 전인 pane은 봉인될 때 bucket으로 합쳐짐
+        if self.sealed_before is not None and idx < self.sealed_before:
+            accepted = self._add_to_bucket(self.bucket_of(idx), words, s) or accepted
+        if not accepted:
+            self.late_records += 1
+        return accepted
+
+    def _add_to_bucket(self, b, words, sentiment):
+        targets = [name for name in self.coarse if b >= self.expired_before[name]]
+        if not targets:
+            return False
+        bucket = self.buckets.get(b)
+        if bucket is None:
+            bucket = self.buckets[b] = Pane()
+            bisect.insort(self.bucket_order, b)
+        if bucket.frozen:
+            self._thawed_buckets.add(b)
+        bucket.add(words, sentiment)
+        for name in targets:
+            self.views[name]._add(words, sentiment)
+        return True
+
+    # watermark 전진: pane 봉인 → bucket, 짧은/긴 윈도우에서 나간 pane/bucket 빼기
+    def _advance(self, watermark):
+        base = self.base
+        seal = base.pane_index(watermark)
+        start = 0 if self.sealed_before is None else bisect.bisect_left(base.pane_order, self.sealed_before)
+        if self.coarse and (self.sealed_before is None or seal > self.sealed_before):
+            for idx in base.pane_order[start:bisect.bisect_left(base.pane_order, seal)]:
+                self._seal(idx, base.panes[idx])
+        self.sealed_before = seal if self.sealed_before is None else max(seal, self.sealed_before)
+
+        for name in self.windows:
+            cutoff = self._cutoff(name, watermark)
+            old = self.expired_before[name]
+            if old is not None and cutoff <= old:
+                continue
+            self.expired_before[name] = cutoff
+            view = self.views[name]
+            if old is None or view is base:
+                continue
+            if name in self.coarse:
+                for b in self.bucket_order[bisect.bisect_left(self.bucket_order, old):
+                                           bisect.bisect_left(self.bucket_order, cutoff)]:
+                    view._subtract(self.buckets[b])
+            else:
+                for idx in base.pane_order[bisect.bisect_left(base.pane_order, old):
+                                           bisect.bisect_left(base.pane_order, cutoff)]:
+                    view._subtract(base.panes[idx])
+
+        # 어떤 긴 윈도우에도 속하지 않는 bucket 정리
+        if self.coarse:
+            oldest = min(self.expired_before[name] for name in self.coarse)
+            while self.bucket_order and self.bucket_order[0] < oldest:
+                del self.buckets[self.bucket_order.pop(0)]
+
+    def _seal(self, idx, pane):
+        b = self.bucket_of(idx)
+        targets = [name for name in self.coarse
+                   if self.expired_before[name] is None or b >= self.expired_before[name]]
+        if not targets:
+            return
+        bucket = self.buckets.get(b)
+        if bucket is None:
+            bucket = self.buckets[b] = Pane()
+            bisect.insort(self.bucket_order, b)
+        if bucket.frozen:
+            self._thawed_buckets.add(b)
+        bucket.merge(pane)
+        for name in targets:
+            self.views[name]._add_pane(pane)
+
+    def expire(self, now=None):
+        if now is not None:
+            self.base.advance_idle(now)
+        if self.watermark is not None:
+            self._advance(self.watermark)
+        removed = self.base.expire()
+        if self.compact and self.sealed_before is not None:
+            self._freeze_buckets()
+        return removed
+
+    # 모든 pane이 봉인된 bucket(= 이후에는 아주 늦은 레코드만 들어옴)을 압축
+    def _freeze_buckets(self):
+        complete = self.bucket_of(self.sealed_before)
+        start = 0 if self.bucket_frozen_before is None else bisect.bisect_left(self.bucket_order,
+                                                                              self.bucket_frozen_before)
+        for b in self.bucket_order[start:bisect.bisect_left(self.bucket_order, complete)]:
+            self.buckets[b].freeze(self.base.vocab)
+        for b in self._thawed_buckets:
+            if b in self.buckets:
+                self.buckets[b].freeze(self.base.vocab)
+        self._thawed_buckets.clear()
+        self.bucket_frozen_before = complete if self.bucket_frozen_before is None else max(
+            complete, self.bucket_frozen_before)
+
+    # pane/bucket/압축된 집계/어휘 개수
+    def stats(self):
+        return {
+            "panes": len(self.base.panes),
+            "buckets": len(self.buckets),
+            "frozen": sum(p.frozen for p in self.base.panes.values()) + sum(b.frozen for b in self.buckets.values()),
+            "vocabulary": len(self.base.vocab),
+        }
+
+    def top_words(self, name, n=None):
+        return self.views[name].top_words(n)
+
+    def sentiments(self, name):
+        return self.views[name].sentiments()
+
+    def counts(self, name):
+        return self.views[name].record_count
+
+    def to_state(self):
+        return {
+            "windows": self.windows,
+            "bucket_seconds": self.bucket_seconds,
+            "compact": self.compact,
+            "sealed_before": self.sealed_before,
+            "multi_late_records": self.late_records,
+            "base": self.base.to_state(),
+            "buckets": [
+                [b, bucket.records, dict(bucket.words.items()), dict(bucket.sentiments)]
+                for b, bucket in ((i, self.buckets[i]) for i in self.bucket_order)
+            ],
+        }
+
+    # pane/bucket에서 윈도우별 합계를 다시 계산
+    @classmethod
+    def from_state(cls, state, top_n=TOP_N):
+        base_state = state["base"]
+        agg = cls(state["windows"], base_state["pane_seconds"], state["bucket_seconds"], top_n,
+                  base_state.get("allowed_lateness", ALLOWED_LATENESS_SECONDS),
+                  base_state.get("idle_timeout", IDLE_TIMEOUT_SECONDS), state.get("compact", True))
+        agg.base = PaneWindowAggregator.from_state(base_state, top_n)
+        agg._register_buckets()
+        if agg.base_name is not None:
+            agg.views[agg.base_name] = agg.base
+        agg.sealed_before = state["sealed_before"]
+        agg.late_records = state.get("multi_late_records", 0)
+        for b, bucket in _panes_from_state(state["buckets"]):
+            agg.buckets[b] = bucket
+            agg.bucket_order.append(b)
+        agg.bucket_order.sort()
+
+        watermark = agg.watermark
+        if watermark is None:
+            return agg
+        for name, view in agg.views.items():
+            cutoff = agg.expired_before[name] = agg._cutoff(name, watermark)
+            if view is agg.base:
+                continue
+            if name in agg.coarse:
+                for b in agg.bucket_order:
+                    if b >= cutoff:
+                        view._add_pane(agg.buckets[b])
+            else:
+                for idx in agg.base.pane_order:
+                    if idx >= cutoff:
+                        view._add_pane(agg.base.panes[idx])
+        return agg
+
+
+# 체크포인트의 윈도우 상태를 종류에 맞는 집계기로 복원
+def window_from_state(state, top_n=TOP_N):
+    if "windows" in state:
+        return MultiWindowAggregator.from_state(state, top_n)
+    return PaneWindowAggregator.from_state(state, top_n)
+
+
+# ---------------- 벤치마크: 원본 레코드 윈도우 vs 계층형 집계 (압축 전/후) 메모리 ----------------
+
+def _bench_stream(seconds, rate, vocab_size=50000, words_per_review=40, seed=42):
+    import itertools
+    import random
+    rng = random.Random(seed)
+    # Zipf 분포 어휘 (실제 리뷰처럼 소수 단어가 대부분을 차지)
+    vocabulary = [f"word{i}" for i in range(vocab_size)]
+    cum_weights = list(itertools.accumulate(1 / (i + 1) for i in range(vocab_size)))
+    start = 1_700_000_000.0
+    for i in range(int(seconds * rate)):
+        text = " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=words_per_review))
+        yield start + i / rate, text, rng.choice(SENTIMENT_LABELS)
+
+
+def _measure(build, stream):
+    import tracemalloc
+    tracemalloc.start()
+    state = build(stream)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return state, current / 1024 / 1024
+
+
+def _legacy_window(stream):
+    from datetime import datetime, timezone
+    return [(datetime.fromtimestamp(ts, timezone.utc), text.split(), sentiment) for ts, text, sentiment in stream]
+
+
+def _multi_window(compact):
+    def build(stream):
+        agg = MultiWindowAggregator(compact=compact)
+        for i, (ts, text, sentiment) in enumerate(stream):
+            agg.add(ts, text.split(), sentiment)
+            # 대시보드처럼 주기적으로 만료 + 윈도우별 Top-N 조회
+            if i % 1000 == 999:
+                agg.expire()
+                for name in agg.windows:
+                    agg.top_words(name)
+        agg.expire()
+        return agg
+    return build
+
+
+if __name__ == "__main__":
+    seconds = int(sys.argv[1]) if len(sys.argv) > 1 else 3600
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    stream = list(_bench_stream(seconds, rate))
+    print(f"📊 {len(stream)} reviews over {seconds}s of event time ({rate}/s)")
+
+    _, legacy_mb = _measure(_legacy_window, stream)
+    print(f"Raw record window (datetime, word list, sentiment): {legacy_mb:8.1f} MiB")
+    _, plain_mb = _measure(_multi_window(False), stream)
+    print(f"Pane/bucket window, Counter panes               : {plain_mb:8.1f} MiB")
+    agg, compact_mb = _measure(_multi_window(True), stream)
+    print(f"Pane/bucket window, packed panes                : {compact_mb:8.1f} MiB  {agg.stats()}")
+    print(f"Reduction vs raw records: {legacy_mb / compact_mb:.1f}x | vs Counter panes: {plain_mb / compact_mb:.1f}x")
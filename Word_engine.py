@@ -0,0 +1,145 @@
+import re
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+# MapReduce_wordcount.tokenize와 같은 규칙: 소문자화 후 a-z와 공백 외 문자 제거
+MAPREDUCE_STRIP = re.compile(r"[^a-z\s]")
+
+
+# chunk 전체를 한 번에 토큰화: 텍스트를 공백으로 이어 붙여 lower/정규식/split을 한 번씩만 수행
+#   coerce=True  : str(text)로 변환 (MapReduce 방식)
+#   coerce=False : 문자열이 아닌 값은 건너뜀 (Hybrid 방식)
+def tokenize_chunk(texts, strip_pattern=None, coerce=False):
+    if coerce:
+        parts = [str(t) for t in texts]
+    else:
+        parts = [t for t in texts if isinstance(t, str)]
+    joined = " ".join(parts).lower()
+    if strip_pattern is not None:
+        joined = strip_pattern.sub("", joined)
+    return joined.split()
+
+
+# chunk 하나의 (고유 단어 배열, 단어별 count 배열): factorize로 정수 ID를 매기고 bincount로 집계
+def count_arrays(texts, strip_pattern=None, coerce=False):
+    tokens = tokenize_chunk(texts, strip_pattern, coerce)
+    if not tokens:
+        return [], np.zeros(0, dtype=np.int64)
+    codes, uniques = pd.factorize(np.asarray(tokens, dtype=object))
+    counts = np.bincount(codes, minlength=len(uniques)).astype(np.int64)
+    return uniques.tolist(), counts
+
+
+# IPC용 압축 형태 (Topk_reduce.pack_counter와 같은 포맷: \0로 이은 단어 bytes + int64 count)
+def pack_arrays(words, counts):
+    return "\0".join(words).encode("utf-8"), np.asarray(counts, dtype=np.int64).tobytes()
+
+
+def unpack_arrays(packed):
+    words_blob, counts_blob = packed
+    if not words_blob:
+        return [], np.zeros(0, dtype=np.int64)
+    return words_blob.decode("utf-8").split("\0"), np.frombuffer(counts_blob, dtype=np.int64)
+
+
+# 전역 어휘(단어 → 정수 ID)와 ID별 count 배열을 유지하는 누적기
+class WordCounts:
+    def __init__(self):
+        self.vocab = {}
+        self.words = []
+        self.counts = np.zeros(1024, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.words)
+
+    def intern(self, word):
+        idx = self.vocab.get(word)
+        if idx is None:
+            idx = len(self.words)
+            self.vocab[word] = idx
+            self.words.append(word)
+        return idx
+
+    # 부분 결과(고유 단어, count) 합치기: 새 단어만 어휘에 추가, count는 배열 연산으로 더함
+    def add(self, words, counts):
+        if not len(words):
+            return self
+        ids = np.fromiter((self.intern(w) for w in words), dtype=np.int64, count=len(words))
+        if len(self.words) > len(self.counts):
+            grown = np.zeros(max(len(self.words), 2 * len(self.counts)), dtype=np.int64)
+            grown[:len(self.counts)] = self.counts
+            self.counts = grown
+        # 한 부분 결과 안에서 단어는 고유하므로 fancy-index 덧셈으로 충분
+        self.counts[ids] += counts
+        return self
+
+    def add_packed(self, packed):
+        return self.add(*unpack_arrays(packed))
+
+    def most_common(self, n=10):
+        size = len(self.words)
+        if size == 0:
+            return []
+        counts = self.counts[:size]
+        n = min(n, size)
+        top = np.argpartition(-counts, n - 1)[:n]
+        top = top[np.lexsort((top, -counts[top]))]
+        return [(self.words[i], int(counts[i])) for i in top]
+
+    def to_counter(self):
+        return Counter(dict(zip(self.words, self.counts[:len(self.words)].tolist())))
+
+
+# ---------------- 벤치마크: 기존 토크나이저 vs 벡터화 엔진 ----------------
+
+def _mapreduce_counter(texts):
+    counter = Counter()
+    for text in texts:
+        text = str(text).lower()
+        text = MAPREDUCE_STRIP.sub("", text)
+        counter.update(text.split())
+    return counter
+
+
+def _hybrid_counter(texts):
+    counter = Counter()
+    for text in texts:
+        if isinstance(text, str):
+            counter.update(text.lower().split())
+    return counter
+
+
+def bench_tokenizers(texts, chunk_size=50000):
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    variants = [
+        ("mapreduce tokenize + Counter", lambda c: _mapreduce_counter(c)),
+        ("mapreduce engine", lambda c: count_arrays(c, MAPREDUCE_STRIP, coerce=True)),
+        ("hybrid split + Counter", lambda c: _hybrid_counter(c)),
+        ("hybrid engine", lambda c: count_arrays(c)),
+    ]
+    results = {}
+    for name, fn in variants:
+        start = time.perf_counter()
+        for chunk in chunks:
+            fn(chunk)
+        elapsed = time.perf_counter() - start
+        results[name] = elapsed
+        print(f"{name:30s}: {elapsed:.4f}s | {len(texts) / elapsed:.2f} records/sec")
+
+    # 결과가 기존 방식과 같은지 확인
+    total = WordCounts()
+    for chunk in chunks:
+        total.add(*count_arrays(chunk, MAPREDUCE_STRIP, coerce=True))
+    assert total.to_counter() == _mapreduce_counter(texts)
+    return results
+
+
+if __name__ == "__main__":
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else "/home/ubuntu/cleaned_books_100.csv"
+    texts = pd.read_csv(csv_path, usecols=["cleaned_text"])["cleaned_text"].dropna().tolist()
+    print(f"📊 Tokenizer benchmark on {len(texts)} reviews")
+    bench_tokenizers(texts)